@@ -174,6 +174,29 @@ install_via_custom() {
     return $?
 }
 
+# ─────────────────────────────────────────────
+# Inventaire des paquets installés
+# Un seul appel à dpkg-query et à snap list, indexé dans des tableaux
+# associatifs : la vérification par paquet ne lance plus aucun processus
+# ─────────────────────────────────────────────
+
+declare -A INSTALLED_DPKG=()
+declare -A INSTALLED_SNAP=()
+
+load_inventory() {
+    local pkg status name _
+
+    while read -r pkg status; do
+        [ "$status" = "install ok installed" ] && INSTALLED_DPKG["$pkg"]=1
+    done < <(dpkg-query -W -f='${Package} ${Status}\n' 2>/dev/null)
+
+    while read -r name _; do
+        [ -n "$name" ] && INSTALLED_SNAP["$name"]=1
+    done < <(snap list 2>/dev/null | tail -n +2)
+
+    log_info "Inventaire: ${#INSTALLED_DPKG[@]} paquets dpkg, ${#INSTALLED_SNAP[@]} snaps installés"
+}
+
 # ─────────────────────────────────────────────
 # Fonction principale d'installation
 # FIX: respecte l'ordre install_command > apt > snap
@@ -196,12 +219,12 @@ install_package() {
     log_info "Installation de: $package_name"
     log_section
 
-    # Vérifier si déjà installé
-    if dpkg -l 2>/dev/null | grep -q "^ii[[:space:]]*${package_name}[[:space:]]"; then
+    # Vérifier si déjà installé (inventaire chargé une seule fois par load_inventory)
+    if [ -n "${INSTALLED_DPKG[$package_name]:-}" ]; then
         log_success "$package_name est déjà installé (apt/dpkg)"
         return 0
     fi
-    if snap list 2>/dev/null | grep -q "^${package_name}[[:space:]]"; then
+    if [ -n "${INSTALLED_SNAP[$package_name]:-}" ]; then
         log_success "$package_name est déjà installé (snap)"
         return 0
     fi
@@ -529,6 +552,8 @@ clone_github_repos() {
 log_info "Mise à jour des dépôts apt..."
 sudo apt update
 
+load_inventory
+
 PACKAGES=$(jq -c '.packages[]' "$CONFIG_FILE" 2>/dev/null || echo "")
 
 if [ -z "$PACKAGES" ]; then
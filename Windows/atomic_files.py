@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Écriture atomique des fichiers d'état (journal appliqué, index du cache, rapports...)
+Le contenu est écrit dans un fichier temporaire propre au processus et au thread,
+puis substitué d'un coup au fichier final : un lecteur ne voit jamais un fichier
+à moitié écrit, même si l'écriture est interrompue.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, Optional
+
+
+@contextmanager
+def atomic_open(path: str, binary: bool = False) -> Iterator[IO]:
+    """Ouvre un fichier temporaire qui remplace `path` à la sortie du bloc
+
+    En cas d'exception, le fichier temporaire est supprimé et `path` reste intact.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if binary:
+            with open(temp_path, 'wb') as f:
+                yield f
+        else:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Écrit `data` en JSON (UTF-8) de manière atomique"""
+    with atomic_open(path) as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Installations groupées winget / chocolatey
+Construit les invocations groupées (`winget import`, `choco install a b c`) et
+extrait de leur sortie le résultat de chaque paquet
+"""
+
+import re
+import time
+from typing import Dict, List, Optional
+
+# Arguments winget reproduits par `winget import` (qui est toujours silencieux) :
+# un paquet n'utilisant que ceux-ci peut être regroupé
+WINGET_IMPORT_COMPATIBLE_ARGS = {
+    "--accept-package-agreements",
+    "--accept-source-agreements",
+    "--silent",
+    "-h",
+    "--disable-interactivity",
+}
+
+WINGET_IMPORT_ARGS = [
+    "--accept-package-agreements",
+    "--accept-source-agreements",
+    "--ignore-unavailable",
+    "--ignore-versions",
+]
+
+WINGET_SOURCE = {
+    "Argument": "https://cdn.winget.microsoft.com/cache",
+    "Identifier": "Microsoft.Winget.Source_8wekyb3d8bbwe",
+    "Name": "winget",
+    "Type": "Microsoft.PreIndexed.Package",
+}
+
+_WINGET_FOUND = re.compile(r"^Found .*\[(?P<id>[^\]\s]+)\]", re.MULTILINE)
+_WINGET_SUCCESS = re.compile(r"^Successfully installed", re.MULTILINE)
+_WINGET_FAILURE = re.compile(r"^(Installer failed|Installation failed|Installation abandoned)", re.MULTILINE)
+_WINGET_NOT_FOUND = re.compile(r"^Package not found(?: in import source)?:\s*(?P<id>\S+)",
+                               re.MULTILINE | re.IGNORECASE)
+
+_CHOCO_SUCCESS = re.compile(r"The install of (?P<id>\S+) was successful", re.IGNORECASE)
+_CHOCO_ALREADY = re.compile(r"^(?P<id>\S+) v\S+ already installed", re.MULTILINE | re.IGNORECASE)
+_CHOCO_FAILURE = re.compile(r"^\s*-\s+(?P<id>\S+)\s+(?:\(exited|-)", re.MULTILINE)
+_CHOCO_NOT_INSTALLED = re.compile(r"^(?P<id>\S+) not installed\.", re.MULTILINE | re.IGNORECASE)
+
+
+def is_winget_batchable(silent_args: List[str]) -> bool:
+    """Indique si un paquet winget peut passer par `winget import`"""
+    return set(silent_args) <= WINGET_IMPORT_COMPATIBLE_ARGS
+
+
+def build_winget_import(package_ids: List[str]) -> Dict:
+    """Construit le fichier d'import winget pour un lot de paquets"""
+    return {
+        "$schema": "https://aka.ms/winget-packages.schema.2.0.json",
+        "CreationDate": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "Sources": [{
+            "Packages": [{"PackageIdentifier": package_id} for package_id in package_ids],
+            "SourceDetails": WINGET_SOURCE,
+        }],
+    }
+
+
+def parse_winget_import_output(output: str, package_ids: List[str]) -> Dict[str, Optional[bool]]:
+    """Résultat par paquet d'un `winget import` (None = indéterminé)"""
+    results: Dict[str, Optional[bool]] = {package_id: None for package_id in package_ids}
+    by_lower = {package_id.lower(): package_id for package_id in package_ids}
+
+    for match in _WINGET_NOT_FOUND.finditer(output):
+        package_id = by_lower.get(match.group('id').lower())
+        if package_id:
+            results[package_id] = False
+
+    # La sortie enchaîne un bloc par paquet, ouvert par « Found <nom> [<id>] »
+    found = list(_WINGET_FOUND.finditer(output))
+    for index, match in enumerate(found):
+        package_id = by_lower.get(match.group('id').lower())
+        if not package_id:
+            continue
+        end = found[index + 1].start() if index + 1 < len(found) else len(output)
+        block = output[match.end():end]
+        if _WINGET_FAILURE.search(block):
+            results[package_id] = False
+        elif _WINGET_SUCCESS.search(block):
+            results[package_id] = True
+
+    for line in output.lower().splitlines():
+        if "already installed" in line or "no newer package versions" in line:
+            for lower_id, package_id in by_lower.items():
+                if re.search(rf"(?<![\w.\-]){re.escape(lower_id)}(?![\w.\-])", line):
+                    results[package_id] = True
+    return results
+
+
+def parse_choco_output(output: str, package_ids: List[str]) -> Dict[str, Optional[bool]]:
+    """Résultat par paquet d'un `choco install` groupé (None = indéterminé)"""
+    results: Dict[str, Optional[bool]] = {package_id: None for package_id in package_ids}
+    by_lower = {package_id.lower(): package_id for package_id in package_ids}
+
+    def mark(pattern, value: bool) -> None:
+        for match in pattern.finditer(output):
+            package_id = by_lower.get(match.group('id').lower())
+            if package_id:
+                results[package_id] = value
+
+    mark(_CHOCO_SUCCESS, True)
+    mark(_CHOCO_ALREADY, True)
+    mark(_CHOCO_NOT_INSTALLED, False)
+    # La section « Failures » du résumé fait foi
+    failures_at = output.find("Failures")
+    if failures_at >= 0:
+        for match in _CHOCO_FAILURE.finditer(output, failures_at):
+            package_id = by_lower.get(match.group('id').lower())
+            if package_id:
+                results[package_id] = False
+    return results
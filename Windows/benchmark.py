@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de l'installateur
+Exécute SoftwareInstaller de bout en bout, sous Linux comme sous Windows, contre
+des gestionnaires simulés (faux `winget` et `choco` à latence et taux d'échec
+configurables) et un serveur HTTP local servant des installateurs synthétiques.
+Mesure le temps total, le débit (logiciels/minute), la mémoire maximale (RSS)
+et le volume téléchargé pour des configurations de 10 à 1000 logiciels.
+
+Exemples :
+    python benchmark.py
+    python benchmark.py --sizes 10 100 1000 --latency 0.2 --failure-rate 0.05
+    python benchmark.py --serial --output baseline.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from software_installer import SoftwareInstaller
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_MIX = "winget=5,chocolatey=3,custom=2"
+
+# Motif de contenu des installateurs synthétiques (distinct pour chaque fichier)
+PATTERN_SIZE = 64 * 1024
+
+# Comportement commun des faux outils : latence fixe par paquet, échecs
+# déterministes (un même identifiant échoue toujours pour un taux donné)
+_FAKE_COMMON = r'''
+import hashlib, json, os, sys, time
+
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0"))
+FAILURE_RATE = float(os.environ.get("BENCH_FAILURE_RATE", "0"))
+
+def fails(package_id):
+    digest = hashlib.sha256(package_id.lower().encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2 ** 32 < FAILURE_RATE
+
+def install(package_id):
+    time.sleep(LATENCY)
+    return not fails(package_id)
+'''
+
+FAKE_WINGET = _FAKE_COMMON + r'''
+args = sys.argv[1:]
+command = args[0] if args else ""
+if command == "--version":
+    print("v1.7.0")
+elif command == "export":
+    with open(args[args.index("-o") + 1], "w", encoding="utf-8") as f:
+        json.dump({"Sources": []}, f)
+elif command == "list":
+    print("Name   Id   Version\n-------------------")
+elif command == "install":
+    if not install(args[1]):
+        print("Installer failed with exit code: 1")
+        sys.exit(1)
+    print("Successfully installed")
+elif command == "import":
+    with open(args[args.index("-i") + 1], encoding="utf-8") as f:
+        data = json.load(f)
+    failed = False
+    for source in data["Sources"]:
+        for package in source["Packages"]:
+            package_id = package["PackageIdentifier"]
+            print(f"Found {package_id} [{package_id}]")
+            if install(package_id):
+                print("Successfully installed")
+            else:
+                print("Installer failed with exit code: 1")
+                failed = True
+    sys.exit(1 if failed else 0)
+else:
+    sys.exit(2)
+'''
+
+FAKE_CHOCO = _FAKE_COMMON + r'''
+args = sys.argv[1:]
+command = args[0] if args else ""
+if command == "--version":
+    print("2.2.2")
+elif command == "list":
+    pass
+elif command == "install":
+    package_ids = [arg for arg in args[1:] if not arg.startswith("-")]
+    failures = []
+    for package_id in package_ids:
+        if install(package_id):
+            print(f"The install of {package_id} was successful.")
+        else:
+            failures.append(package_id)
+    if failures:
+        print("Failures")
+        for package_id in failures:
+            print(f" - {package_id} (exited 1) - Error while running install script")
+        sys.exit(1)
+else:
+    sys.exit(2)
+'''
+
+FAKE_INSTALLER = _FAKE_COMMON + r'''
+sys.exit(0 if install(os.path.basename(sys.argv[1])) else 1)
+'''
+
+
+# ----------------------------------------------------------------------
+# Serveur d'installateurs synthétiques
+# ----------------------------------------------------------------------
+
+def synthetic_pattern(name: str) -> bytes:
+    """Motif répété formant le contenu de l'installateur `name`"""
+    seed = hashlib.sha256(name.encode('utf-8')).digest()
+    return (seed * (PATTERN_SIZE // len(seed) + 1))[:PATTERN_SIZE]
+
+
+def synthetic_digest(name: str, size: int) -> str:
+    """Empreinte sha256 de l'installateur synthétique `name` de `size` octets"""
+    pattern = synthetic_pattern(name)
+    file_hash = hashlib.sha256()
+    for offset in range(0, size, PATTERN_SIZE):
+        file_hash.update(pattern[:min(PATTERN_SIZE, size - offset)])
+    return file_hash.hexdigest()
+
+
+class InstallerRequestHandler(BaseHTTPRequestHandler):
+    """Sert /<nom>?size=<octets> avec prise en charge des requêtes Range"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        match = re.match(r"^/(?P<name>[^?]+)\?size=(?P<size>\d+)$", self.path)
+        if not match:
+            self.send_error(404)
+            return
+        name, size = match.group('name'), int(match.group('size'))
+        start, end = 0, size - 1
+        range_match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if range_match:
+            start = int(range_match.group(1))
+            end = min(int(range_match.group(2)), size - 1) if range_match.group(2) else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{name}-{size}"')
+        self.end_headers()
+
+        pattern = synthetic_pattern(name)
+        position = start
+        try:
+            while position <= end:
+                offset = position % PATTERN_SIZE
+                block = pattern[offset:offset + min(PATTERN_SIZE - offset, end - position + 1)]
+                self.wfile.write(block)
+                position += len(block)
+        finally:
+            self.server.count(position - start)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class InstallerServer(ThreadingHTTPServer):
+    """Serveur HTTP local qui compte les octets servis"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), InstallerRequestHandler)
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+
+    def count(self, amount: int) -> None:
+        with self._lock:
+            self.bytes_served += amount
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+# ----------------------------------------------------------------------
+# Environnement simulé
+# ----------------------------------------------------------------------
+
+class BenchmarkInstaller(SoftwareInstaller):
+    """SoftwareInstaller dont les installateurs téléchargés sont exécutés par un simulateur
+
+    Les installateurs synthétiques ne sont pas de vrais exécutables : leur lancement
+    est confié à un faux installateur qui applique la même latence que winget/choco.
+    """
+
+    def __init__(self, fake_installer: str, installers_dir: str, **kwargs):
+        self.fake_installer = fake_installer
+        self.installers_dir = installers_dir
+        super().__init__(**kwargs)
+
+    def check_admin_privileges(self) -> bool:
+        return True
+
+    def run_command_output(self, command: List[str], timeout: int = 300,
+                           idle_timeout: Optional[float] = None) -> tuple[bool, str, str]:
+        if command and os.path.dirname(command[0]) == self.installers_dir:
+            command = [sys.executable, self.fake_installer] + command
+        return super().run_command_output(command, timeout, idle_timeout)
+
+
+def write_fake_tools(bin_dir: str) -> str:
+    """Crée les faux winget/choco dans `bin_dir` et retourne le chemin du faux installateur"""
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, source in (("winget", FAKE_WINGET), ("choco", FAKE_CHOCO),
+                         ("fake_installer.py", FAKE_INSTALLER)):
+        script = os.path.join(bin_dir, name)
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(f"#!{sys.executable}\n{source}")
+        os.chmod(script, 0o755)
+        if os.name == 'nt' and name != "fake_installer.py":
+            with open(script + ".cmd", 'w', encoding='utf-8') as f:
+                f.write(f'@"{sys.executable}" "{script}" %*\n')
+    return os.path.join(bin_dir, "fake_installer.py")
+
+
+def parse_mix(mix: str) -> List[str]:
+    """Transforme "winget=5,chocolatey=3,custom=2" en cycle de méthodes"""
+    methods = []
+    for part in mix.split(','):
+        method, _, weight = part.partition('=')
+        methods.extend([method.strip()] * int(weight or 1))
+    return methods
+
+
+def build_config(count: int, methods: List[str], server_url: str, work_dir: str,
+                 installer_size: int) -> Dict:
+    """Génère une configuration de `count` logiciels répartis selon `methods`"""
+    software_list = []
+    for index in range(count):
+        method = methods[index % len(methods)]
+        name = f"Bench {method} {index:04d}"
+        software = {"name": name, "method": method, "category": "benchmark"}
+        if method in ("winget", "chocolatey"):
+            software["package_id"] = f"Bench.{method}.{index:04d}"
+        else:
+            filename = f"bench-{index:04d}.exe"
+            software["installer"] = {
+                "type": "custom",
+                "download_url": f"{server_url}/{filename}?size={installer_size}",
+                "filename": filename,
+                "checksum": f"sha256:{synthetic_digest(filename, installer_size)}",
+                "silent_args": ["/S"],
+            }
+        software_list.append(software)
+    return {
+        "base_directories": {
+            "installers": os.path.join(work_dir, "installers"),
+            "temp": os.path.join(work_dir, "temp"),
+        },
+        "cache": {"directory": os.path.join(work_dir, "cache")},
+        # Les échecs simulés sont déterministes : une nouvelle tentative échouerait aussi
+        "retry": {"attempts": 1, "circuit_breaker": {"threshold": 0}},
+        "software_list": software_list,
+    }
+
+
+def peak_rss() -> Optional[int]:
+    """Mémoire résidente maximale du processus, en octets (None si non mesurable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilo-octets sous Linux, octets sous macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ----------------------------------------------------------------------
+# Exécution
+# ----------------------------------------------------------------------
+
+def run_one(args: argparse.Namespace, count: int) -> Dict:
+    """Exécute un scénario dans le processus courant et retourne ses mesures"""
+    work_dir = tempfile.mkdtemp(prefix=f"installer_bench_{count}_")
+    bin_dir = os.path.join(work_dir, "bin")
+    fake_installer = write_fake_tools(bin_dir)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    os.environ["BENCH_LATENCY"] = str(args.latency)
+    os.environ["BENCH_FAILURE_RATE"] = str(args.failure_rate)
+
+    server = InstallerServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        config = build_config(count, parse_mix(args.mix), server.url, work_dir,
+                              args.installer_size_kb * 1024)
+        config_file = os.path.join(work_dir, "bench_config.json")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+
+        # Les journaux, rapports et mesures sont écrits dans le répertoire courant
+        os.chdir(work_dir)
+        installer = BenchmarkInstaller(
+            fake_installer, config["base_directories"]["installers"],
+            serial=args.serial,
+            max_workers=args.max_workers,
+            use_cache=not args.no_cache,
+            batch=args.batch,
+            log_console=False,
+        )
+
+        started = time.perf_counter()
+        installer.run(config_file)
+        wall_time = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "packages": count,
+        "wall_time": wall_time,
+        "packages_per_minute": count / wall_time * 60 if wall_time > 0 else None,
+        "peak_rss": peak_rss(),
+        "bytes_downloaded": server.bytes_served,
+        "installed": len(installer.installed_software),
+        "failed": len(installer.failed_software),
+        "work_dir": work_dir,
+    }
+
+
+def run_isolated(args: argparse.Namespace, count: int) -> Dict:
+    """Exécute un scénario dans un processus neuf, pour que la mémoire maximale lui soit propre"""
+    fd, result_file = tempfile.mkstemp(prefix="installer_bench_", suffix=".json")
+    os.close(fd)
+    try:
+        command = [sys.executable, os.path.abspath(__file__), "--run-one", str(count),
+                   "--result-file", result_file] + scenario_arguments(args)
+        subprocess.run(command, check=True)
+        with open(result_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(result_file)
+
+
+def format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "n/a"
+    return f"{size / (1024 * 1024):.1f} Mo"
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'installateur de logiciels")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Nombre de logiciels de chaque scénario (défaut: 10 100 1000)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Durée simulée d'une installation, en secondes (défaut: 0.05)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Proportion d'installations en échec, entre 0 et 1 (défaut: 0)")
+    parser.add_argument("--installer-size-kb", type=int, default=1024,
+                        help="Taille des installateurs synthétiques en Ko (défaut: 1024)")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Répartition des méthodes d'installation (défaut: {DEFAULT_MIX})")
+    parser.add_argument("--serial", action="store_true", help="Installation en série")
+    parser.add_argument("--max-workers", type=int, help="Nombre maximal d'installations simultanées")
+    parser.add_argument("--batch", action="store_true", help="Installations groupées winget/chocolatey")
+    parser.add_argument("--no-cache", action="store_true", help="Désactive le cache d'installateurs")
+    parser.add_argument("--output", metavar="FICHIER", help="Écrit les résultats au format JSON")
+    parser.add_argument("--run-one", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def scenario_arguments(args: argparse.Namespace) -> List[str]:
+    """Options transmises au processus de chaque scénario"""
+    options = ["--latency", str(args.latency), "--failure-rate", str(args.failure_rate),
+               "--installer-size-kb", str(args.installer_size_kb), "--mix", args.mix]
+    if args.serial:
+        options.append("--serial")
+    if args.max_workers:
+        options += ["--max-workers", str(args.max_workers)]
+    if args.batch:
+        options.append("--batch")
+    if args.no_cache:
+        options.append("--no-cache")
+    return options
+
+
+def main():
+    args = parse_arguments()
+
+    if args.run_one is not None:
+        result = run_one(args, args.run_one)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    results = []
+    print(f"{'Logiciels':>10} {'Durée':>10} {'Log./min':>10} {'RSS max':>10} {'Téléchargé':>12} {'Échecs':>7}")
+    for count in args.sizes:
+        result = run_isolated(args, count)
+        results.append(result)
+        print(f"{result['packages']:>10} {result['wall_time']:>9.2f}s "
+              f"{result['packages_per_minute']:>10.0f} {format_size(result['peak_rss']):>10} "
+              f"{format_size(result['bytes_downloaded']):>12} {result['failed']:>7}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+        print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Vérification des sommes de contrôle des installateurs
+Les fichiers sont hachés par blocs, au fil du téléchargement lorsque c'est possible,
+pour ne jamais relire l'installateur ni le charger entièrement en mémoire
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Préfixes acceptés dans le champ `checksum` de la configuration
+SUPPORTED_ALGORITHMS = ("sha256", "sha512", "sha1")
+
+READ_SIZE = 1024 * 1024
+
+
+class ChecksumError(ValueError):
+    """Somme de contrôle mal formée ou d'un type non supporté"""
+
+
+class UnsupportedChecksumError(ChecksumError):
+    """Somme de contrôle d'un type non supporté (empreinte impossible à vérifier)"""
+
+
+def parse_checksum(value: str) -> Tuple[str, str]:
+    """Découpe `algo:empreinte` en (algorithme, empreinte hexadécimale en minuscules)"""
+    algorithm, separator, digest = value.partition(':')
+    algorithm = algorithm.strip().lower()
+    if not separator or algorithm not in SUPPORTED_ALGORITHMS:
+        raise UnsupportedChecksumError(f"Type de checksum non supporté: {value}")
+
+    digest = digest.strip().lower()
+    expected_length = hashlib.new(algorithm).digest_size * 2
+    if len(digest) != expected_length or any(c not in "0123456789abcdef" for c in digest):
+        raise ChecksumError(f"Checksum {algorithm} mal formé: {value}")
+    return algorithm, digest
+
+
+def file_digest(file_path: str, algorithm: str) -> str:
+    """Calcule l'empreinte d'un fichier par blocs (mémoire constante)"""
+    file_hash = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def copy_digest(source: str, destination: str, algorithm: str) -> str:
+    """Copie un fichier en calculant son empreinte au passage (une seule lecture)"""
+    file_hash = hashlib.new(algorithm)
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        for block in iter(lambda: src.read(READ_SIZE), b''):
+            file_hash.update(block)
+            dst.write(block)
+    return file_hash.hexdigest()
+
+
+def link_verified(source: str, destination: str, algorithm: str, expected: str) -> bool:
+    """Place `source` à `destination` si son empreinte est `expected`
+
+    Un lien physique évite toute copie (seule la vérification relit le fichier) ;
+    sur un autre volume, le fichier est copié et haché en une seule lecture.
+    Retourne False si l'empreinte diffère (`destination` n'est pas modifiée).
+    Les erreurs d'entrée/sortie sont propagées, sans fichier temporaire laissé.
+    """
+    temp_path = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        try:
+            os.link(source, temp_path)
+            digest = file_digest(temp_path, algorithm)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            digest = copy_digest(source, temp_path, algorithm)
+        if digest != expected:
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, destination)
+        return True
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class StreamingHasher:
+    """Hache un fichier segmenté dans l'ordre des octets, au fil de son écriture
+
+    Les octets écrits à la position courante du curseur sont hachés directement
+    depuis la mémoire. Ceux écrits par un autre segment, en avance sur le curseur,
+    sont relus depuis le fichier partiel quand le curseur les atteint (ils sont en
+    général encore dans le cache disque du système).
+    """
+
+    def __init__(self, algorithm: str, segments: List[Dict], part_path: str):
+        self.algorithm = algorithm
+        self.segments = segments
+        self.part_path = part_path
+        self.lock = threading.Lock()
+        # Temps cumulé passé à hacher (mesure de profilage)
+        self.seconds = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Repart du début (flux sans reprise possible)"""
+        with self.lock:
+            self.hash = hashlib.new(self.algorithm)
+            self.cursor = 0
+            self.index = 0
+
+    def feed(self, offset: int, chunk: bytes) -> None:
+        """Signale l'écriture de `chunk` à la position `offset` du fichier"""
+        with self.lock:
+            start = time.perf_counter()
+            self._advance(offset, chunk)
+            self.seconds += time.perf_counter() - start
+
+    def hexdigest(self) -> str:
+        """Termine le hachage une fois tous les segments écrits"""
+        with self.lock:
+            start = time.perf_counter()
+            self._advance()
+            self.seconds += time.perf_counter() - start
+            return self.hash.hexdigest()
+
+    def _advance(self, offset: Optional[int] = None, chunk: Optional[bytes] = None) -> None:
+        reader = None
+        try:
+            while self.index < len(self.segments):
+                segment = self.segments[self.index]
+                available_end = segment["start"] + segment["done"]
+
+                if self.cursor >= available_end:
+                    if segment["end"] is not None and available_end > segment["end"]:
+                        self.index += 1
+                        continue
+                    break
+
+                if chunk is not None and offset == self.cursor:
+                    self.hash.update(chunk)
+                    self.cursor += len(chunk)
+                    chunk = None
+                    continue
+
+                # Rattrapage : octets écrits par un autre segment
+                if reader is None:
+                    reader = open(self.part_path, 'rb')
+                reader.seek(self.cursor)
+                block = reader.read(min(READ_SIZE, available_end - self.cursor))
+                if not block:
+                    break
+                self.hash.update(block)
+                self.cursor += len(block)
+        finally:
+            if reader is not None:
+                reader.close()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Moteur d'exécution des commandes
+Toutes les commandes (gestionnaires, installateurs) partagent une seule boucle
+asyncio exécutée dans un thread dédié. La sortie est lue ligne par ligne au fil
+de l'eau, un délai d'inactivité (aucune sortie) est distinct du délai maximal,
+et l'arborescence complète du processus est tuée en cas d'expiration ou d'annulation.
+Les téléchargements (download_engine) restent sur leur propre pool de threads.
+"""
+
+import asyncio
+import locale
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+# Fréquence de vérification des délais
+WATCH_INTERVAL = 0.5
+# Après la fin du processus, attente maximale de la fin de sa sortie
+DRAIN_TIMEOUT = 2.0
+
+
+class CommandResult:
+    """Résultat d'une commande"""
+
+    __slots__ = ("returncode", "stdout", "stderr", "timeout", "duration")
+
+    def __init__(self, returncode: Optional[int], stdout: str, stderr: str,
+                 timeout: Optional[str] = None, duration: float = 0.0):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        # None, ou la raison de l'arrêt forcé ("délai maximal", "inactivité")
+        self.timeout = timeout
+        self.duration = duration
+
+    @property
+    def success(self) -> bool:
+        return self.timeout is None and self.returncode == 0
+
+
+class CommandEngine:
+    """Exécute les commandes sur une boucle asyncio partagée"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.encoding = locale.getpreferredencoding(False)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                # Sous Windows, la boucle par défaut (Proactor) gère les sous-processus
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="command-engine", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, command: List[str], timeout: Optional[float] = 300,
+               idle_timeout: Optional[float] = None,
+               on_line: Optional[Callable[[str, str], None]] = None) -> Future:
+        """Lance la commande et retourne un Future de CommandResult
+
+        `on_line(stream, line)` est appelé pour chaque ligne lue ("stdout" ou "stderr").
+        Annuler le Future tue le processus et ses descendants.
+        """
+        coroutine = self.execute(command, timeout, idle_timeout, on_line)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def run(self, command: List[str], timeout: Optional[float] = 300,
+            idle_timeout: Optional[float] = None,
+            on_line: Optional[Callable[[str, str], None]] = None) -> CommandResult:
+        """Exécute la commande et attend son résultat (appel bloquant)"""
+        future = self.submit(command, timeout, idle_timeout, on_line)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def shutdown(self) -> None:
+        """Annule les commandes en cours et arrête la boucle"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_all(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    async def execute(self, command: List[str], timeout: Optional[float] = 300,
+                      idle_timeout: Optional[float] = None,
+                      on_line: Optional[Callable[[str, str], None]] = None) -> CommandResult:
+        """Coroutine d'exécution, utilisable directement depuis la boucle partagée"""
+        started = time.monotonic()
+        process = await self._spawn(command)
+        last_output = [time.monotonic()]
+        output = {"stdout": [], "stderr": []}
+
+        async def pump(stream: asyncio.StreamReader, name: str) -> None:
+            while True:
+                raw = await stream.readline()
+                if not raw:
+                    return
+                last_output[0] = time.monotonic()
+                text = raw.decode(self.encoding, errors="replace")
+                output[name].append(text)
+                # Les barres de progression réécrivent la ligne avec \r : seul l'état final compte
+                line = text.rstrip("\r\n").rsplit("\r", 1)[-1]
+                if on_line and line.strip():
+                    on_line(name, line)
+
+        readers = asyncio.gather(pump(process.stdout, "stdout"), pump(process.stderr, "stderr"))
+        # Le processus est surveillé séparément : il peut fermer sa sortie et continuer de tourner.
+        # La fin du processus se lit dans process.returncode : process.wait() attend aussi la
+        # fermeture des tubes, sauf si le processus est déjà terminé quand il est appelé
+        waiter = asyncio.ensure_future(process.wait())
+        reason = None
+        exited_at = None
+        try:
+            while True:
+                await asyncio.wait({readers, waiter}, timeout=WATCH_INTERVAL)
+                if readers.done() and waiter.done():
+                    break
+                now = time.monotonic()
+                if process.returncode is not None:
+                    # Un descendant (service lancé par l'installateur) garde la sortie ouverte
+                    exited_at = exited_at or now
+                    if now - exited_at > DRAIN_TIMEOUT:
+                        break
+                elif timeout is not None and now - started > timeout:
+                    reason = f"délai maximal de {timeout:g}s dépassé"
+                elif idle_timeout is not None and now - last_output[0] > idle_timeout:
+                    reason = f"aucune sortie depuis {idle_timeout:g}s"
+                if reason:
+                    break
+
+            if reason:
+                self._kill_tree(process)
+                await asyncio.wait({readers, waiter}, timeout=DRAIN_TIMEOUT)
+            if not (readers.done() and waiter.done()):
+                readers.cancel()
+                waiter.cancel()
+                await asyncio.gather(readers, waiter, return_exceptions=True)
+                # Ferme les tubes encore détenus par un descendant
+                process._transport.close()
+        except asyncio.CancelledError:
+            self._kill_tree(process)
+            readers.cancel()
+            waiter.cancel()
+            # Récupère l'annulation des tâches (sinon « exception was never retrieved »)
+            await asyncio.gather(readers, waiter, return_exceptions=True)
+            raise
+
+        return CommandResult(process.returncode, "".join(output["stdout"]), "".join(output["stderr"]),
+                             reason, time.monotonic() - started)
+
+    async def _spawn(self, command: List[str]) -> asyncio.subprocess.Process:
+        if os.name == 'nt':
+            # Le shell reste nécessaire sous Windows (commandes .cmd/.bat comme choco)
+            return await asyncio.create_subprocess_shell(
+                subprocess.list2cmdline(command),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
+            )
+        # Nouvelle session : le groupe de processus permet de tuer tous les descendants
+        return await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+
+    def _kill_tree(self, process: asyncio.subprocess.Process) -> None:
+        """Tue le processus et tous ses descendants"""
+        if process.returncode is not None:
+            return
+        try:
+            if os.name == 'nt':
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                               capture_output=True)
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError) as e:
+            self.logger.warning(f"⚠ Impossible de tuer le processus {process.pid}: {e}")
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
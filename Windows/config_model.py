@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Modèle compilé de la configuration
+Le fichier JSON est validé une seule fois (erreurs localisées, par exemple
+`software_list[12] (Firefox).installer.silent_args`), puis compilé en
+enregistrements typés indexés par nom et catégorie. La configuration validée et
+ses index sont mis en cache (format marshal), repérés par la date de
+modification et l'empreinte du fichier : un catalogue de plusieurs milliers
+d'entrées se recharge sans analyse JSON, validation ni compilation des entrées.
+"""
+
+import hashlib
+import json
+import os
+import marshal
+import re
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from atomic_files import atomic_open
+from checksums import ChecksumError, parse_checksum
+from retry_policy import FALLBACK_METHODS
+
+METHODS = ("winget", "chocolatey", "custom", "direct")
+
+DEFAULT_WINGET_ARGS = ["--accept-package-agreements", "--accept-source-agreements", "--silent"]
+DEFAULT_CHOCOLATEY_ARGS = ["-y"]
+# Arguments ajoutés pour réinstaller un paquet déjà présent (entrée modifiée, --incremental) :
+# sans eux, chocolatey ne fait rien et winget échoue faute de mise à jour
+REINSTALL_ARGS = {"winget": ["--force"], "chocolatey": ["--force"]}
+
+# À incrémenter à chaque changement de la validation (invalide le cache)
+COMPILED_VERSION = 6
+
+# Clés d'une politique de nouvelles tentatives (globale, par méthode ou par logiciel)
+RETRY_KEYS = ("attempts", "backoff", "max_delay")
+
+# Sections de configuration dont la valeur doit être un objet
+SECTIONS = ("base_directories", "scheduler", "downloads", "cache", "pipeline", "commands", "retry",
+            "verification")
+
+
+class ConfigError(Exception):
+    """Configuration invalide ; `errors` contient une erreur localisée par ligne"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+class SoftwareEntry(Mapping):
+    """Entrée compilée de `software_list`
+
+    Les champs utiles à l'installation sont résolus une fois pour toutes (arguments
+    silencieux par défaut, dépendances normalisées, checksum analysé, chemins
+    développés). L'entrée reste consultable comme le dictionnaire d'origine
+    (`entry['name']`, `entry.get(...)`). `index` vaut -1 pour une entrée hors de la
+    configuration courante (état de la dernière application).
+    """
+
+    __slots__ = ("raw", "index", "name", "method", "package_id", "category", "tags",
+                 "silent_args", "installer", "checksum", "checksum_error", "depends_on", "conflicts_with",
+                 "base_directory", "installer_download", "expanded")
+
+    def __init__(self, raw: Dict, index: int = -1):
+        installer = raw.get('installer') or {}
+        method = raw.get('method')
+
+        self.raw = raw
+        self.index = index
+        self.name: str = raw['name']
+        self.method: str = method
+        self.package_id: str = raw.get('package_id', self.name)
+        self.category: Optional[str] = raw.get('category')
+        self.tags: Tuple[str, ...] = tuple(raw.get('tags', ()))
+        self.silent_args: List[str] = installer.get('silent_args', default_silent_args(method))
+        self.installer: Dict = installer
+        # (algorithme, empreinte), ou l'erreur d'analyse : la décision (ignorer, refuser)
+        # dépend du mode strict et revient à l'installateur
+        self.checksum: Optional[Tuple[str, str]] = None
+        self.checksum_error: Optional[ChecksumError] = None
+        if installer.get('checksum'):
+            try:
+                self.checksum = parse_checksum(installer['checksum'])
+            except ChecksumError as e:
+                self.checksum_error = e
+        self.depends_on: Tuple[str, ...] = _names(raw.get('depends_on'))
+        self.conflicts_with: Tuple[str, ...] = _names(raw.get('conflicts_with'))
+        # Renseignés par CompiledConfig.expand_entries() (dépendent de l'environnement)
+        self.base_directory: Optional[str] = None
+        self.installer_download: Optional[Tuple[str, str]] = None
+        self.expanded = False
+
+    def __getitem__(self, key):
+        return self.raw[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.raw)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __repr__(self) -> str:
+        return f"SoftwareEntry({self.name!r}, {self.method!r})"
+
+
+def default_silent_args(method: Optional[str]) -> List[str]:
+    """Arguments silencieux par défaut d'une méthode (aucun pour les installateurs personnalisés)"""
+    if method == 'winget':
+        return DEFAULT_WINGET_ARGS
+    if method == 'chocolatey':
+        return DEFAULT_CHOCOLATEY_ARGS
+    return []
+
+
+# (nom → position, catégorie en minuscules → positions) ; mis en cache avec la configuration
+ConfigIndex = Tuple[Dict[str, int], Dict[str, List[int]]]
+
+
+def build_index(software_list: List[Dict]) -> ConfigIndex:
+    """Index des entrées par nom et par catégorie"""
+    by_name: Dict[str, int] = {}
+    by_category: Dict[str, List[int]] = {}
+    for index, software in enumerate(software_list):
+        by_name.setdefault(software['name'], index)
+        category = software.get('category')
+        if category:
+            by_category.setdefault(category.lower(), []).append(index)
+    return by_name, by_category
+
+
+class CompiledConfig:
+    """Configuration validée, avec ses index
+
+    Les entrées ne sont compilées qu'à leur première consultation : recharger un
+    gros catalogue depuis le cache ne coûte que la lecture du cache.
+    """
+
+    __slots__ = ("raw", "software_list", "by_name", "by_category", "base_directories", "expander",
+                 "_entries")
+
+    def __init__(self, raw: Dict, index: Optional[ConfigIndex] = None):
+        self.raw = raw
+        self.software_list: List[Dict] = raw.get('software_list', [])
+        self._entries: List[Optional[SoftwareEntry]] = [None] * len(self.software_list)
+        self.by_name, self.by_category = index or build_index(self.software_list)
+        self.base_directories: Dict[str, str] = {}
+        self.expander: Optional[Callable[[str], str]] = None
+
+    def __len__(self) -> int:
+        return len(self.software_list)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def entry(self, index: int) -> SoftwareEntry:
+        """Entrée compilée à la position `index` de software_list"""
+        entry = self._entries[index]
+        if entry is None:
+            entry = self._entries[index] = SoftwareEntry(self.software_list[index], index)
+        return entry
+
+    def get(self, name: str) -> Optional[SoftwareEntry]:
+        index = self.by_name.get(name)
+        return None if index is None else self.entry(index)
+
+    def in_categories(self, categories: Iterable[str]) -> List[SoftwareEntry]:
+        """Entrées des catégories données (en minuscules), dans l'ordre de la configuration"""
+        indexes = {index for category in categories for index in self.by_category.get(category, ())}
+        return [self.entry(index) for index in sorted(indexes)]
+
+    @property
+    def entries(self) -> List[SoftwareEntry]:
+        return [self.entry(index) for index in range(len(self.software_list))]
+
+    def expand(self, expander: Callable[[str], str]) -> "CompiledConfig":
+        """Développe les dossiers de base ; les entrées le sont à la demande (expand_entries)"""
+        self.expander = expander
+        self.base_directories = {
+            key: expander(value) for key, value in self.raw.get('base_directories', {}).items()
+        }
+        return self
+
+    def expand_entries(self, entries: Iterable[SoftwareEntry]) -> None:
+        """Développe les chemins des entrées (une seule fois chacune)"""
+        expander = self.expander or (lambda path: path)
+        installers_dir = self.base_directories.get('installers', '')
+        for entry in entries:
+            if entry.expanded:
+                continue
+            base_directory = entry.raw.get('base_directory')
+            entry.base_directory = expander(base_directory) if base_directory else None
+            download_url = entry.installer.get('download_url')
+            if entry.installer.get('type') == 'custom' and download_url:
+                filename = entry.installer.get('filename', os.path.basename(download_url))
+                entry.installer_download = (download_url, os.path.join(installers_dir, filename))
+            entry.expanded = True
+
+
+def _names(value) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+# ----------------------------------------------------------------------
+# Validation
+# ----------------------------------------------------------------------
+
+def _is_string_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _validate_numbers(values: Dict, keys: Tuple[str, ...], location: str) -> List[str]:
+    return [f"{location}.{key}: nombre attendu" for key in keys if key in values and not _is_number(values[key])]
+
+
+def _validate_retry(retry: Dict) -> List[str]:
+    """Section `retry` globale : politique par défaut, par méthode et disjoncteurs"""
+    errors = _validate_numbers(retry, RETRY_KEYS, "retry")
+    methods = retry.get('methods')
+    if methods is not None:
+        if not isinstance(methods, dict):
+            errors.append("retry.methods: objet attendu")
+        else:
+            for method, policy in methods.items():
+                if not isinstance(policy, dict):
+                    errors.append(f"retry.methods.{method}: objet attendu")
+                else:
+                    errors.extend(_validate_numbers(policy, RETRY_KEYS, f"retry.methods.{method}"))
+    breaker = retry.get('circuit_breaker')
+    if breaker is not None:
+        if not isinstance(breaker, dict):
+            errors.append("retry.circuit_breaker: objet attendu")
+        else:
+            errors.extend(_validate_numbers(breaker, ("threshold", "cooldown"), "retry.circuit_breaker"))
+    return errors
+
+
+def validate_config(config) -> List[str]:
+    """Retourne la liste des erreurs de la configuration (vide si elle est valide)"""
+    if not isinstance(config, dict):
+        return ["racine: objet JSON attendu"]
+
+    errors = []
+    for section in SECTIONS:
+        if section in config and not isinstance(config[section], dict):
+            errors.append(f"{section}: objet attendu")
+    base_directories = config.get('base_directories')
+    if isinstance(base_directories, dict):
+        for key, value in base_directories.items():
+            if not isinstance(value, str):
+                errors.append(f"base_directories.{key}: chaîne attendue")
+    if isinstance(config.get('retry'), dict):
+        errors.extend(_validate_retry(config['retry']))
+
+    if 'software_list' not in config:
+        # Un catalogue vide validé en silence ferait croire que tout est à jour
+        hint = " (profil Ubuntu `packages` ? il s'utilise avec install_packages.sh)" if 'packages' in config else ""
+        return errors + [f"software_list: liste des logiciels obligatoire{hint}"]
+    software_list = config['software_list']
+    if not isinstance(software_list, list):
+        return errors + ["software_list: liste attendue"]
+    if not software_list:
+        return errors + ["software_list: au moins un logiciel attendu"]
+
+    seen: Dict[str, int] = {}
+    for index, software in enumerate(software_list):
+        location = f"software_list[{index}]"
+        if not isinstance(software, dict):
+            errors.append(f"{location}: objet attendu")
+            continue
+        name = software.get('name')
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{location}.name: nom (chaîne non vide) obligatoire")
+        else:
+            location = f"{location} ({name})"
+            if name in seen:
+                errors.append(f"{location}.name: nom en double (déjà utilisé par software_list[{seen[name]}])")
+            seen.setdefault(name, index)
+        errors.extend(_validate_entry(software, location))
+    return errors
+
+
+def _validate_entry(software: Dict, location: str) -> List[str]:
+    errors = []
+    method = software.get('method')
+    if method not in METHODS:
+        errors.append(f"{location}.method: valeur parmi {', '.join(METHODS)} attendue (trouvé {method!r})")
+
+    for key in ('package_id', 'category', 'description', 'base_directory', 'download_url'):
+        if key in software and not isinstance(software[key], str):
+            errors.append(f"{location}.{key}: chaîne attendue")
+    for key in ('tags', 'installer_args'):
+        if key in software and not _is_string_list(software[key]):
+            errors.append(f"{location}.{key}: liste de chaînes attendue")
+    for key in ('depends_on', 'conflicts_with'):
+        value = software.get(key)
+        if value is not None and not isinstance(value, str) and not _is_string_list(value):
+            errors.append(f"{location}.{key}: nom ou liste de noms attendu")
+
+    retry = software.get('retry')
+    if retry is not None:
+        if not isinstance(retry, dict):
+            errors.append(f"{location}.retry: objet attendu")
+        else:
+            errors.extend(_validate_numbers(retry, RETRY_KEYS, f"{location}.retry"))
+    fallback = software.get('fallback')
+    if fallback is not None:
+        if not isinstance(fallback, dict):
+            errors.append(f"{location}.fallback: objet attendu")
+        else:
+            if fallback.get('method') not in FALLBACK_METHODS:
+                errors.append(f"{location}.fallback.method: valeur parmi {', '.join(FALLBACK_METHODS)} attendue")
+            if 'package_id' in fallback and not isinstance(fallback['package_id'], str):
+                errors.append(f"{location}.fallback.package_id: chaîne attendue")
+            if 'silent_args' in fallback and not _is_string_list(fallback['silent_args']):
+                errors.append(f"{location}.fallback.silent_args: liste de chaînes attendue")
+
+    verify = software.get('verify')
+    if verify is not None:
+        if not isinstance(verify, dict):
+            errors.append(f"{location}.verify: objet attendu")
+        else:
+            for key in ('executable', 'version_pattern'):
+                if key in verify and not isinstance(verify[key], str):
+                    errors.append(f"{location}.verify.{key}: chaîne attendue")
+            if isinstance(verify.get('version_pattern'), str):
+                try:
+                    re.compile(verify['version_pattern'])
+                except re.error as e:
+                    errors.append(f"{location}.verify.version_pattern: expression régulière invalide ({e})")
+            if 'version_command' in verify and not (_is_string_list(verify['version_command'])
+                                                     and verify['version_command']):
+                errors.append(f"{location}.verify.version_command: liste de chaînes non vide attendue")
+            files = verify.get('files')
+            if files is not None and not (isinstance(files, dict)
+                                          and all(isinstance(value, str) for value in files.values())):
+                errors.append(f"{location}.verify.files: objet chemin → checksum attendu")
+
+    if method == 'direct' and not software.get('download_url'):
+        errors.append(f"{location}.download_url: obligatoire pour la méthode direct")
+
+    installer = software.get('installer')
+    if installer is None:
+        if method == 'custom':
+            errors.append(f"{location}.installer: obligatoire pour la méthode custom")
+        return errors
+    if not isinstance(installer, dict):
+        return errors + [f"{location}.installer: objet attendu"]
+
+    for key in ('type', 'download_url', 'filename', 'checksum'):
+        if key in installer and not isinstance(installer[key], str):
+            errors.append(f"{location}.installer.{key}: chaîne attendue")
+    for key in ('silent_args', 'pre_install_commands', 'post_install_commands'):
+        if key in installer and not _is_string_list(installer[key]):
+            errors.append(f"{location}.installer.{key}: liste de chaînes attendue")
+    if method == 'custom' and installer.get('type') != 'custom':
+        errors.append(f"{location}.installer.type: \"custom\" attendu pour la méthode custom")
+    return errors
+
+
+# ----------------------------------------------------------------------
+# Chargement et cache
+# ----------------------------------------------------------------------
+
+def compile_config(config: Dict, source: str = "configuration") -> CompiledConfig:
+    """Valide et compile une configuration déjà chargée"""
+    errors = validate_config(config)
+    if errors:
+        raise ConfigError([f"{source}: {error}" for error in errors])
+    return CompiledConfig(config)
+
+
+def default_cache_directory() -> str:
+    """Dossier du cache des configurations compilées (propre à l'utilisateur)"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'SoftwareInstaller', 'compiled')
+
+
+def load_config(path: str, cache_directory: Optional[str] = None) -> CompiledConfig:
+    """Charge une configuration compilée, depuis le cache si le fichier n'a pas changé
+
+    Le cache est d'abord consulté sur (date de modification, taille) ; si elles
+    diffèrent, l'empreinte du contenu évite de revalider un fichier simplement touché.
+    """
+    cache_directory = cache_directory or default_cache_directory()
+    cache_path = os.path.join(
+        cache_directory, hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:32] + ".bin"
+    )
+    stat = os.stat(path)
+    cached = _read_cache(cache_path)
+    if cached and (cached['mtime'], cached['size']) == (stat.st_mtime_ns, stat.st_size):
+        return CompiledConfig(cached['config'], cached['index'])
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if cached and cached['hash'] == digest:
+        config = cached['config']
+        compiled = CompiledConfig(config, cached['index'])
+    else:
+        try:
+            config = json.loads(content.decode('utf-8-sig'))
+        except UnicodeDecodeError as e:
+            raise ConfigError([f"{path}: encodage invalide ({e})"])
+        except json.JSONDecodeError as e:
+            raise ConfigError([f"{path}:{e.lineno}:{e.colno}: JSON invalide: {e.msg}"])
+        compiled = compile_config(config, path)
+
+    _write_cache(cache_path, {
+        "version": COMPILED_VERSION,
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": digest,
+        "config": config,
+        "index": (compiled.by_name, compiled.by_category),
+    })
+    return compiled
+
+
+def _read_cache(cache_path: str) -> Optional[Dict]:
+    # marshal ne sait reconstruire que des types de base : aucun code n'est exécuté
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, dict) or cached.get('version') != COMPILED_VERSION:
+        return None
+    return cached
+
+
+def _write_cache(cache_path: str, data: Dict) -> None:
+    # Le cache n'est qu'une accélération : une erreur d'écriture est sans conséquence
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with atomic_open(cache_path, binary=True) as f:
+            marshal.dump(data, f)
+    except (OSError, ValueError):
+        pass
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Moteur de téléchargement des installateurs
+Téléchargements concurrents, segmentés (HTTP Range), reprenables, avec
+nouvelles tentatives, limite de bande passante globale, vérification
+de la somme de contrôle au fil de l'écriture, cache d'installateurs et
+paquet hors ligne
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from atomic_files import atomic_write_json
+from checksums import StreamingHasher
+from installer_cache import InstallerCache
+from offline_bundle import OfflineBundle
+
+CHUNK_SIZE = 256 * 1024
+# Taille minimale d'un segment : en dessous, un seul flux suffit
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+# Fréquence de sauvegarde de l'état de reprise
+STATE_SAVE_INTERVAL = 4 * 1024 * 1024
+
+USER_AGENT = "WindowsEasyReinstall/1.0"
+
+
+class DownloadError(Exception):
+    """Erreur de téléchargement (réponse inattendue, taille incohérente...)"""
+
+
+class RateLimiter:
+    """Seau à jetons partagé entre tous les flux pour plafonner la bande passante"""
+
+    def __init__(self, bytes_per_second: float):
+        self.rate = float(bytes_per_second)
+        self.capacity = max(self.rate, CHUNK_SIZE)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        """Bloque jusqu'à ce que `amount` octets puissent être transférés"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_time = (amount - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class DownloadEngine:
+    """Télécharge les fichiers en parallèle, par segments, avec reprise et nouvelles tentatives"""
+
+    def __init__(self, max_workers: int = 4, segments: int = 4,
+                 retries: int = 3, backoff: float = 1.0,
+                 bandwidth_limit: Optional[float] = None, timeout: int = 60,
+                 cache: Optional[InstallerCache] = None,
+                 bundle: Optional[OfflineBundle] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.segments = max(1, int(segments))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = RateLimiter(bandwidth_limit) if bandwidth_limit else None
+        self.cache = cache
+        self.bundle = bundle
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._download_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                 thread_name_prefix="download")
+        self._segment_pool = ThreadPoolExecutor(max_workers=self.max_workers * self.segments,
+                                                thread_name_prefix="segment")
+        self._jobs: Dict[str, Future] = {}
+        self._jobs_lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict, cache: Optional[InstallerCache] = None,
+                    bundle: Optional[OfflineBundle] = None,
+                    logger: Optional[logging.Logger] = None) -> "DownloadEngine":
+        """Crée le moteur à partir de la section `downloads` de la configuration"""
+        bandwidth_kbps = config.get('bandwidth_limit_kbps')
+        return cls(
+            max_workers=config.get('max_workers', 4),
+            segments=config.get('segments', 4),
+            retries=config.get('retries', 3),
+            backoff=config.get('backoff', 1.0),
+            bandwidth_limit=bandwidth_kbps * 1024 if bandwidth_kbps else None,
+            timeout=config.get('timeout', 60),
+            cache=cache,
+            bundle=bundle,
+            logger=logger
+        )
+
+    def prefetch(self, url: str, destination: str,
+                 checksum: Optional[Tuple[str, str]] = None) -> Future:
+        """Lance le téléchargement en arrière-plan (sans doublon pour une même destination)
+
+        `checksum` est un couple (algorithme, empreinte) vérifié pendant le transfert.
+        """
+        destination = os.path.abspath(destination)
+        with self._jobs_lock:
+            job = self._jobs.get(destination)
+            if job is None:
+                job = self._download_pool.submit(self._download, url, destination, checksum)
+                self._jobs[destination] = job
+            return job
+
+    def download(self, url: str, destination: str,
+                 checksum: Optional[Tuple[str, str]] = None) -> bool:
+        """Télécharge un fichier et attend la fin (réutilise un préchargement en cours)"""
+        job = self.prefetch(url, destination, checksum)
+        try:
+            return job.result()
+        finally:
+            # Un appel ultérieur relance un téléchargement neuf
+            with self._jobs_lock:
+                if self._jobs.get(os.path.abspath(destination)) is job:
+                    del self._jobs[os.path.abspath(destination)]
+
+    def download_stats(self, destination: str) -> Optional[Dict]:
+        """Retourne (une seule fois) les mesures du dernier téléchargement vers `destination`
+
+        Clés : source (bundle/cache/network), bytes, started (horloge perf_counter),
+        seconds, hash_seconds.
+        """
+        with self._jobs_lock:
+            return self._stats.pop(os.path.abspath(destination), None)
+
+    def shutdown(self) -> None:
+        """Arrête les pools, les préchargements non démarrés sont annulés"""
+        self._download_pool.shutdown(wait=True, cancel_futures=True)
+        self._segment_pool.shutdown(wait=True, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Téléchargement
+    # ------------------------------------------------------------------
+
+    def _request(self, url: str, start: Optional[int] = None, end: Optional[int] = None):
+        """Ouvre une requête HTTP, éventuellement limitée à une plage d'octets"""
+        headers = {"User-Agent": USER_AGENT}
+        if start is not None:
+            headers["Range"] = f"bytes={start}-" + ("" if end is None else str(end))
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout)
+
+    def _with_retries(self, label: str, func, *args):
+        """Appelle `func` avec nouvelles tentatives, attente exponentielle et gigue"""
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except (urllib.error.URLError, OSError, DownloadError) as e:
+                # Les erreurs HTTP 4xx ne sont pas transitoires
+                if isinstance(e, urllib.error.HTTPError) and 400 <= e.code < 500 and e.code != 429:
+                    raise
+                if attempt >= self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                self.logger.warning(f"⚠ {label}: {e}, nouvelle tentative {attempt}/{self.retries} dans {delay:.1f}s")
+                time.sleep(delay)
+
+    def _probe(self, url: str) -> Tuple[Optional[int], bool, Optional[str]]:
+        """Retourne la taille, le support des plages et l'ETag d'une ressource"""
+        return self._with_retries(url, self._probe_once, url)
+
+    def _probe_once(self, url: str) -> Tuple[Optional[int], bool, Optional[str]]:
+        with self._request(url, 0, 0) as response:
+            etag = response.headers.get("ETag")
+            if response.status == 206:
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rpartition("/")[2]
+                return (int(total) if total.isdigit() else None), True, etag
+            length = response.headers.get("Content-Length")
+            return (int(length) if length and length.isdigit() else None), False, etag
+
+    def _download(self, url: str, destination: str,
+                  checksum: Optional[Tuple[str, str]] = None) -> bool:
+        """Télécharge `url` dans `destination` via un fichier partiel reprenable"""
+        part_path = destination + ".part"
+        state_path = part_path + ".json"
+        filename = os.path.basename(destination)
+        started = time.perf_counter()
+        try:
+            # Le paquet hors ligne passe avant tout : aucun accès réseau
+            if self.bundle and url in self.bundle and self.bundle.materialize(url, destination, checksum):
+                self.logger.info(f"✓ Installateur trouvé dans le paquet hors ligne: {filename}")
+                self._record_stats(destination, "bundle", started)
+                return True
+
+            # Avec un checksum, un objet en cache évite tout accès réseau
+            if self.cache and checksum and self._from_cache(checksum, url, None, destination):
+                self._record_stats(destination, "cache", started)
+                return True
+
+            size, ranged, etag = self._probe(url)
+            if self.cache and not checksum and self._from_cache(None, url, etag, destination):
+                self._record_stats(destination, "cache", started)
+                return True
+
+            # L'empreinte sert aussi de clé de cache : on la calcule même sans checksum attendu
+            hash_algorithm = checksum[0] if checksum else ("sha256" if self.cache else None)
+
+            state = self._load_state(state_path, url, size, etag) if ranged and size else None
+
+            if state is None:
+                state = {
+                    "url": url,
+                    "size": size,
+                    "etag": etag,
+                    "segments": self._plan_segments(size if ranged else None),
+                }
+                with open(part_path, "wb") as f:
+                    if size:
+                        f.truncate(size)
+            else:
+                done = sum(segment["done"] for segment in state["segments"])
+                self.logger.info(f"Reprise du téléchargement de {filename} ({done}/{size} octets)")
+
+            state_lock = threading.Lock()
+            segments = state["segments"]
+            hasher = StreamingHasher(hash_algorithm, segments, part_path) if hash_algorithm else None
+            if len(segments) == 1:
+                self._fetch_segment(url, part_path, state_path, state, state_lock, segments[0], ranged, hasher)
+            else:
+                futures = [
+                    self._segment_pool.submit(self._fetch_segment, url, part_path, state_path,
+                                              state, state_lock, segment, ranged, hasher)
+                    for segment in segments
+                ]
+                for future in futures:
+                    future.result()
+
+            received = sum(segment["done"] for segment in segments)
+            if size is not None and received != size:
+                raise DownloadError(f"taille incohérente ({received}/{size} octets)")
+
+            digest = hasher.hexdigest() if hasher is not None else None
+            if checksum:
+                if digest != checksum[1]:
+                    self.logger.error(f"✗ Checksum invalide: {filename}")
+                    self._discard(part_path, state_path)
+                    return False
+                self.logger.info(f"✓ Checksum vérifié: {filename}")
+
+            os.replace(part_path, destination)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+
+            self._record_stats(destination, "network", started, received,
+                               hasher.seconds if hasher is not None else 0.0)
+            # Sans checksum ni ETag, lookup() ne pourrait jamais retrouver l'objet
+            if self.cache and (checksum or etag):
+                self.cache.store(destination, hash_algorithm, digest, url, etag)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"✗ Erreur téléchargement {filename}: {e}")
+            return False
+
+    def _from_cache(self, checksum: Optional[Tuple[str, str]], url: str,
+                    etag: Optional[str], destination: str) -> bool:
+        """Copie l'installateur depuis le cache s'il y est (et s'il est intact)"""
+        key = self.cache.lookup(checksum, url, etag)
+        if key is None or not self.cache.materialize(key, destination):
+            return False
+        self.logger.info(f"✓ Installateur trouvé dans le cache: {os.path.basename(destination)}")
+        return True
+
+    def _record_stats(self, destination: str, source: str, started: float,
+                      received: Optional[int] = None, hash_seconds: float = 0.0) -> None:
+        stats = {
+            "source": source,
+            "bytes": received if received is not None else os.path.getsize(destination),
+            "started": started,
+            "seconds": time.perf_counter() - started,
+            "hash_seconds": hash_seconds,
+        }
+        with self._jobs_lock:
+            self._stats[destination] = stats
+
+    def _plan_segments(self, size: Optional[int]) -> List[Dict]:
+        """Découpe une ressource de taille connue en segments contigus"""
+        if not size:
+            return [{"start": 0, "end": None, "done": 0}]
+        count = max(1, min(self.segments, size // MIN_SEGMENT_SIZE))
+        step = size // count
+        segments = []
+        for index in range(count):
+            start = index * step
+            end = size - 1 if index == count - 1 else start + step - 1
+            segments.append({"start": start, "end": end, "done": 0})
+        return segments
+
+    def _fetch_segment(self, url: str, part_path: str, state_path: str, state: Dict,
+                       state_lock: threading.Lock, segment: Dict, ranged: bool,
+                       hasher: Optional[StreamingHasher] = None) -> None:
+        """Télécharge un segment, reprend là où il s'est arrêté en cas d'erreur"""
+        self._with_retries(f"{url} (octet {segment['start']})", self._fetch_segment_once,
+                           url, part_path, state_path, state, state_lock, segment, ranged, hasher)
+
+    def _fetch_segment_once(self, url: str, part_path: str, state_path: str, state: Dict,
+                            state_lock: threading.Lock, segment: Dict, ranged: bool,
+                            hasher: Optional[StreamingHasher]) -> None:
+        if not ranged:
+            # Sans support des plages, on repart du début à chaque tentative
+            segment["done"] = 0
+            if hasher is not None:
+                hasher.reset()
+        offset = segment["start"] + segment["done"]
+        if segment["end"] is not None and offset > segment["end"]:
+            return
+
+        with self._request(url, offset if ranged else None, segment["end"] if ranged else None) as response:
+            if ranged and response.status != 206:
+                raise DownloadError(f"plage ignorée par le serveur (HTTP {response.status})")
+            # Écriture non tamponnée : les octets sont visibles du hacheur dès l'écriture
+            with open(part_path, "r+b" if ranged else "wb", buffering=0) as f:
+                f.seek(offset)
+                unsaved = 0
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if self.limiter:
+                        self.limiter.consume(len(chunk))
+                    chunk_offset = segment["start"] + segment["done"]
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[f.write(view):]
+                    segment["done"] += len(chunk)
+                    if hasher is not None:
+                        hasher.feed(chunk_offset, chunk)
+                    unsaved += len(chunk)
+                    if ranged and unsaved >= STATE_SAVE_INTERVAL:
+                        self._save_state(state_path, state, state_lock)
+                        unsaved = 0
+        if ranged:
+            self._save_state(state_path, state, state_lock)
+
+        end = segment["end"] if segment["end"] is not None else (state["size"] or 0) - 1
+        if segment["start"] + segment["done"] <= end:
+            raise DownloadError(f"connexion interrompue à l'octet {segment['start'] + segment['done']}")
+
+    # ------------------------------------------------------------------
+    # État de reprise
+    # ------------------------------------------------------------------
+
+    def _discard(self, part_path: str, state_path: str) -> None:
+        """Supprime un fichier partiel inutilisable et son état"""
+        for path in (part_path, state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _save_state(self, state_path: str, state: Dict, state_lock: threading.Lock) -> None:
+        """Écrit l'état des segments de manière atomique"""
+        with state_lock:
+            atomic_write_json(state_path, state, indent=None)
+
+    def _load_state(self, state_path: str, url: str, size: Optional[int],
+                    etag: Optional[str]) -> Optional[Dict]:
+        """Charge l'état d'un téléchargement partiel s'il correspond toujours à la ressource"""
+        part_path = state_path[:-len(".json")]
+        if not (os.path.exists(state_path) and os.path.exists(part_path)):
+            return None
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != url or state.get("size") != size or state.get("etag") != etag:
+            self.logger.info(f"Fichier partiel obsolète ignoré: {os.path.basename(part_path)}")
+            return None
+        return state
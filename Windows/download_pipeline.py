@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Pipeline téléchargement → vérification → installation
+Les installateurs sont téléchargés (et vérifiés au fil du transfert) en avance
+sur les installations, dans l'ordre du plan, mais au plus `depth` à la fois :
+l'installateur suivant est prêt quand le précédent se termine, sans que le
+réseau ni le disque ne soient sollicités pour tout le plan d'un coup.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from download_engine import DownloadEngine
+
+# Installateurs en cours de téléchargement ou prêts, pas encore installés. Une
+# profondeur supérieure à la concurrence des installations personnalisées
+# garantit qu'un installateur attend toujours la fin du précédent.
+DEFAULT_DEPTH = 3
+
+# (nom du logiciel, URL, chemin local, checksum (algorithme, empreinte) ou None)
+PipelineItem = Tuple[str, str, str, Optional[Tuple[str, str]]]
+
+
+class DownloadPipeline:
+    """File bornée entre l'étape de téléchargement et l'étape d'installation"""
+
+    def __init__(self, downloader: DownloadEngine, depth: int = DEFAULT_DEPTH,
+                 logger: Optional[logging.Logger] = None):
+        self.downloader = downloader
+        self.depth = max(1, int(depth))
+        self.logger = logger or logging.getLogger(__name__)
+        self._pending: "OrderedDict[str, PipelineItem]" = OrderedDict()
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def start(self, items: List[PipelineItem]) -> None:
+        """Met les téléchargements en file (dans l'ordre du plan) et lance les premiers"""
+        with self._lock:
+            for item in items:
+                self._pending[item[0]] = item
+            self._fill()
+
+    def claim(self, name: str) -> None:
+        """Appelé au début de l'installation : lance le téléchargement s'il n'a pas commencé"""
+        with self._lock:
+            item = self._pending.pop(name, None)
+            if item is not None:
+                # Logiciel prêt avant son tour (ordre des dépendances) : il passe devant
+                self._launch(item)
+
+    def release(self, name: str) -> None:
+        """Appelé quand le logiciel est installé, en échec ou ignoré : libère sa place"""
+        with self._lock:
+            self._pending.pop(name, None)
+            self._active.discard(name)
+            self._fill()
+
+    def _fill(self) -> None:
+        while self._pending and len(self._active) < self.depth:
+            _, item = self._pending.popitem(last=False)
+            self._launch(item)
+
+    def _launch(self, item: PipelineItem) -> None:
+        name, url, destination, checksum = item
+        self._active.add(name)
+        self.downloader.prefetch(url, destination, checksum)
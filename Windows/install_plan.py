@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Plan d'installation dépendant des relations entre logiciels
+Construit un graphe orienté acyclique à partir des champs `depends_on` et
+`conflicts_with` de la liste `software_list`, puis un ordre topologique
+"""
+
+import heapq
+from typing import Dict, List, Optional, Set
+
+from config_model import SoftwareEntry
+
+# Ordre historique des passes d'installation, utilisé pour départager les
+# logiciels indépendants afin que le mode séquentiel reste inchangé
+METHOD_ORDER = ["winget", "chocolatey", "custom", "direct"]
+
+
+class PlanError(Exception):
+    """Erreur de construction du plan (cycle, dépendance inconnue, conflit...)"""
+
+
+class InstallPlan:
+    """Graphe de dépendances et ordre topologique des installations"""
+
+    def __init__(self, packages: List[SoftwareEntry], dependencies: Dict[str, List[str]],
+                 order: List[SoftwareEntry]):
+        self.packages = {software['name']: software for software in packages}
+        self.dependencies = dependencies
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def dependencies_of(self, name: str) -> List[str]:
+        """Retourne les dépendances directes d'un logiciel"""
+        return self.dependencies.get(name, [])
+
+
+def _find_cycle(remaining: Set[str], dependencies: Dict[str, List[str]]) -> List[str]:
+    """Retourne un cycle parmi les noeuds restants après le tri topologique"""
+    start = min(remaining)
+    path: List[str] = []
+    seen: Dict[str, int] = {}
+    current: Optional[str] = start
+    while current not in seen:
+        seen[current] = len(path)
+        path.append(current)
+        current = next(dep for dep in dependencies[current] if dep in remaining)
+    return path[seen[current]:] + [current]
+
+
+def build_install_plan(software_list: List[SoftwareEntry]) -> InstallPlan:
+    """Construit le plan d'installation et vérifie sa cohérence"""
+    packages: Dict[str, SoftwareEntry] = {}
+    position: Dict[str, tuple] = {}
+    for index, software in enumerate(software_list):
+        name = software.name
+        if name in packages:
+            raise PlanError(f"Logiciel déclaré plusieurs fois: {name}")
+        packages[name] = software
+        method = software.method
+        method_rank = METHOD_ORDER.index(method) if method in METHOD_ORDER else len(METHOD_ORDER)
+        position[name] = (method_rank, index)
+
+    dependencies: Dict[str, List[str]] = {}
+    for name, software in packages.items():
+        deps = list(software.depends_on)
+        for dep in deps:
+            if dep not in packages:
+                raise PlanError(f"{name} dépend de {dep}, absent de la configuration")
+            if dep == name:
+                raise PlanError(f"{name} dépend de lui-même")
+        dependencies[name] = deps
+
+        for other in software.conflicts_with:
+            if other in packages:
+                raise PlanError(f"{name} est en conflit avec {other}, les deux sont dans la configuration")
+
+    # Tri topologique de Kahn, les noeuds prêts sont pris dans l'ordre historique
+    in_degree = {name: len(set(deps)) for name, deps in dependencies.items()}
+    dependents: Dict[str, Set[str]] = {name: set() for name in packages}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].add(name)
+
+    ready = [(position[name], name) for name, degree in in_degree.items() if degree == 0]
+    heapq.heapify(ready)
+    order: List[SoftwareEntry] = []
+    while ready:
+        _, name = heapq.heappop(ready)
+        order.append(packages[name])
+        for dependent in dependents[name]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                heapq.heappush(ready, (position[dependent], dependent))
+
+    if len(order) != len(packages):
+        remaining = {name for name, degree in in_degree.items() if degree > 0}
+        cycle = _find_cycle(remaining, dependencies)
+        raise PlanError(f"Cycle de dépendances détecté: {' → '.join(cycle)}")
+
+    return InstallPlan(list(packages.values()), dependencies, order)
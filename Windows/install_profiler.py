@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Mesure du temps passé par logiciel et par phase
+Chaque phase (attente, téléchargement, hachage, installation, post-installation)
+est enregistrée comme un intervalle, exportable en JSON et au format Chrome
+trace-event (chrome://tracing, Perfetto) pour visualiser le chemin critique.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from log_pipeline import log_context
+
+# Phases mesurées, dans l'ordre du cycle de vie d'un logiciel
+QUEUE_WAIT = "queue_wait"
+PRE_INSTALL = "pre_install"
+DOWNLOAD = "download"
+HASH = "hash"
+INSTALL = "install"
+POST_INSTALL = "post_install"
+
+# L'attente en file n'occupe aucun worker : elle n'entre pas dans le temps actif
+IDLE_PHASES = (QUEUE_WAIT,)
+
+# Le hachage se fait pendant le téléchargement : il n'ajoute pas de temps
+NESTED_PHASES = (HASH,)
+
+# Les téléchargements (préchargés) peuvent chevaucher l'attente en file :
+# ils ont leur propre groupe de lignes dans la trace
+NETWORK_PHASES = (DOWNLOAD, HASH)
+
+
+class InstallProfiler:
+    """Collecte les intervalles de chaque phase, sûr entre threads"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, package: str, phase: str, **fields):
+        """Mesure le bloc ; le dictionnaire fourni peut être complété (octets, code retour...)"""
+        start = time.perf_counter()
+        try:
+            with log_context(phase=phase):
+                yield fields
+        finally:
+            self.add(package, phase, start, time.perf_counter() - start, **fields)
+
+    def add(self, package: str, phase: str, start: float, duration: float, **fields) -> None:
+        """Enregistre une phase commencée à `start` (horloge perf_counter)"""
+        event = {
+            "package": package,
+            "phase": phase,
+            "start": max(0.0, start - self.origin),
+            "duration": max(0.0, duration),
+            "thread": threading.current_thread().name,
+        }
+        event.update({key: value for key, value in fields.items() if value is not None})
+        with self._lock:
+            self.events.append(event)
+
+    def add_wait(self, package: str, seconds: float) -> None:
+        """Enregistre l'attente en file qui vient de se terminer"""
+        self.add(package, QUEUE_WAIT, time.perf_counter() - seconds, seconds)
+
+    # ------------------------------------------------------------------
+    # Agrégats
+    # ------------------------------------------------------------------
+
+    def packages(self) -> Dict[str, Dict[str, float]]:
+        """Durée cumulée de chaque phase, par logiciel"""
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for event in self.events:
+                phases = totals.setdefault(event["package"], {})
+                phases[event["phase"]] = phases.get(event["phase"], 0.0) + event["duration"]
+        return totals
+
+    def summary(self, top: int = 10) -> Dict[str, List[Tuple[str, float]]]:
+        """Logiciels les plus lents (temps actif) et phases les plus coûteuses (tous logiciels)"""
+        packages = self.packages()
+        busy = {
+            name: sum(seconds for phase, seconds in phases.items()
+                      if phase not in IDLE_PHASES + NESTED_PHASES)
+            for name, phases in packages.items()
+        }
+        by_phase: Dict[str, float] = {}
+        for phases in packages.values():
+            for phase, seconds in phases.items():
+                by_phase[phase] = by_phase.get(phase, 0.0) + seconds
+        return {
+            "packages": sorted(busy.items(), key=lambda item: item[1], reverse=True)[:top],
+            "phases": sorted(by_phase.items(), key=lambda item: item[1], reverse=True),
+        }
+
+    # ------------------------------------------------------------------
+    # Exports
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["start"])
+        return {
+            "started_at": self.started_at,
+            "total_seconds": time.perf_counter() - self.origin,
+            "packages": self.packages(),
+            "events": events,
+        }
+
+    def export_json(self, path: str) -> None:
+        """Écrit les mesures détaillées au format JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Écrit les mesures au format Chrome trace-event (une ligne par logiciel)"""
+        trace = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "Installations"}},
+            {"name": "process_name", "ph": "M", "pid": 2, "args": {"name": "Téléchargements"}},
+        ]
+        lanes: Dict[str, int] = {}
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["start"])
+        for event in events:
+            package = event["package"]
+            if package not in lanes:
+                lanes[package] = len(lanes) + 1
+                for pid in (1, 2):
+                    trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": lanes[package],
+                                  "args": {"name": package}})
+            args = {key: value for key, value in event.items()
+                    if key not in ("package", "phase", "start", "duration")}
+            trace.append({
+                "name": event["phase"],
+                "cat": event["phase"],
+                "ph": "X",
+                "ts": round(event["start"] * 1_000_000),
+                "dur": round(event["duration"] * 1_000_000),
+                "pid": 2 if event["phase"] in NETWORK_PHASES else 1,
+                "tid": lanes[package],
+                "args": dict(args, package=package),
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
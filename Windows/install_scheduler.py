@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Ordonnanceur d'installations parallèles
+Exécute les installations dans un pool de workers borné, avec une limite
+de concurrence distincte pour chaque gestionnaire (winget, chocolatey, custom, direct)
+et le respect des dépendances entre logiciels. Les logiciels compatibles prêts
+au même moment peuvent être regroupés en une seule invocation du gestionnaire.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Hashable, List, Optional
+
+# Limites par défaut : winget et chocolatey prennent un verrou global côté
+# gestionnaire, on ne lance donc qu'une installation à la fois pour chacun
+DEFAULT_CONCURRENCY = {
+    "winget": 1,
+    "chocolatey": 1,
+    "custom": 2,
+    "direct": 2,
+}
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BATCH_SIZE = 10
+
+# Installations simultanées, tous gestionnaires confondus : Windows Installer
+# n'exécute qu'une installation MSI à la fois (les suivantes échouent avec le
+# code 1618). Seule la commande d'installation est limitée, les téléchargements,
+# inventaires et commandes pré/post-installation continuent en parallèle.
+DEFAULT_MAX_INSTALLS = 1
+
+
+class InstallScheduler:
+    """Répartit les installations sur un pool de workers en respectant les limites par gestionnaire"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 concurrency: Optional[Dict[str, int]] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_installs: int = DEFAULT_MAX_INSTALLS,
+                 logger: Optional[logging.Logger] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.batch_size = max(1, int(batch_size))
+        self.max_installs = max(1, int(max_installs))
+        self.concurrency = dict(DEFAULT_CONCURRENCY)
+        if concurrency:
+            self.concurrency.update({k: max(1, int(v)) for k, v in concurrency.items()})
+        self.logger = logger or logging.getLogger(__name__)
+        # Places occupées par gestionnaire, partagées entre le répartiteur et les workers
+        self._running: Dict[str, int] = {}
+        self._slots = threading.Condition()
+        self._local = threading.local()
+        self._installs = threading.BoundedSemaphore(self.max_installs)
+
+    def limit_for(self, key: str) -> int:
+        """Retourne la limite de concurrence d'un gestionnaire"""
+        return min(self.concurrency.get(key, 1), self.max_workers)
+
+    def run(self, items: List[Dict], install_fn: Callable[[Dict], bool],
+            key_fn: Callable[[Dict], str],
+            dependencies: Optional[Dict[str, List[str]]] = None,
+            skip_fn: Optional[Callable[[Dict, List[str]], None]] = None,
+            batch_fn: Optional[Callable[[List[Dict]], Dict[str, bool]]] = None,
+            batch_key_fn: Optional[Callable[[Dict], Optional[Hashable]]] = None,
+            start_fn: Optional[Callable[[Dict, float], None]] = None) -> Dict[str, Optional[bool]]:
+        """Installe les éléments et retourne le résultat par nom de logiciel
+
+        Un élément n'est lancé qu'une fois toutes ses dépendances installées avec
+        succès. Si une dépendance échoue (ou est absente de `items`), l'élément est
+        ignoré, son résultat vaut None et `skip_fn` est appelé avec les dépendances
+        manquantes. Les branches indépendantes continuent normalement.
+
+        Avec `batch_fn`, les éléments prêts d'un même gestionnaire ayant la même clé
+        `batch_key_fn` (None = non regroupable) sont installés ensemble ; `batch_fn`
+        retourne le résultat de chaque élément du lot.
+
+        `start_fn` est appelé au lancement de chaque élément avec le temps (en
+        secondes) passé en file depuis que ses dépendances sont satisfaites.
+        """
+        dependencies = dependencies or {}
+        names = {item['name'] for item in items}
+        results: Dict[str, Optional[bool]] = {}
+
+        # Dépendances restantes et dépendants directs de chaque élément
+        waiting: Dict[str, set] = {}
+        dependents: Dict[str, List[Dict]] = {}
+        pending: Dict[str, deque] = {}
+        ready_at: Dict[str, float] = {}
+        for item in items:
+            deps = set(dependencies.get(item['name'], []))
+            waiting[item['name']] = deps
+            for dep in deps:
+                dependents.setdefault(dep, []).append(item)
+
+        def settle(name: str, success: Optional[bool]) -> None:
+            """Enregistre un résultat et débloque ou ignore les dépendants"""
+            results[name] = success
+            for dependent in dependents.get(name, []):
+                dependent_name = dependent['name']
+                if dependent_name in results:
+                    continue
+                if not success:
+                    failed = [dep for dep in dependencies.get(dependent_name, [])
+                              if dep in results and not results[dep]]
+                    if skip_fn:
+                        skip_fn(dependent, failed)
+                    settle(dependent_name, None)
+                    continue
+                waiting[dependent_name].discard(name)
+                if not waiting[dependent_name]:
+                    enqueue(dependent)
+
+        def enqueue(item: Dict) -> None:
+            ready_at[item['name']] = time.perf_counter()
+            pending.setdefault(key_fn(item), deque()).append(item)
+
+        # Les dépendances absentes de la liste sont considérées comme en échec
+        for item in items:
+            missing = [dep for dep in waiting[item['name']] if dep not in names]
+            if missing and item['name'] not in results:
+                if skip_fn:
+                    skip_fn(item, missing)
+                settle(item['name'], None)
+        for item in items:
+            if item['name'] not in results and not waiting[item['name']]:
+                enqueue(item)
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="installer") as executor:
+            while pending or futures:
+                self._dispatch(executor, pending, futures, install_fn,
+                               batch_fn, batch_key_fn, start_fn, ready_at)
+
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, batch = futures.pop(future)
+                    try:
+                        if len(batch) == 1:
+                            batch_results = {batch[0]['name']: bool(future.result())}
+                        else:
+                            batch_results = future.result()
+                    except Exception as e:
+                        names_in_batch = ', '.join(item['name'] for item in batch)
+                        self.logger.error(f"✗ Exception pendant l'installation de {names_in_batch}: {e}")
+                        batch_results = {}
+                    for item in batch:
+                        settle(item['name'], bool(batch_results.get(item['name'], False)))
+
+        return results
+
+    @contextmanager
+    def slot(self, key: str):
+        """Occupe une place du gestionnaire `key` pendant le bloc (repli vers un autre gestionnaire)
+
+        Le worker rend d'abord la place de son propre gestionnaire et la reprend à la
+        sortie : il n'en détient jamais deux à la fois, ce qui exclut l'interblocage
+        entre deux replis croisés.
+        """
+        current = getattr(self._local, 'key', None)
+        if key == current:
+            yield
+            return
+        self._swap(current, key)
+        try:
+            yield
+        finally:
+            self._swap(key, current)
+
+    @contextmanager
+    def install_slot(self):
+        """Occupe une des `max_installs` places d'installation pendant le bloc
+
+        Réentrant : une commande d'installation lancée depuis un bloc qui détient
+        déjà une place ne la redemande pas.
+        """
+        if getattr(self._local, 'installing', False):
+            yield
+            return
+        with self._installs:
+            self._local.installing = True
+            try:
+                yield
+            finally:
+                self._local.installing = False
+
+    def _swap(self, released: Optional[str], acquired: Optional[str]) -> None:
+        with self._slots:
+            if released is not None:
+                self._running[released] -= 1
+                self._slots.notify_all()
+            if acquired is not None:
+                self._slots.wait_for(lambda: self._running.get(acquired, 0) < self.limit_for(acquired))
+                self._running[acquired] = self._running.get(acquired, 0) + 1
+
+    def _execute(self, key: str, fn: Callable, arg):
+        """Exécute un élément (ou un lot) dans un worker et libère sa place à la fin"""
+        self._local.key = key
+        try:
+            return fn(arg)
+        finally:
+            self._local.key = None
+            self._swap(key, None)
+
+    def _dispatch(self, executor, pending, futures, install_fn,
+                  batch_fn=None, batch_key_fn=None, start_fn=None, ready_at=None) -> None:
+        """Soumet les éléments en attente tant que les limites le permettent"""
+        progressed = True
+        while progressed and len(futures) < self.max_workers:
+            progressed = False
+            # Tourniquet entre gestionnaires pour ne pas en affamer un
+            for key in list(pending):
+                if len(futures) >= self.max_workers:
+                    break
+                with self._slots:
+                    if self._running.get(key, 0) >= self.limit_for(key):
+                        continue
+                    self._running[key] = self._running.get(key, 0) + 1
+                queue = pending[key]
+                item = queue.popleft()
+                batch = [item]
+                if batch_fn and batch_key_fn:
+                    batch_key = batch_key_fn(item)
+                    if batch_key is not None:
+                        batch.extend(self._take_batch(queue, batch_key, batch_key_fn))
+                if not queue:
+                    del pending[key]
+                if start_fn:
+                    now = time.perf_counter()
+                    for started in batch:
+                        start_fn(started, now - ready_at.get(started['name'], now))
+                if len(batch) == 1:
+                    futures[executor.submit(self._execute, key, install_fn, item)] = (key, batch)
+                else:
+                    futures[executor.submit(self._execute, key, batch_fn, batch)] = (key, batch)
+                progressed = True
+
+    def _take_batch(self, queue: deque, batch_key: Hashable,
+                    batch_key_fn: Callable[[Dict], Optional[Hashable]]) -> List[Dict]:
+        """Retire de la file les éléments compatibles avec le lot (dans la limite de taille)"""
+        taken, kept = [], deque()
+        while queue:
+            candidate = queue.popleft()
+            if len(taken) < self.batch_size - 1 and batch_key_fn(candidate) == batch_key:
+                taken.append(candidate)
+            else:
+                kept.append(candidate)
+        queue.extend(kept)
+        return taken
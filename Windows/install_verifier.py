@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Vérification des logiciels installés
+Après les installations, chaque logiciel est vérifié en parallèle : dossier de
+base, exécutable attendu, commande de version et empreintes de fichiers
+(section `verify` de l'entrée). Les empreintes et les versions sont mises en
+cache par chemin + date de modification : revérifier une machine inchangée ne
+relit aucun fichier et ne lance aucune commande. Le résultat est un rapport
+de santé JSON.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from atomic_files import atomic_write_json
+from checksums import ChecksumError, file_digest, parse_checksum
+from command_engine import CommandEngine
+
+DEFAULT_CACHE_FILE = "verification_cache.json"
+DEFAULT_REPORT_FILE = "health_report.json"
+DEFAULT_VERIFY_WORKERS = 8
+DEFAULT_VERSION_TIMEOUT = 30
+
+# Vérifications
+DIRECTORY = "directory"
+EXECUTABLE = "executable"
+VERSION = "version"
+HASH = "hash"
+
+# (nom du logiciel, dossier de base développé ou None, section `verify` de l'entrée)
+VerifyTarget = Tuple[str, Optional[str], Dict]
+
+
+def _stamp(path: str) -> Optional[List[int]]:
+    """Date de modification et taille d'un fichier, ou None s'il n'existe pas"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class VerificationCache:
+    """Empreintes et sorties de version déjà calculées, indexées par chemin"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE):
+        self.path = path
+        self.hashes: Dict[str, Dict] = {}
+        self.versions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "VerificationCache":
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.hashes = data.get('hashes', {})
+            self.versions = data.get('versions', {})
+        except (OSError, ValueError):
+            pass
+        return self
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"hashes": self.hashes, "versions": self.versions}
+        atomic_write_json(self.path, data)
+
+    def digest(self, path: str, algorithm: str) -> Tuple[Optional[str], bool]:
+        """Empreinte d'un fichier, recalculée seulement s'il a changé ; (empreinte, depuis le cache)"""
+        stamp = _stamp(path)
+        if stamp is None:
+            return None, False
+        key = f"{algorithm}:{path}"
+        with self._lock:
+            cached = self.hashes.get(key)
+        if cached and cached['stamp'] == stamp:
+            return cached['digest'], True
+        digest = file_digest(path, algorithm)
+        with self._lock:
+            self.hashes[key] = {"stamp": stamp, "digest": digest}
+        return digest, False
+
+    def version(self, command: List[str], executable: str) -> Optional[Dict]:
+        """Résultat mémorisé de la commande de version, si l'exécutable n'a pas changé"""
+        with self._lock:
+            cached = self.versions.get(json.dumps(command))
+        if cached and cached['stamp'] == _stamp(executable) and cached['stamp'] is not None:
+            return cached
+        return None
+
+    def store_version(self, command: List[str], executable: str, output: str) -> None:
+        with self._lock:
+            self.versions[json.dumps(command)] = {"stamp": _stamp(executable), "output": output}
+
+
+class InstallVerifier:
+    """Vérifie des logiciels en parallèle et produit le rapport de santé"""
+
+    def __init__(self, engine: CommandEngine, cache: Optional[VerificationCache] = None,
+                 max_workers: int = DEFAULT_VERIFY_WORKERS, version_timeout: float = DEFAULT_VERSION_TIMEOUT,
+                 logger: Optional[logging.Logger] = None):
+        self.engine = engine
+        self.cache = cache or VerificationCache()
+        self.max_workers = max(1, int(max_workers))
+        self.version_timeout = version_timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+    def verify_all(self, targets: List[VerifyTarget]) -> Dict:
+        """Vérifie tous les logiciels et retourne le rapport de santé"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="verify") as executor:
+            results = list(executor.map(lambda target: self.verify(*target), targets))
+
+        packages = {name: result for (name, _, _), result in zip(targets, results)}
+        unhealthy = sorted(name for name, result in packages.items() if not result['healthy'])
+        return {
+            "generated": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "seconds": round(time.perf_counter() - started, 3),
+            "summary": {
+                "verified": len(packages),
+                "healthy": len(packages) - len(unhealthy),
+                "unhealthy": len(unhealthy),
+            },
+            "unhealthy": unhealthy,
+            "packages": packages,
+        }
+
+    def verify(self, name: str, base_directory: Optional[str], config: Dict) -> Dict:
+        """Vérifie un logiciel ; chaque vérification est rapportée avec son résultat"""
+        checks = []
+
+        def check(kind: str, ok: bool, **fields) -> None:
+            checks.append(dict(check=kind, ok=ok, **{key: value for key, value in fields.items()
+                                                     if value is not None}))
+
+        if base_directory:
+            check(DIRECTORY, os.path.isdir(base_directory), path=base_directory)
+
+        executable = config.get('executable')
+        if executable:
+            executable = self._resolve(executable, base_directory)
+            check(EXECUTABLE, os.path.isfile(executable), path=executable)
+
+        version_command = config.get('version_command')
+        if version_command:
+            check(VERSION, **self._probe_version(version_command, base_directory, config.get('version_pattern')))
+
+        for path, expected in config.get('files', {}).items():
+            path = self._resolve(path, base_directory)
+            try:
+                algorithm, digest = parse_checksum(expected)
+            except ChecksumError as e:
+                check(HASH, False, path=path, detail=str(e))
+                continue
+            try:
+                actual, cached = self.cache.digest(path, algorithm)
+            except OSError as e:
+                check(HASH, False, path=path, detail=str(e))
+                continue
+            if actual is None:
+                check(HASH, False, path=path, detail="fichier introuvable")
+            else:
+                check(HASH, actual == digest, path=path, cached=cached or None,
+                      detail=None if actual == digest else f"empreinte {algorithm}:{actual}")
+
+        healthy = all(item['ok'] for item in checks)
+        for item in checks:
+            if not item['ok']:
+                self.logger.warning(f"⚠ {name}: vérification {item['check']} en échec "
+                                    f"({item.get('detail') or item.get('path')})")
+        return {"healthy": healthy, "checks": checks}
+
+    @staticmethod
+    def _resolve(path: str, base_directory: Optional[str]) -> str:
+        path = os.path.expandvars(path)
+        if base_directory and not os.path.isabs(path):
+            return os.path.join(base_directory, path)
+        return path
+
+    def _probe_version(self, command: List[str], base_directory: Optional[str],
+                       pattern: Optional[str]) -> Dict:
+        """Lance (ou retrouve en cache) la commande de version et analyse sa sortie"""
+        command = [os.path.expandvars(part) for part in command]
+        candidate = self._resolve(command[0], base_directory)
+        if os.path.isfile(candidate):
+            command[0] = candidate
+
+        cached = self.cache.version(command, command[0])
+        if cached is not None:
+            output = cached['output']
+        else:
+            try:
+                result = self.engine.run(command, self.version_timeout)
+            except OSError as e:
+                return {"ok": False, "command": command, "detail": str(e)}
+            if not result.success:
+                detail = result.timeout or (result.stderr.strip() or f"code retour {result.returncode}")
+                return {"ok": False, "command": command, "detail": detail}
+            output = result.stdout.strip() or result.stderr.strip()
+            self.cache.store_version(command, command[0], output)
+
+        if pattern:
+            match = re.search(pattern, output)
+            if match is None:
+                return {"ok": False, "command": command, "detail": f"sortie sans {pattern!r}: {output[:200]}"}
+            version = match.group(0)
+        else:
+            version = output.splitlines()[0] if output else ""
+        return {"ok": True, "command": command, "version": version, "cached": cached is not None or None}
+
+
+def write_report(report: Dict, path: str = DEFAULT_REPORT_FILE) -> None:
+    """Écrit le rapport de santé de façon atomique"""
+    atomic_write_json(path, report)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Cache des installateurs adressé par contenu
+Les installateurs sont rangés sous leur empreinte (algorithme:hash) avec un index
+JSON partagé ; les entrées sans checksum sont retrouvées par URL + ETag.
+La taille du cache est bornée par une éviction LRU.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from atomic_files import atomic_write_json
+from checksums import link_verified
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+# Un verrou plus ancien est considéré comme abandonné (machine arrêtée en cours de route)
+STALE_LOCK_SECONDS = 120
+
+DEFAULT_MAX_SIZE_MB = 20 * 1024
+
+
+class InstallerCache:
+    """Cache d'installateurs partagé entre les exécutions (et entre machines)"""
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+                 logger: Optional[logging.Logger] = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.logger = logger or logging.getLogger(__name__)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.lock_path = os.path.join(directory, LOCK_FILE)
+        self._thread_lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Dict, default_directory: str,
+                    logger: Optional[logging.Logger] = None) -> "InstallerCache":
+        """Crée le cache à partir de la section `cache` de la configuration"""
+        directory = os.path.expandvars(config.get('directory') or default_directory)
+        max_size_mb = config.get('max_size_mb', DEFAULT_MAX_SIZE_MB)
+        return cls(directory, int(max_size_mb) * 1024 * 1024, logger=logger)
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked_index(self):
+        """Verrouille l'index (entre threads et entre processus) et le fournit en écriture"""
+        with self._thread_lock:
+            self._acquire_file_lock()
+            try:
+                index = self._read_index()
+                yield index
+                self._write_index(index)
+            finally:
+                os.remove(self.lock_path)
+
+    def _acquire_file_lock(self) -> None:
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > STALE_LOCK_SECONDS:
+                        self.logger.warning(f"Verrou de cache abandonné supprimé: {self.lock_path}")
+                        os.remove(self.lock_path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.05)
+
+    def _read_index(self) -> Dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("objects", {})
+        index.setdefault("urls", {})
+        return index
+
+    def _write_index(self, index: Dict) -> None:
+        atomic_write_json(self.index_path, index)
+
+    @staticmethod
+    def url_key(url: str, etag: Optional[str]) -> str:
+        """Clé de repli pour les installateurs sans checksum"""
+        return hashlib.sha256(f"{url}\n{etag or ''}".encode('utf-8')).hexdigest()
+
+    def _object_path(self, key: str) -> str:
+        algorithm, _, digest = key.partition(':')
+        return os.path.join(self.directory, "objects", algorithm, digest[:2], digest)
+
+    # ------------------------------------------------------------------
+    # Consultation / stockage
+    # ------------------------------------------------------------------
+
+    def lookup(self, checksum: Optional[Tuple[str, str]], url: str,
+               etag: Optional[str] = None) -> Optional[str]:
+        """Retourne la clé de l'objet correspondant au checksum, ou à l'URL + ETag"""
+        with self._locked_index() as index:
+            if checksum:
+                key = f"{checksum[0]}:{checksum[1]}"
+            elif etag:
+                key = index["urls"].get(self.url_key(url, etag))
+            else:
+                # Sans checksum ni ETag, rien ne garantit que le contenu n'a pas changé
+                key = None
+
+            entry = index["objects"].get(key) if key else None
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            return key
+
+    def materialize(self, key: str, destination: str) -> bool:
+        """Place l'objet en cache à `destination` en revérifiant son empreinte"""
+        algorithm, _, expected = key.partition(':')
+        try:
+            if link_verified(self._object_path(key), destination, algorithm, expected):
+                return True
+        except OSError as e:
+            self.logger.warning(f"⚠ Lecture du cache impossible ({key}): {e}")
+            return False
+        self.logger.error(f"✗ Objet de cache corrompu, supprimé: {key}")
+        self.remove(key)
+        return False
+
+    def store(self, path: str, algorithm: str, digest: str, url: str,
+              etag: Optional[str] = None) -> None:
+        """Ajoute un fichier téléchargé au cache puis applique l'éviction LRU
+
+        Sans checksum configuré, l'objet n'est retrouvable que par son ETag : un
+        téléchargement sans l'un ni l'autre ne doit pas être stocké.
+        """
+        key = f"{algorithm}:{digest}"
+        object_path = self._object_path(key)
+        try:
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                temp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    os.link(path, temp_path)
+                except OSError:
+                    shutil.copyfile(path, temp_path)
+                os.replace(temp_path, object_path)
+
+            with self._locked_index() as index:
+                now = time.time()
+                entry = index["objects"].setdefault(key, {"created": now})
+                entry.update({
+                    "size": os.path.getsize(object_path),
+                    "url": url,
+                    "filename": os.path.basename(path),
+                    "last_used": now,
+                })
+                if etag:
+                    index["urls"][self.url_key(url, etag)] = key
+                self._evict(index, self.max_size)
+        except OSError as e:
+            self.logger.warning(f"⚠ Impossible d'ajouter {os.path.basename(path)} au cache: {e}")
+
+    def remove(self, key: str) -> None:
+        """Supprime un objet du cache"""
+        with self._locked_index() as index:
+            self._remove_entry(index, key)
+
+    # ------------------------------------------------------------------
+    # Éviction et statistiques
+    # ------------------------------------------------------------------
+
+    def prune(self, max_size: Optional[int] = None) -> Tuple[int, int]:
+        """Réduit le cache à `max_size` octets, retourne (objets supprimés, octets libérés)"""
+        with self._locked_index() as index:
+            return self._evict(index, self.max_size if max_size is None else max_size)
+
+    def stats(self) -> Dict:
+        """Retourne les statistiques du cache"""
+        with self._locked_index() as index:
+            objects = index["objects"]
+            last_used = [entry.get("last_used", 0) for entry in objects.values()]
+            return {
+                "directory": self.directory,
+                "objects": len(objects),
+                "urls": len(index["urls"]),
+                "size": sum(entry.get("size", 0) for entry in objects.values()),
+                "max_size": self.max_size,
+                "oldest_use": min(last_used) if last_used else None,
+                "newest_use": max(last_used) if last_used else None,
+            }
+
+    def _evict(self, index: Dict, max_size: int) -> Tuple[int, int]:
+        objects = index["objects"]
+        total = sum(entry.get("size", 0) for entry in objects.values())
+        removed, freed = 0, 0
+        for key in sorted(objects, key=lambda k: objects[k].get("last_used", 0)):
+            if total <= max_size:
+                break
+            size = objects[key].get("size", 0)
+            self._remove_entry(index, key)
+            total -= size
+            freed += size
+            removed += 1
+        if removed:
+            self.logger.info(f"Cache: {removed} installateurs évincés ({freed // (1024 * 1024)} Mo libérés)")
+        return removed, freed
+
+    def _remove_entry(self, index: Dict, key: str) -> None:
+        index["objects"].pop(key, None)
+        for url_key in [k for k, v in index["urls"].items() if v == key]:
+            del index["urls"][url_key]
+        try:
+            os.remove(self._object_path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Inventaire des logiciels déjà installés
+Un seul instantané par gestionnaire (winget, chocolatey) est pris au démarrage
+puis indexé en mémoire, ce qui rend la détection « déjà installé » immédiate
+"""
+
+import json
+import re
+from typing import Dict, Iterable, List, Set
+
+_WINGET_SEPARATOR = re.compile(r"^-{3,}\s*$")
+# En-têtes de colonnes : la casse varie selon la langue (« Id » en anglais, « ID » en français)
+_WINGET_ID_HEADER = re.compile(r"\bId\b", re.IGNORECASE)
+_WINGET_VERSION_HEADER = re.compile(r"\bVersion\b", re.IGNORECASE)
+# winget tronque les valeurs trop longues pour leur colonne
+_TRUNCATED = "…"
+
+
+class InventorySnapshot:
+    """Index en mémoire des paquets installés, par gestionnaire"""
+
+    def __init__(self):
+        self.packages: Dict[str, Set[str]] = {}
+
+    def add(self, backend: str, package_ids: Iterable[str]) -> None:
+        """Ajoute les paquets installés d'un gestionnaire (comparaison insensible à la casse)"""
+        self.packages.setdefault(backend, set()).update(package_id.lower() for package_id in package_ids)
+
+    def contains(self, backend: str, package_id: str) -> bool:
+        """Indique si un paquet est déjà installé"""
+        return package_id.lower() in self.packages.get(backend, ())
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self.packages.values())
+
+
+def parse_winget_export(content: str) -> List[str]:
+    """Extrait les identifiants d'un fichier produit par `winget export`"""
+    data = json.loads(content)
+    return [
+        package['PackageIdentifier']
+        for source in data.get('Sources', [])
+        for package in source.get('Packages', [])
+        if package.get('PackageIdentifier')
+    ]
+
+
+def parse_winget_list(output: str) -> List[str]:
+    """Extrait la colonne Id du tableau affiché par `winget list`
+
+    Les identifiants tronqués (terminés par « … ») sont ignorés : ils ne
+    permettent pas de reconnaître le paquet, qui sera alors installé normalement.
+    """
+    lines = output.splitlines()
+    for index, line in enumerate(lines):
+        if _WINGET_SEPARATOR.match(line) and index > 0:
+            header = lines[index - 1]
+            break
+    else:
+        return []
+
+    # Les colonnes sont alignées : l'Id commence sous l'en-tête « Id »
+    id_start = _WINGET_ID_HEADER.search(header)
+    version_start = _WINGET_VERSION_HEADER.search(header, id_start.end()) if id_start else None
+    if not id_start:
+        return []
+    end = version_start.start() if version_start else None
+
+    package_ids = []
+    for line in lines[index + 1:]:
+        if not line.strip():
+            # Le tableau se termine à la première ligne vide (messages de winget ensuite)
+            break
+        package_id = line[id_start.start():end].strip().split(' ')[0]
+        if package_id and not package_id.endswith(_TRUNCATED):
+            package_ids.append(package_id)
+    return package_ids
+
+
+def parse_choco_list(output: str) -> List[str]:
+    """Extrait les identifiants de `choco list --limit-output` (lignes `id|version`)"""
+    package_ids = (line.split('|', 1)[0].strip() for line in output.splitlines() if '|' in line)
+    return [package_id for package_id in package_ids if package_id]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Journalisation non bloquante
+Les threads d'installation ne font que déposer les enregistrements dans une
+file ; un thread dédié les formate et les écrit (console, fichier à rotation
+par taille, au format texte ou JSON). Les enregistrements portent le logiciel
+et la phase en cours, et les sorties volumineuses des commandes sont écrites
+dans un fichier par logiciel plutôt que dans le log principal.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+
+DEFAULT_LOG_FILE = "software_installer.log"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Sortie d'une commande : au-delà de ce nombre de lignes, la suite va dans OUTPUT_DIRECTORY
+INLINE_OUTPUT_LINES = 20
+OUTPUT_DIRECTORY = "logs"
+
+# Champs structurés repris dans les enregistrements JSON lorsqu'ils sont renseignés
+STRUCTURED_FIELDS = ("package", "phase", "duration", "command", "returncode", "output_file")
+
+current_package: ContextVar[Optional[str]] = ContextVar("current_package", default=None)
+current_phase: ContextVar[Optional[str]] = ContextVar("current_phase", default=None)
+
+_listener: Optional[QueueListener] = None
+
+
+@contextmanager
+def log_context(package: Optional[str] = None, phase: Optional[str] = None):
+    """Associe le logiciel et/ou la phase aux enregistrements émis dans le bloc (par thread)"""
+    tokens = []
+    if package is not None:
+        tokens.append((current_package, current_package.set(package)))
+    if phase is not None:
+        tokens.append((current_phase, current_phase.set(phase)))
+    try:
+        yield
+    finally:
+        for variable, token in reversed(tokens):
+            variable.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Complète l'enregistrement avec le contexte du thread émetteur (sauf champ fourni via `extra`)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'package'):
+            record.package = current_package.get()
+        if not hasattr(record, 'phase'):
+            record.phase = current_phase.get()
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """Dépose l'enregistrement tel quel : le message est formaté par le thread d'écriture
+
+    La file ne quitte pas le processus, rien n'a donc à être sérialisé ici.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                    + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(log_file: str = DEFAULT_LOG_FILE, json_format: bool = False,
+                  level: int = logging.INFO, console: bool = True,
+                  max_bytes: int = DEFAULT_MAX_BYTES,
+                  backup_count: int = DEFAULT_BACKUP_COUNT) -> QueueListener:
+    """Installe la file de journalisation sur le logger racine et démarre le thread d'écriture
+
+    Comme logging.basicConfig, seul le premier appel configure la journalisation.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                       encoding='utf-8', delay=True)
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    handlers: List[logging.Handler] = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers)
+    _listener.start()
+    # Vide la file avant la fin du processus
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def spill_output(package: Optional[str], command: List[str], returncode: Optional[int],
+                 stdout: str, stderr: str, directory: str = OUTPUT_DIRECTORY) -> str:
+    """Ajoute la sortie complète d'une commande au fichier du logiciel et retourne son chemin"""
+    name = package or (os.path.basename(command[0]) if command else "commande")
+    path = os.path.join(directory, re.sub(r'[^\w.-]+', '_', name) + ".log")
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} {' '.join(command)} (code {returncode}) ===\n")
+        f.write(stdout)
+        if stderr:
+            f.write("--- stderr ---\n")
+            f.write(stderr)
+        f.write("\n")
+    return path
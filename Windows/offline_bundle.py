@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Paquet hors ligne d'installateurs
+`bundle build` télécharge une fois les installateurs (`download_url`) d'une
+configuration dans un dossier (ou une archive tar) avec un manifeste et leurs
+empreintes SHA-256. Sur une machine sans réseau, le moteur de téléchargement
+résout les URL vers les fichiers du paquet : ils sont liés (lien physique) à
+leur destination plutôt que copiés, puis vérifiés.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tarfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from atomic_files import atomic_write_json
+from checksums import file_digest, link_verified
+
+MANIFEST_FILE = "manifest.json"
+FILES_DIRECTORY = "files"
+BUNDLE_VERSION = 1
+
+# (nom du logiciel, URL, nom de fichier, checksum (algorithme, empreinte) ou None)
+BundleItem = Tuple[str, str, str, Optional[Tuple[str, str]]]
+
+
+class BundleError(Exception):
+    """Paquet hors ligne absent, illisible ou d'une version non supportée"""
+
+
+def read_manifest(directory: str) -> Dict:
+    """Charge le manifeste d'un paquet"""
+    path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"manifeste illisible ({path}): {e}")
+    if manifest.get('version') != BUNDLE_VERSION:
+        raise BundleError(f"version de paquet non supportée: {manifest.get('version')}")
+    return manifest
+
+
+def build_bundle(items: List[BundleItem], directory: str, downloader,
+                 unbundled: Optional[List[Dict]] = None, config_file: Optional[str] = None,
+                 archive: bool = False, logger: Optional[logging.Logger] = None) -> Dict:
+    """Télécharge les installateurs dans `directory` et écrit le manifeste
+
+    `downloader` est le moteur de téléchargement (DownloadEngine). Les fichiers sont rangés sous leur empreinte SHA-256 : une URL déjà présente
+    dans un paquet existant n'est pas retéléchargée, et deux URL au contenu
+    identique ne sont stockées qu'une fois. Retourne le manifeste ; les URL en
+    échec sont listées sous `failed`.
+    """
+    logger = logger or logging.getLogger(__name__)
+    files_directory = os.path.join(directory, FILES_DIRECTORY)
+    incoming = os.path.join(files_directory, ".incoming")
+    os.makedirs(incoming, exist_ok=True)
+
+    try:
+        previous = read_manifest(directory)['entries']
+    except BundleError:
+        previous = {}
+
+    # Une même URL peut servir à plusieurs logiciels
+    by_url: Dict[str, Dict] = {}
+    for name, url, filename, checksum in items:
+        item = by_url.setdefault(url, {"filename": filename, "checksum": checksum, "software": []})
+        item["software"].append(name)
+
+    entries: Dict[str, Dict] = {}
+    jobs = {}
+    for url, item in by_url.items():
+        entry = previous.get(url)
+        if entry and os.path.exists(os.path.join(directory, entry['path'])):
+            if not item["checksum"] or item["checksum"] == ("sha256", entry['sha256']):
+                entries[url] = dict(entry, software=item["software"])
+                continue
+        temp_path = os.path.join(incoming, str(len(jobs)), item['filename'])
+        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+        jobs[url] = (temp_path, downloader.prefetch(url, temp_path, item["checksum"]))
+
+    failed = []
+    for url, (temp_path, job) in jobs.items():
+        item = by_url[url]
+        if not job.result():
+            failed.append(url)
+            continue
+        checksum = item["checksum"]
+        # Une empreinte SHA-256 attendue a déjà été vérifiée pendant le transfert
+        digest = checksum[1] if checksum and checksum[0] == "sha256" else file_digest(temp_path, "sha256")
+        relative_path = f"{FILES_DIRECTORY}/{digest}"
+        object_path = os.path.join(directory, relative_path)
+        if os.path.exists(object_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, object_path)
+        entries[url] = {
+            "path": relative_path,
+            "filename": item["filename"],
+            "sha256": digest,
+            "size": os.path.getsize(object_path),
+            "software": item["software"],
+        }
+        logger.info(f"✓ Ajouté au paquet: {item['filename']}")
+    shutil.rmtree(incoming, ignore_errors=True)
+
+    # Fichiers qui ne sont plus référencés (installateur mis à jour depuis le dernier paquet)
+    referenced = {entry['path'] for entry in entries.values()}
+    for filename in os.listdir(files_directory):
+        if f"{FILES_DIRECTORY}/{filename}" not in referenced:
+            os.remove(os.path.join(files_directory, filename))
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "created": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "config": os.path.basename(config_file) if config_file else None,
+        "entries": entries,
+        "unbundled": unbundled or [],
+        "failed": failed,
+    }
+    atomic_write_json(os.path.join(directory, MANIFEST_FILE), manifest)
+
+    if archive:
+        # Archive non compressée : les installateurs le sont déjà
+        archive_path = shutil.make_archive(os.path.abspath(directory), "tar", directory)
+        logger.info(f"Archive du paquet: {archive_path}")
+    return manifest
+
+
+class OfflineBundle:
+    """Paquet hors ligne utilisé comme source des téléchargements"""
+
+    def __init__(self, directory: str, manifest: Dict, logger: Optional[logging.Logger] = None):
+        self.directory = directory
+        self.manifest = manifest
+        self.entries: Dict[str, Dict] = manifest.get('entries', {})
+        self.logger = logger or logging.getLogger(__name__)
+
+    @classmethod
+    def open(cls, path: str, logger: Optional[logging.Logger] = None) -> "OfflineBundle":
+        """Ouvre un paquet (dossier, ou archive tar extraite une fois à côté d'elle)"""
+        if os.path.isfile(path):
+            path = cls._extract(path)
+        elif not os.path.isdir(path):
+            raise BundleError(f"paquet introuvable: {path}")
+        return cls(path, read_manifest(path), logger=logger)
+
+    @staticmethod
+    def _extract(archive_path: str) -> str:
+        directory = archive_path + ".d"
+        marker = os.path.join(directory, ".extracted")
+        stat = os.stat(archive_path)
+        stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+        if os.path.exists(marker):
+            with open(marker, 'r', encoding='utf-8') as f:
+                if f.read() == stamp:
+                    return directory
+        try:
+            with tarfile.open(archive_path) as archive:
+                shutil.rmtree(directory, ignore_errors=True)
+                if hasattr(tarfile, 'data_filter'):
+                    archive.extractall(directory, filter='data')
+                else:
+                    archive.extractall(directory)
+        except (OSError, tarfile.TarError) as e:
+            raise BundleError(f"archive illisible ({archive_path}): {e}")
+        with open(marker, 'w', encoding='utf-8') as f:
+            f.write(stamp)
+        return directory
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def materialize(self, url: str, destination: str,
+                    checksum: Optional[Tuple[str, str]] = None) -> bool:
+        """Place le fichier du paquet correspondant à `url` à `destination`
+
+        Le fichier est vérifié avec le checksum de la configuration s'il est fourni,
+        sinon avec l'empreinte du manifeste.
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            return False
+        algorithm, expected = checksum or ("sha256", entry['sha256'])
+        source = os.path.join(self.directory, entry['path'])
+        try:
+            # Lien physique si le paquet est sur le même volume, sinon copie
+            if link_verified(source, destination, algorithm, expected):
+                return True
+        except OSError as e:
+            self.logger.warning(f"⚠ Lecture du paquet impossible ({entry['filename']}): {e}")
+            return False
+        self.logger.error(f"✗ Fichier du paquet corrompu: {entry['filename']}")
+        return False
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Différences entre versions de configuration
+Chaque entrée de `software_list` est réduite à une empreinte de sa forme
+normalisée. En comparant ces empreintes à l'état de la dernière application,
+seuls les logiciels ajoutés, modifiés ou retirés sont traités.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from atomic_files import atomic_write_json
+from config_model import SoftwareEntry
+
+DEFAULT_STATE_FILE = "applied_state.json"
+
+# Champs sans effet sur l'installation du logiciel lui-même
+IGNORED_KEYS = ("category", "description", "tags", "depends_on", "conflicts_with")
+
+
+def entry_hash(software: Dict) -> str:
+    """Empreinte de la forme normalisée d'une entrée (ordre des clés indifférent)"""
+    normalized = {key: value for key, value in software.items() if key not in IGNORED_KEYS}
+    data = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class PlanDiff:
+    """Actions minimales pour passer d'un ensemble d'entrées à un autre"""
+
+    def __init__(self, install: List[Dict], reinstall: List[Dict], remove: List[Dict],
+                 unchanged: List[Dict]):
+        self.install = install
+        self.reinstall = reinstall
+        self.remove = remove
+        self.unchanged = unchanged
+
+    def __bool__(self) -> bool:
+        return bool(self.install or self.reinstall or self.remove)
+
+    def format(self) -> List[str]:
+        """Lignes lisibles décrivant les actions"""
+        lines = [f"+ {software['name']} ({software.get('method')})" for software in self.install]
+        lines += [f"~ {software['name']} ({software.get('method')})" for software in self.reinstall]
+        lines += [f"- {software['name']} ({software.get('method')})" for software in self.remove]
+        lines.append(f"{len(self.install)} à installer, {len(self.reinstall)} à réinstaller, "
+                     f"{len(self.remove)} à supprimer, {len(self.unchanged)} inchangés")
+        return lines
+
+
+def diff_entries(old: Iterable[Dict], new: Iterable[Dict]) -> PlanDiff:
+    """Compare deux listes d'entrées (par nom, puis par empreinte)"""
+    old_by_name = {software['name']: software for software in old}
+    install, reinstall, unchanged = [], [], []
+    seen = set()
+    for software in new:
+        name = software['name']
+        seen.add(name)
+        previous = old_by_name.get(name)
+        if previous is None:
+            install.append(software)
+        elif entry_hash(previous) != entry_hash(software):
+            reinstall.append(software)
+        else:
+            unchanged.append(software)
+    remove = [software for name, software in old_by_name.items() if name not in seen]
+    return PlanDiff(install, reinstall, remove, unchanged)
+
+
+class AppliedState:
+    """Entrées appliquées avec succès sur cette machine, avec leur empreinte"""
+
+    def __init__(self, path: str = DEFAULT_STATE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.config_file: Optional[str] = None
+
+    def load(self) -> "AppliedState":
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('entries', {})
+            self.config_file = data.get('config')
+        return self
+
+    def software_list(self) -> List[SoftwareEntry]:
+        """Entrées appliquées, compilées depuis leur forme d'origine"""
+        return [SoftwareEntry(record['entry']) for record in self.entries.values()]
+
+    def diff(self, software_list: Iterable[Dict]) -> PlanDiff:
+        """Actions pour appliquer `software_list` depuis l'état enregistré"""
+        return diff_entries(self.software_list(), software_list)
+
+    def applied(self, software: Dict) -> None:
+        """Marque une entrée comme appliquée"""
+        self.entries[software['name']] = {"hash": entry_hash(software), "entry": dict(software)}
+
+    def removed(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+    def save(self, config_file: Optional[str] = None) -> None:
+        """Écrit l'état de façon atomique"""
+        data = {
+            "config": config_file or self.config_file,
+            "updated": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "entries": self.entries,
+        }
+        atomic_write_json(self.path, data)
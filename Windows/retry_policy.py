@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Nouvelles tentatives et disjoncteurs par gestionnaire
+Une installation en échec est retentée selon une politique (nombre de
+tentatives, attente exponentielle avec gigue) définie globalement, par méthode
+et par logiciel. Chaque gestionnaire de paquets a un disjoncteur : après N
+échecs consécutifs, les installations suivantes échouent immédiatement (ou
+passent par la méthode de repli du logiciel) au lieu d'attendre chacune leur
+délai.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+DEFAULT_ATTEMPTS = 2
+DEFAULT_BACKOFF = 5.0
+DEFAULT_MAX_DELAY = 120.0
+# Échecs consécutifs avant ouverture du disjoncteur (0 : jamais) et durée d'ouverture
+DEFAULT_THRESHOLD = 5
+DEFAULT_COOLDOWN = 300.0
+
+# Méthodes utilisables comme repli (gestionnaires de paquets)
+FALLBACK_METHODS = ("winget", "chocolatey")
+# Méthodes protégées par un disjoncteur. Les installateurs personnalisés sont des
+# exécutables indépendants : l'échec de l'un ne dit rien des suivants
+BREAKER_METHODS = FALLBACK_METHODS
+
+
+class RetryPolicy:
+    """Nombre de tentatives et attente entre deux tentatives"""
+
+    __slots__ = ("attempts", "backoff", "max_delay")
+
+    def __init__(self, attempts: int = DEFAULT_ATTEMPTS, backoff: float = DEFAULT_BACKOFF,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        self.attempts = max(1, int(attempts))
+        self.backoff = max(0.0, float(backoff))
+        self.max_delay = max(0.0, float(max_delay))
+
+    def merged(self, overrides: Optional[Dict]) -> "RetryPolicy":
+        """Politique complétée par les clés `attempts`, `backoff`, `max_delay` de `overrides`"""
+        if not overrides:
+            return self
+        return RetryPolicy(overrides.get('attempts', self.attempts),
+                           overrides.get('backoff', self.backoff),
+                           overrides.get('max_delay', self.max_delay))
+
+    def delay(self, attempt: int) -> float:
+        """Attente avant la tentative suivant la tentative `attempt` (0 pour la première)"""
+        return min(self.max_delay, self.backoff * (2 ** attempt)) * (0.5 + random.random())
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un gestionnaire
+
+    Fermé, il laisse tout passer. Ouvert (après `threshold` échecs consécutifs), il
+    refuse tout pendant `cooldown` secondes, puis laisse passer une seule tentative :
+    un succès le referme, un échec le rouvre pour une nouvelle période.
+    """
+
+    def __init__(self, name: str, threshold: int = DEFAULT_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN,
+                 logger: Optional[logging.Logger] = None):
+        self.name = name
+        self.threshold = max(0, int(threshold))
+        self.cooldown = float(cooldown)
+        self.logger = logger or logging.getLogger(__name__)
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """Indique si une tentative peut être faite maintenant"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self.opened_at >= self.cooldown:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, success: bool) -> None:
+        """Enregistre le résultat d'une tentative"""
+        with self._lock:
+            self._probing = False
+            if success:
+                if self.opened_at is not None:
+                    self.logger.info(f"✓ {self.name} de nouveau disponible")
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.threshold and self.failures >= self.threshold:
+                if self.opened_at is None:
+                    self.logger.error(f"✗ {self.name}: {self.failures} échecs consécutifs, "
+                                      f"installations suspendues pendant {self.cooldown:g}s")
+                self.opened_at = time.monotonic()
+
+
+class RetryManager:
+    """Politiques et disjoncteurs d'une exécution, construits depuis la section `retry`
+
+    Exemple de section::
+
+        "retry": {
+          "attempts": 2, "backoff": 5, "max_delay": 120,
+          "methods": {"custom": {"attempts": 1}},
+          "circuit_breaker": {"threshold": 5, "cooldown": 300}
+        }
+
+    Un logiciel peut préciser sa propre politique (`"retry": {"attempts": 4}`) et
+    une méthode de repli (`"fallback": {"method": "chocolatey", "package_id": "firefox"}`).
+    """
+
+    def __init__(self, config: Optional[Dict] = None, logger: Optional[logging.Logger] = None):
+        config = config or {}
+        self.logger = logger or logging.getLogger(__name__)
+        self.default = RetryPolicy().merged(config)
+        self.methods: Dict[str, Dict] = config.get('methods', {})
+        breaker_config = config.get('circuit_breaker', {})
+        self.threshold = breaker_config.get('threshold', DEFAULT_THRESHOLD)
+        self.cooldown = breaker_config.get('cooldown', DEFAULT_COOLDOWN)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, software: Dict, method: Optional[str] = None) -> RetryPolicy:
+        """Politique d'un logiciel : globale, puis celle de la méthode, puis celle du logiciel"""
+        method = method or software.get('method')
+        return self.default.merged(self.methods.get(method)).merged(software.get('retry'))
+
+    def breaker(self, method: str) -> CircuitBreaker:
+        """Disjoncteur du gestionnaire `method` (partagé par tous les threads)
+
+        Hors BREAKER_METHODS, le disjoncteur ne s'ouvre jamais.
+        """
+        with self._lock:
+            breaker = self._breakers.get(method)
+            if breaker is None:
+                threshold = self.threshold if method in BREAKER_METHODS else 0
+                breaker = CircuitBreaker(method, threshold, self.cooldown, logger=self.logger)
+                self._breakers[method] = breaker
+            return breaker
+
+    def fallback(self, software: Dict) -> Optional[Tuple[str, str]]:
+        """Méthode et identifiant de repli du logiciel, ou None"""
+        fallback = software.get('fallback')
+        if not fallback or fallback.get('method') == software.get('method'):
+            return None
+        return fallback['method'], fallback.get('package_id', software.get('package_id', software['name']))
+
+    def open_breakers(self) -> Dict[str, int]:
+        """Gestionnaires dont le disjoncteur est ouvert, avec leur nombre d'échecs consécutifs"""
+        with self._lock:
+            return {name: breaker.failures for name, breaker in self._breakers.items() if breaker.is_open}
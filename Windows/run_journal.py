@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Journal d'exécution persistant
+Fichier JSONL en ajout seul, synchronisé sur disque à chaque écriture, qui
+enregistre les transitions d'état de chaque logiciel. Il permet de reprendre
+une installation interrompue (redémarrage, coupure) et sert de source au rapport.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+DEFAULT_JOURNAL_FILE = "install_journal.jsonl"
+
+# États d'un logiciel, dans l'ordre de leur progression
+PLANNED = "planned"
+DOWNLOADING = "downloading"
+INSTALLING = "installing"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+ALREADY_INSTALLED = "already_installed"
+REMOVED = "removed"
+# Entrée identique à la dernière application (--incremental), non traitée
+UNCHANGED = "unchanged"
+
+# États terminaux qu'une reprise n'a pas besoin de rejouer
+COMPLETED_STATES = (DONE, ALREADY_INSTALLED, REMOVED, UNCHANGED)
+
+
+class RunJournal:
+    """Journal d'une exécution, sûr en cas d'arrêt brutal"""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_FILE, logger: Optional[logging.Logger] = None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.run_id: Optional[str] = None
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start(self, config_file: str, config_hash: Optional[str] = None) -> None:
+        """Ouvre une nouvelle exécution dans le journal"""
+        self.run_id = uuid.uuid4().hex[:12]
+        self._append({"event": "run_start", "config": config_file, "config_hash": config_hash})
+
+    def resume(self, config_hash: Optional[str] = None) -> Dict[str, str]:
+        """Reprend la dernière exécution et retourne le dernier état de chaque logiciel"""
+        records = self.read_last_run()
+        if not records:
+            return {}
+        start = records[0]
+        if config_hash and start.get("config_hash") and start["config_hash"] != config_hash:
+            self.logger.warning("⚠ La configuration a changé depuis l'exécution interrompue")
+        self.run_id = start["run"]
+        self._append({"event": "resume"})
+        return self.fold(records)
+
+    def record(self, package: str, state: str, **fields) -> None:
+        """Enregistre une transition d'état pour un logiciel"""
+        entry = {"package": package, "state": state}
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        self._append(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _append(self, entry: Dict) -> None:
+        line = {"ts": round(time.time(), 3), "run": self.run_id}
+        line.update(entry)
+        data = json.dumps(line, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self._ends_truncated():
+                    # Termine la ligne tronquée pour ne pas y coller l'enregistrement suivant
+                    data = "\n" + data
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _ends_truncated(self) -> bool:
+        """Vrai si le journal se termine par une ligne incomplète (arrêt brutal)"""
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    # ------------------------------------------------------------------
+    # Relecture
+    # ------------------------------------------------------------------
+
+    def read_last_run(self) -> List[Dict]:
+        """Retourne les enregistrements de la dernière exécution (depuis son run_start)"""
+        if not os.path.exists(self.path):
+            return []
+        records: List[Dict] = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    continue
+                if entry.get("event") == "run_start":
+                    records = []
+                records.append(entry)
+        return records if records and records[0].get("event") == "run_start" else []
+
+    @staticmethod
+    def fold(records: List[Dict]) -> Dict[str, str]:
+        """Dernier état connu de chaque logiciel (dans l'ordre de première apparition)"""
+        states: Dict[str, str] = {}
+        for entry in records:
+            package = entry.get("package")
+            if package:
+                states[package] = entry["state"]
+        return states
+
+    def summary(self) -> Dict[str, List[str]]:
+        """Logiciels de la dernière exécution regroupés par état final"""
+        grouped: Dict[str, List[str]] = {}
+        for package, state in self.fold(self.read_last_run()).items():
+            grouped.setdefault(state, []).append(package)
+        return grouped
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Sélection des logiciels à traiter
+Les options --only / --exclude acceptent des sélecteurs `category:<catégorie>`,
+`tag:<étiquette>` et `name:<motif>` (un sélecteur sans préfixe est un motif de
+nom, avec * et ?). La sélection est un générateur sur le catalogue compilé :
+rien n'est développé, téléchargé ni vérifié en dehors de la sélection.
+"""
+
+import fnmatch
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from config_model import CompiledConfig, SoftwareEntry
+
+CATEGORY = "category"
+TAG = "tag"
+NAME = "name"
+
+PREFIXES = (CATEGORY, TAG, NAME)
+
+
+def parse_selector(value: str) -> Tuple[str, str]:
+    """Retourne (type, valeur en minuscules) d'un sélecteur"""
+    kind, separator, pattern = value.partition(':')
+    if separator and kind.lower() in PREFIXES:
+        return kind.lower(), pattern.strip().lower()
+    return NAME, value.strip().lower()
+
+
+class Selector:
+    """Filtre du catalogue construit à partir de --only et --exclude"""
+
+    def __init__(self, only: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None):
+        self.only = [parse_selector(value) for value in only or ()]
+        self.exclude = [parse_selector(value) for value in exclude or ()]
+
+    def __bool__(self) -> bool:
+        return bool(self.only or self.exclude)
+
+    @staticmethod
+    def _match(selector: Tuple[str, str], software: SoftwareEntry) -> bool:
+        kind, pattern = selector
+        if kind == CATEGORY:
+            return (software.category or '').lower() == pattern
+        if kind == TAG:
+            return any(tag.lower() == pattern for tag in software.tags)
+        return fnmatch.fnmatchcase(software.name.lower(), pattern)
+
+    def matches(self, software: SoftwareEntry) -> bool:
+        """Indique si une entrée fait partie de la sélection"""
+        if self.only and not any(self._match(selector, software) for selector in self.only):
+            return False
+        return not any(self._match(selector, software) for selector in self.exclude)
+
+    def _candidates(self, catalog: CompiledConfig) -> Iterable[SoftwareEntry]:
+        """Entrées à examiner : l'index des catégories suffit si seules des catégories sont demandées"""
+        if self.only and all(kind == CATEGORY for kind, _ in self.only):
+            return catalog.in_categories(pattern for _, pattern in self.only)
+        return catalog.entries
+
+    def select(self, catalog: CompiledConfig) -> Iterator[SoftwareEntry]:
+        """Génère les entrées sélectionnées, suivies des dépendances nécessaires non sélectionnées"""
+        selected = set()
+        required: List[str] = []
+        for entry in self._candidates(catalog):
+            if entry.name in selected or not self.matches(entry):
+                continue
+            selected.add(entry.name)
+            required.extend(entry.depends_on)
+            yield entry
+
+        # Une dépendance hors sélection est installée quand même (sauf si elle est exclue,
+        # auquel cas le plan signalera la dépendance manquante)
+        while required:
+            name = required.pop()
+            entry = catalog.get(name)
+            if name in selected or entry is None:
+                continue
+            if any(self._match(selector, entry) for selector in self.exclude):
+                continue
+            selected.add(name)
+            required.extend(entry.depends_on)
+            yield entry
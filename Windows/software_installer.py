@@ -4,61 +4,183 @@ Script de réinstallation automatique des logiciels pour Windows 11
 Utilise winget et chocolatey pour installer les logiciels courants
 """
 
-import subprocess
 import sys
 import json
 import os
 import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 
+from install_scheduler import InstallScheduler, DEFAULT_MAX_WORKERS, DEFAULT_BATCH_SIZE, DEFAULT_MAX_INSTALLS
+from install_plan import InstallPlan, PlanError, build_install_plan
+from download_engine import DownloadEngine
+from checksums import UnsupportedChecksumError
+from installer_cache import InstallerCache
+from offline_bundle import BundleError, OfflineBundle, build_bundle
+from inventory import InventorySnapshot, parse_choco_list, parse_winget_export, parse_winget_list
+from command_engine import CommandEngine
+from log_pipeline import (
+    DEFAULT_LOG_FILE, INLINE_OUTPUT_LINES, OUTPUT_DIRECTORY, current_package, log_context,
+    setup_logging, spill_output
+)
+from download_pipeline import DownloadPipeline, DEFAULT_DEPTH
+from install_profiler import (
+    InstallProfiler, PRE_INSTALL, DOWNLOAD, HASH, INSTALL, POST_INSTALL
+)
+from run_journal import (
+    RunJournal, DEFAULT_JOURNAL_FILE, COMPLETED_STATES,
+    PLANNED, DOWNLOADING, INSTALLING, DONE, FAILED, SKIPPED, ALREADY_INSTALLED, REMOVED, UNCHANGED
+)
+from config_model import (
+    CompiledConfig, ConfigError, SoftwareEntry, REINSTALL_ARGS, compile_config, default_silent_args,
+    load_config
+)
+from retry_policy import RetryManager
+from install_verifier import (
+    DEFAULT_CACHE_FILE, DEFAULT_REPORT_FILE, DEFAULT_VERIFY_WORKERS, DEFAULT_VERSION_TIMEOUT,
+    InstallVerifier, VerificationCache,
+    write_report
+)
+from selection import Selector
+from plan_diff import AppliedState, PlanDiff, DEFAULT_STATE_FILE, diff_entries
+from batch_install import (
+    WINGET_IMPORT_ARGS, build_winget_import, is_winget_batchable,
+    parse_choco_output, parse_winget_import_output
+)
+
 class SoftwareInstaller:
-    def __init__(self):
-        self.setup_logging()
+    def __init__(self, serial: bool = False, max_workers: Optional[int] = None,
+                 bandwidth_limit_kbps: Optional[int] = None, strict_checksums: bool = False,
+                 use_cache: bool = True, cache_dir: Optional[str] = None, batch: bool = False,
+                 skip_installed: bool = True, journal_file: Optional[str] = None, resume: bool = False,
+                 profile: bool = False, incremental: bool = False, state_file: Optional[str] = None,
+                 only: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 bundle: Optional[str] = None, log_file: Optional[str] = None, log_format: str = "text",
+                 log_level: str = "INFO", log_console: bool = True, verify: bool = True):
+        self.setup_logging(log_file, log_format, log_level, log_console)
         self.installed_software = []
         self.failed_software = []
+        self.skipped_software = []
+        self.already_installed_software = []
         self.base_directories = {}
         self.config = {}
+        self.catalog: Optional[CompiledConfig] = None
+        self.selector = Selector(only, exclude)
+        self.serial = serial
+        self.max_workers = max_workers
+        self.bandwidth_limit_kbps = bandwidth_limit_kbps
+        self.strict_checksums = strict_checksums
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.bundle_path = bundle
+        self.bundle: Optional[OfflineBundle] = None
+        self.batch = batch
+        # Gestionnaires dont la sortie groupée n'a pas pu être analysée
+        self.unbatchable_methods = set()
+        self.skip_installed = skip_installed
+        self.inventory = InventorySnapshot()
+        self.journal = RunJournal(journal_file or DEFAULT_JOURNAL_FILE, logger=self.logger)
+        self.resume = resume
+        # Logiciels à ne pas traiter, avec la raison (reprise, inchangés depuis la dernière application)
+        self.previously_completed: Dict[str, str] = {}
+        self.incremental = incremental
+        self.applied_state = AppliedState(state_file or DEFAULT_STATE_FILE)
+        self.reinstall_names = set()
+        self.unchanged_names = set()
+        self.removed_software = []
+        self.profile = profile
+        self.profiler = InstallProfiler()
+        self.downloader: Optional[DownloadEngine] = None
+        self.command_engine: Optional[CommandEngine] = None
+        self.pipeline: Optional[DownloadPipeline] = None
+        self.retry = RetryManager(logger=self.logger)
+        # Gestionnaires utilisables pendant l'exécution, et ordonnanceur du mode parallèle
+        self.available_backends: Dict[str, bool] = {}
+        self.scheduler: Optional[InstallScheduler] = None
+        self.verify = verify
+        self.health_report: Optional[Dict] = None
+        self._results_lock = threading.Lock()
         
-    def setup_logging(self):
-        """Configure le système de logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('software_installer.log', encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+    def setup_logging(self, log_file: Optional[str] = None, log_format: str = "text",
+                      log_level: str = "INFO", console: bool = True):
+        """Configure le système de logging (écriture par un thread dédié, rotation par taille)"""
+        setup_logging(log_file or DEFAULT_LOG_FILE, json_format=(log_format == "json"),
+                      level=getattr(logging, log_level.upper(), logging.INFO), console=console)
         self.logger = logging.getLogger(__name__)
     
-    def run_command(self, command: List[str], timeout: int = 300) -> tuple[bool, str]:
-        """Exécute une commande et retourne le succès et la sortie"""
+    def get_command_engine(self) -> CommandEngine:
+        """Retourne le moteur d'exécution des commandes (boucle asyncio partagée)"""
+        if self.command_engine is None:
+            self.command_engine = CommandEngine(logger=self.logger)
+        return self.command_engine
+    
+    def run_command_output(self, command: List[str], timeout: int = 300,
+                           idle_timeout: Optional[float] = None) -> tuple[bool, str, str]:
+        """Exécute une commande et retourne le succès, la sortie standard et la sortie d'erreur
+        
+        La sortie est journalisée ligne par ligne pendant l'exécution. `idle_timeout`
+        (par défaut `commands.idle_timeout` de la configuration) arrête la commande
+        lorsqu'elle n'écrit plus rien, indépendamment du délai maximal `timeout`.
+        Au-delà de `commands.inline_lines` lignes, la sortie complète est écrite dans
+        le fichier du logiciel (`commands.output_directory`) plutôt que dans le log.
+        """
+        commands_config = self.config.get('commands', {})
+        if idle_timeout is None:
+            idle_timeout = commands_config.get('idle_timeout')
+        inline_lines = commands_config.get('inline_lines', INLINE_OUTPUT_LINES)
+        program = os.path.basename(command[0]) if command else ""
+        command_line = ' '.join(command)
+        # La sortie est lue sur le thread du moteur : le logiciel est transmis explicitement
+        extra = {"package": current_package.get(), "command": program}
+        line_count = [0]
+        
+        def log_line(stream: str, line: str) -> None:
+            line_count[0] += 1
+            if line_count[0] <= inline_lines:
+                self.logger.info("  [%s] %s", program, line, extra=extra)
+        
         try:
-            self.logger.info(f"Exécution: {' '.join(command)}")
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                shell=True
-            )
+            self.logger.info("Exécution: %s", command_line, extra=extra)
+            result = self.get_command_engine().run(command, timeout, idle_timeout, log_line)
+            
+            extra = dict(extra, duration=round(result.duration, 3), returncode=result.returncode)
+            stderr = result.stderr
+            if line_count[0] > inline_lines:
+                extra['output_file'] = spill_output(extra['package'], command, result.returncode, result.stdout,
+                                                    result.stderr, commands_config.get('output_directory',
+                                                                                       OUTPUT_DIRECTORY))
+                self.logger.info("  [%s] ... %d lignes, sortie complète dans %s", program,
+                                 line_count[0], extra['output_file'], extra=extra)
+                stderr_lines = stderr.splitlines()
+                if len(stderr_lines) > inline_lines:
+                    stderr = "\n".join(["..."] + stderr_lines[-inline_lines:])
             
+            if result.timeout:
+                self.logger.error("Timeout pour la commande (%s): %s", result.timeout, command_line, extra=extra)
+                return False, result.stdout, f"Timeout: {result.timeout}"
             if result.returncode == 0:
-                self.logger.info(f"Commande réussie: {' '.join(command)}")
-                return True, result.stdout
+                self.logger.info("Commande réussie: %s", command_line, extra=extra)
+                return True, result.stdout, result.stderr
             else:
-                self.logger.error(f"Erreur dans la commande: {' '.join(command)}")
-                self.logger.error(f"Erreur: {result.stderr}")
-                return False, result.stderr
+                self.logger.error("Erreur dans la commande: %s", command_line, extra=extra)
+                self.logger.error("Erreur: %s", stderr, extra=extra)
+                return False, result.stdout, result.stderr
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"Timeout pour la commande: {' '.join(command)}")
-            return False, "Timeout"
         except Exception as e:
             self.logger.error(f"Exception lors de l'exécution: {e}")
-            return False, str(e)
+            return False, "", str(e)
+    
+    def run_command(self, command: List[str], timeout: int = 300) -> tuple[bool, str]:
+        """Exécute une commande et retourne le succès et la sortie"""
+        success, stdout, stderr = self.run_command_output(command, timeout)
+        return success, stdout if success else stderr
     
     def check_admin_privileges(self) -> bool:
         """Vérifie si le script est exécuté avec les privilèges administrateur"""
@@ -113,123 +235,470 @@ class SoftwareInstaller:
             self.logger.error("Échec de l'installation de chocolatey")
             return False
     
-    def install_software_winget(self, software_list: List[Dict[str, str]]) -> None:
-        """Installe les logiciels via winget"""
-        self.logger.info("Installation des logiciels via winget...")
-        
-        for software in software_list:
-            if software.get('method') != 'winget':
-                continue
-                
-            name = software['name']
-            package_id = software.get('package_id', name)
-            installer_config = software.get('installer', {})
-            
-            # Utilise les arguments silencieux de la configuration ou les arguments par défaut
-            silent_args = installer_config.get('silent_args', [
-                "--accept-package-agreements", 
-                "--accept-source-agreements", 
-                "--silent"
-            ])
-            
-            self.logger.info(f"Installation de {name}...")
-            success, output = self.run_command([
-                "winget", "install", package_id
-            ] + silent_args)
-            
+    def _record_result(self, name: str, success: bool) -> None:
+        """Enregistre le résultat d'une installation (sûr entre threads)"""
+        with self._results_lock:
             if success:
                 self.installed_software.append(name)
-                self.logger.info(f"✓ {name} installé avec succès")
-                
-                # Vérification du dossier de base
-                base_directory = software.get('base_directory')
-                if base_directory:
-                    expanded_base_dir = self.expand_path_variables(base_directory)
-                    if os.path.exists(expanded_base_dir):
-                        self.logger.info(f"✓ Dossier de base vérifié: {expanded_base_dir}")
-                    else:
-                        self.logger.warning(f"⚠ Dossier de base non trouvé: {expanded_base_dir}")
             else:
                 self.failed_software.append(name)
-                self.logger.error(f"✗ Échec de l'installation de {name}")
+        self.journal.record(name, DONE if success else FAILED)
     
-    def install_software_chocolatey(self, software_list: List[Dict[str, str]]) -> None:
-        """Installe les logiciels via chocolatey"""
-        self.logger.info("Installation des logiciels via chocolatey...")
+    def _record_skipped(self, software: Dict, failed_dependencies: List[str]) -> None:
+        """Enregistre un logiciel ignoré parce qu'une de ses dépendances a échoué"""
+        name = software['name']
+        self.logger.warning(f"⚠ {name} ignoré, dépendances non satisfaites: {', '.join(failed_dependencies)}")
+        with self._results_lock:
+            self.skipped_software.append(name)
+        self.journal.record(name, SKIPPED, dependencies=failed_dependencies)
+        if self.pipeline is not None:
+            self.pipeline.release(name)
+    
+    def _completed_before(self, software: Dict) -> bool:
+        """Indique si le logiciel n'a pas à être traité (exécution reprise, entrée inchangée)"""
+        reason = self.previously_completed.get(software['name'])
+        if reason is None:
+            return False
+        self.logger.info(f"✓ {software['name']} {reason}")
+        return True
+    
+    def take_inventory(self, methods: List[str]) -> None:
+        """Prend un instantané des paquets installés pour chaque gestionnaire utilisé"""
+        snapshots = {
+            'winget': self.snapshot_winget,
+            'chocolatey': self.snapshot_chocolatey,
+        }
+        backends = [method for method in snapshots if method in methods]
+        if not backends:
+            return
         
-        for software in software_list:
-            if software.get('method') != 'chocolatey':
+        self.logger.info(f"Inventaire des logiciels installés ({', '.join(backends)})...")
+        with ThreadPoolExecutor(max_workers=len(backends)) as executor:
+            futures = {backend: executor.submit(snapshots[backend]) for backend in backends}
+        
+        for backend, future in futures.items():
+            try:
+                package_ids = future.result()
+            except Exception as e:
+                self.logger.warning(f"⚠ Inventaire {backend} illisible: {e}")
                 continue
-                
-            name = software['name']
-            package_id = software.get('package_id', name)
-            installer_config = software.get('installer', {})
-            
-            # Utilise les arguments silencieux de la configuration ou les arguments par défaut
-            silent_args = installer_config.get('silent_args', ["-y"])
-            
-            self.logger.info(f"Installation de {name}...")
-            success, output = self.run_command([
-                "choco", "install", package_id
-            ] + silent_args)
-            
-            if success:
-                self.installed_software.append(name)
-                self.logger.info(f"✓ {name} installé avec succès")
-                
-                # Vérification du dossier de base
-                base_directory = software.get('base_directory')
-                if base_directory:
-                    expanded_base_dir = self.expand_path_variables(base_directory)
-                    if os.path.exists(expanded_base_dir):
-                        self.logger.info(f"✓ Dossier de base vérifié: {expanded_base_dir}")
-                    else:
-                        self.logger.warning(f"⚠ Dossier de base non trouvé: {expanded_base_dir}")
-            else:
-                self.failed_software.append(name)
-                self.logger.error(f"✗ Échec de l'installation de {name}")
+            if package_ids is None:
+                self.logger.warning(f"⚠ Inventaire {backend} indisponible, aucun logiciel ne sera ignoré")
+                continue
+            self.inventory.add(backend, package_ids)
+            self.logger.info(f"✓ Inventaire {backend}: {len(package_ids)} paquets installés")
     
-    def download_file(self, url: str, filename: str, download_dir: str) -> bool:
-        """Télécharge un fichier depuis une URL"""
+    def snapshot_winget(self) -> Optional[List[str]]:
+        """Liste les paquets winget installés (`winget export`, sinon `winget list`)"""
+        fd, export_file = tempfile.mkstemp(prefix="winget_export_", suffix=".json")
+        os.close(fd)
         try:
-            import urllib.request
-            import urllib.parse
-            
-            download_path = os.path.join(download_dir, filename)
-            self.logger.info(f"Téléchargement de {url} vers {download_path}")
-            
-            urllib.request.urlretrieve(url, download_path)
-            self.logger.info(f"✓ Téléchargement réussi: {filename}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"✗ Erreur téléchargement {filename}: {e}")
+            success, _, _ = self.run_command_output(
+                ["winget", "export", "-o", export_file, "--accept-source-agreements"]
+            )
+            if success and os.path.getsize(export_file) > 0:
+                with open(export_file, 'r', encoding='utf-8-sig') as f:
+                    return parse_winget_export(f.read())
+        finally:
+            os.remove(export_file)
+        
+        success, stdout, _ = self.run_command_output(["winget", "list", "--accept-source-agreements"])
+        return parse_winget_list(stdout) if success else None
+    
+    def snapshot_chocolatey(self) -> Optional[List[str]]:
+        """Liste les paquets chocolatey installés"""
+        # --local-only est nécessaire avant Chocolatey 2 et refusé depuis
+        for command in (["choco", "list", "--local-only", "--limit-output"],
+                        ["choco", "list", "--limit-output"]):
+            success, stdout, _ = self.run_command_output(command)
+            if success:
+                return parse_choco_list(stdout)
+        return None
+    
+    def is_already_installed(self, software: Dict) -> bool:
+        """Indique (en O(1)) si le logiciel figure dans l'inventaire de son gestionnaire"""
+        if not self.skip_installed or software['name'] in self.reinstall_names:
             return False
+        return self.inventory.contains(software.method, software.package_id)
     
-    def verify_checksum(self, file_path: str, expected_checksum: str) -> bool:
-        """Vérifie la somme de contrôle d'un fichier"""
-        try:
-            import hashlib
-            
-            if not expected_checksum.startswith('sha256:'):
-                self.logger.warning(f"Type de checksum non supporté: {expected_checksum}")
+    def _record_already_installed(self, software: Dict) -> bool:
+        """Enregistre un logiciel ignoré car déjà présent"""
+        name = software['name']
+        self.logger.info(f"✓ {name} déjà installé, ignoré")
+        with self._results_lock:
+            self.already_installed_software.append(name)
+        self.journal.record(name, ALREADY_INSTALLED)
+        return True
+    
+    def _finish_package(self, software: Dict, success: bool) -> bool:
+        """Journalise et enregistre le résultat d'une installation"""
+        name = software['name']
+        if success:
+            self.logger.info(f"✓ {name} installé avec succès")
+        else:
+            self.logger.error(f"✗ Échec de l'installation de {name}")
+        
+        self._record_result(name, success)
+        return success
+    
+    def get_base_directory(self, software: SoftwareEntry) -> Optional[str]:
+        """Retourne le dossier de base développé d'un logiciel, ou None"""
+        return software.base_directory
+    
+    def get_silent_args(self, software: SoftwareEntry) -> List[str]:
+        """Retourne les arguments silencieux de la configuration ou les arguments par défaut"""
+        return software.silent_args
+    
+    def run_with_retry(self, software: Dict, method: str, command: List[str],
+                       attempts_done: int = 0) -> bool:
+        """Exécute la commande d'installation selon la politique de nouvelles tentatives
+        
+        Le disjoncteur du gestionnaire est consulté avant chaque tentative : ouvert,
+        il fait échouer l'installation immédiatement. `attempts_done` tentatives ont
+        déjà échoué ailleurs (installation groupée) et sont décomptées de la politique.
+        """
+        name = software['name']
+        policy = self.retry.policy(software, method)
+        breaker = self.retry.breaker(method)
+        for attempt in range(attempts_done, policy.attempts):
+            # Inutile d'attendre si le gestionnaire vient d'être suspendu
+            if attempt > 0 and not breaker.is_open:
+                delay = policy.delay(attempt - 1)
+                self.logger.warning(f"⚠ {name}: nouvelle tentative {attempt}/{policy.attempts - 1} "
+                                    f"dans {delay:.1f}s")
+                time.sleep(delay)
+            if not breaker.allow():
+                self.logger.error(f"✗ {method} suspendu ({breaker.failures} échecs consécutifs), "
+                                  f"{name} non tenté")
+                return False
+            with self.install_slot():
+                success, _ = self.run_command(command)
+            breaker.record(success)
+            if success:
                 return True
-            
-            expected_hash = expected_checksum[7:]  # Enlever 'sha256:'
-            
-            with open(file_path, 'rb') as f:
-                file_hash = hashlib.sha256(f.read()).hexdigest()
-            
-            if file_hash.lower() == expected_hash.lower():
-                self.logger.info(f"✓ Checksum vérifié: {os.path.basename(file_path)}")
+        return False
+    
+    def install_with_backend(self, software: Dict, method: str, package_id: str,
+                             silent_args: List[str], attempts_done: int = 0) -> bool:
+        """Installe un paquet via winget ou chocolatey (réinstallation forcée si l'entrée a changé)"""
+        program = "winget" if method == 'winget' else "choco"
+        command = [program, "install", package_id] + silent_args
+        if software['name'] in self.reinstall_names:
+            command += [arg for arg in REINSTALL_ARGS[method] if arg not in silent_args]
+        with self.profiler.phase(software['name'], INSTALL, method=method) as phase:
+            success = self.run_with_retry(software, method, command, attempts_done)
+            phase['success'] = success
+        return success
+    
+    def install_with_fallback(self, software: Dict, attempts_done: int = 0) -> bool:
+        """Installe un paquet via son gestionnaire, puis via sa méthode de repli en cas d'échec
+        
+        `attempts_done` tentatives ont déjà été faites via le gestionnaire (installation groupée).
+        """
+        name = software['name']
+        method = software.get('method')
+        if attempts_done < self.retry.policy(software, method).attempts:
+            self.logger.info(f"Installation de {name}...")
+            self.journal.record(name, INSTALLING)
+            if self.install_with_backend(software, method, software.package_id,
+                                         self.get_silent_args(software), attempts_done):
                 return True
+        
+        fallback = self.retry.fallback(software)
+        if fallback is None:
+            return False
+        fallback_method, package_id = fallback
+        if not self.available_backends.get(fallback_method):
+            self.logger.warning(f"⚠ Repli de {name} impossible: {fallback_method} indisponible")
+            return False
+        self.logger.info(f"Repli de {name} sur {fallback_method} ({package_id})")
+        self.journal.record(name, INSTALLING, fallback=fallback_method)
+        # Le repli occupe une place du gestionnaire de repli (verrou global de chocolatey)
+        with self.backend_slot(fallback_method):
+            silent_args = software['fallback'].get('silent_args', default_silent_args(fallback_method))
+            return self.install_with_backend(software, fallback_method, package_id, silent_args)
+    
+    def backend_slot(self, method: str):
+        """Place du gestionnaire `method` dans l'ordonnanceur, le temps d'une installation"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(method)
+    
+    def install_slot(self):
+        """Place d'installation globale (une installation MSI à la fois), le temps d'une commande"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.install_slot()
+    
+    def install_package_winget(self, software: Dict[str, str]) -> bool:
+        """Installe un logiciel via winget"""
+        return self._finish_package(software, self.install_with_fallback(software))
+    
+    def install_package_chocolatey(self, software: Dict[str, str]) -> bool:
+        """Installe un logiciel via chocolatey"""
+        return self._finish_package(software, self.install_with_fallback(software))
+    
+    def batch_key(self, software: Dict):
+        """Clé de regroupement d'un logiciel (None s'il doit être installé seul)"""
+        method = software.get('method')
+        # Une réinstallation forcée ne se fait pas en lot
+        if method in self.unbatchable_methods or software['name'] in self.reinstall_names:
+            return None
+        silent_args = self.get_silent_args(software)
+        if method == 'winget' and is_winget_batchable(silent_args):
+            return ('winget',)
+        if method == 'chocolatey':
+            # Les arguments s'appliquent à tout le lot : ils doivent être identiques
+            return ('chocolatey',) + tuple(silent_args)
+        return None
+    
+    def install_batch(self, software_list: List[Dict]) -> Dict[str, bool]:
+        """Installe un lot de logiciels d'un même gestionnaire en une seule invocation"""
+        results = {}
+        for software in software_list:
+            if self._completed_before(software):
+                results[software['name']] = True
+            elif self.is_already_installed(software):
+                results[software['name']] = self._record_already_installed(software)
+        software_list = [software for software in software_list if software['name'] not in results]
+        if not software_list:
+            return results
+        
+        method = software_list[0].get('method')
+        breaker = self.retry.breaker(method)
+        if not breaker.allow():
+            # Gestionnaire suspendu : chaque logiciel échoue vite ou passe par son repli
+            for software in software_list:
+                results[software['name']] = self.install_package(software)
+            return results
+        package_ids = [software.package_id for software in software_list]
+        names = ', '.join(software['name'] for software in software_list)
+        self.logger.info(f"Installation groupée via {method} ({len(software_list)} logiciels): {names}")
+        for software in software_list:
+            self.journal.record(software['name'], INSTALLING, batch=len(software_list))
+        timeout = 300 * len(software_list)
+        
+        started = time.perf_counter()
+        if method == 'winget':
+            with self.install_slot():
+                success, stdout, stderr = self.install_batch_winget(package_ids, timeout)
+            parsed = parse_winget_import_output(stdout, package_ids)
+        else:
+            with self.install_slot():
+                success, stdout, stderr = self.run_command_output(
+                    ["choco", "install"] + package_ids + self.get_silent_args(software_list[0]),
+                    timeout
+                )
+            parsed = parse_choco_output(stdout, package_ids)
+        breaker.record(success or any(parsed.values()))
+        # Le lot occupe le gestionnaire pour chacun de ses logiciels
+        duration = time.perf_counter() - started
+        for software in software_list:
+            self.profiler.add(software['name'], INSTALL, started, duration,
+                              method=method, batch=len(software_list), success=success)
+        
+        recognized = any(outcome is not None for outcome in parsed.values())
+        if method == 'winget' and not recognized and stdout.strip():
+            # Messages de winget traduits : avec --ignore-unavailable, le code retour
+            # ne dit rien des paquets introuvables, le regroupement n'apporte plus rien
+            self.logger.warning("⚠ Sortie de winget import non reconnue (winget dans une autre langue "
+                                "que l'anglais ?), installations groupées winget désactivées")
+            self.unbatchable_methods.add(method)
+        
+        undetermined = []
+        for software, package_id in zip(software_list, package_ids):
+            # Le résultat lu dans la sortie prime sur le code retour du lot
+            outcome = parsed.get(package_id)
+            if outcome is None and success and (recognized or method != 'winget'):
+                outcome = True
+            if outcome is None:
+                undetermined.append(software)
+            elif outcome:
+                results[software['name']] = self._finish_package(software, True)
             else:
-                self.logger.error(f"✗ Checksum invalide: {os.path.basename(file_path)}")
-                return False
-                
+                # Le lot compte pour une tentative : la politique et le repli s'appliquent au reste
+                with log_context(package=software['name']):
+                    results[software['name']] = self._finish_package(
+                        software, self.install_with_fallback(software, attempts_done=1))
+        
+        if undetermined:
+            # Résultat introuvable dans la sortie : un nouvel inventaire tranche,
+            # sinon le paquet est réinstallé seul
+            installed = self.refresh_inventory(method)
+            for software in undetermined:
+                if installed is not None and installed.contains(method, software.package_id):
+                    results[software['name']] = self._finish_package(software, True)
+                else:
+                    self.logger.warning(f"⚠ Résultat de {software['name']} indéterminé, installation individuelle")
+                    results[software['name']] = self.install_package(software)
+        return results
+    
+    def refresh_inventory(self, method: str) -> Optional[InventorySnapshot]:
+        """Nouvel instantané des paquets installés d'un gestionnaire, ou None s'il est illisible"""
+        snapshot = {'winget': self.snapshot_winget, 'chocolatey': self.snapshot_chocolatey}[method]
+        try:
+            package_ids = snapshot()
         except Exception as e:
-            self.logger.error(f"✗ Erreur vérification checksum: {e}")
+            self.logger.warning(f"⚠ Inventaire {method} illisible: {e}")
+            return None
+        if package_ids is None:
+            return None
+        inventory = InventorySnapshot()
+        inventory.add(method, package_ids)
+        return inventory
+    
+    def install_batch_winget(self, package_ids: List[str], timeout: int) -> tuple[bool, str, str]:
+        """Installe un lot de paquets via `winget import`"""
+        temp_dir = self.expand_path_variables(self.base_directories.get('temp', '')) or None
+        if temp_dir and not os.path.isdir(temp_dir):
+            temp_dir = None
+        
+        fd, import_file = tempfile.mkstemp(prefix="winget_import_", suffix=".json", dir=temp_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(build_winget_import(package_ids), f, indent=2)
+            return self.run_command_output(["winget", "import", "-i", import_file] + WINGET_IMPORT_ARGS, timeout)
+        finally:
+            os.remove(import_file)
+    
+    def get_cache(self) -> Optional[InstallerCache]:
+        """Retourne le cache d'installateurs, ou None s'il est désactivé"""
+        cache_config = dict(self.config.get('cache', {}))
+        if not self.use_cache or not cache_config.get('enabled', True):
+            return None
+        if self.cache_dir:
+            cache_config['directory'] = self.cache_dir
+        
+        downloads_dir = self.base_directories.get('downloads')
+        default_directory = os.path.join(self.expand_path_variables(downloads_dir), 'Cache') if downloads_dir else None
+        if not cache_config.get('directory') and not default_directory:
+            return None
+        
+        try:
+            return InstallerCache.from_config(cache_config, default_directory, logger=self.logger)
+        except OSError as e:
+            self.logger.warning(f"⚠ Cache d'installateurs indisponible: {e}")
+            return None
+    
+    def get_downloader(self) -> DownloadEngine:
+        """Retourne le moteur de téléchargement (créé à la première utilisation)"""
+        if self.downloader is None:
+            downloads_config = dict(self.config.get('downloads', {}))
+            if self.bandwidth_limit_kbps:
+                downloads_config['bandwidth_limit_kbps'] = self.bandwidth_limit_kbps
+            self.downloader = DownloadEngine.from_config(downloads_config, cache=self.get_cache(),
+                                                         bundle=self.bundle, logger=self.logger)
+        return self.downloader
+    
+    def open_bundle(self) -> bool:
+        """Ouvre le paquet hors ligne passé par --bundle"""
+        try:
+            self.bundle = OfflineBundle.open(self.expand_path_variables(self.bundle_path), logger=self.logger)
+        except BundleError as e:
+            self.logger.error(f"✗ Paquet hors ligne inutilisable: {e}")
             return False
+        self.logger.info(f"Paquet hors ligne: {len(self.bundle)} installateurs ({self.bundle.directory})")
+        return True
+    
+    def bundle_items(self, software_list: List[Dict]) -> tuple[List[tuple], List[Dict]]:
+        """Installateurs à mettre dans un paquet hors ligne, et logiciels qui n'en ont pas
+        
+        Les logiciels winget/chocolatey sont installés depuis les dépôts des gestionnaires
+        et ne peuvent pas être mis dans le paquet.
+        """
+        items, unbundled = [], []
+        for software in software_list:
+            method = software.get('method')
+            if method == 'custom':
+                download = self.get_installer_download(software)
+                if not download:
+                    continue
+                valid, checksum = self.resolve_checksum(software)
+                if valid:
+                    items.append((software['name'], download[0], os.path.basename(download[1]), checksum))
+            elif method == 'direct':
+                download_url = software['download_url']
+                items.append((software['name'], download_url, os.path.basename(download_url), None))
+            else:
+                unbundled.append({"name": software['name'], "method": method})
+        return items, unbundled
+    
+    def get_installer_download(self, software: SoftwareEntry) -> Optional[tuple[str, str]]:
+        """Retourne l'URL et le chemin local de l'installateur d'un logiciel personnalisé"""
+        return software.installer_download
+    
+    def resolve_checksum(self, software: SoftwareEntry) -> tuple[bool, Optional[tuple[str, str]]]:
+        """Somme de contrôle de l'installateur d'un logiciel (analysée à la compilation)
+        
+        Retourne (valide, (algorithme, empreinte)). Un type non supporté est ignoré
+        avec un avertissement, sauf en mode strict où il est refusé. Une empreinte
+        mal formée d'un type connu (tronquée, caractère non hexadécimal) est toujours
+        refusée : l'installateur ne serait sinon jamais vérifié.
+        """
+        error = software.checksum_error
+        if error is None:
+            return True, software.checksum
+        if isinstance(error, UnsupportedChecksumError):
+            if self.strict_checksums or self.config.get('strict_checksums', False):
+                self.logger.error(f"✗ {error}")
+                return False, None
+            self.logger.warning(f"{error}")
+            return True, None
+        self.logger.error(f"✗ {error}")
+        return False, None
+    
+    def prefetch_downloads(self, plan: InstallPlan) -> None:
+        """Lance le pipeline de téléchargement des installateurs du plan
+        
+        Les installateurs sont téléchargés et vérifiés dans l'ordre du plan, au plus
+        `pipeline.depth` en avance sur les installations.
+        """
+        downloads = []
+        for software in plan:
+            if software.get('method') != 'custom' or software['name'] in self.previously_completed:
+                continue
+            download = self.get_installer_download(software)
+            if not download:
+                continue
+            valid, checksum = self.resolve_checksum(software)
+            if valid:
+                downloads.append((software['name'],) + download + (checksum,))
+        
+        if not downloads:
+            return
+        
+        depth = self.config.get('pipeline', {}).get('depth', DEFAULT_DEPTH)
+        self.logger.info(f"Préchargement de {len(downloads)} installateurs ({depth} en avance au plus)...")
+        self.pipeline = DownloadPipeline(self.get_downloader(), depth, logger=self.logger)
+        self.pipeline.start(downloads)
+    
+    def download_file(self, url: str, filename: str, download_dir: str,
+                      checksum: Optional[tuple[str, str]] = None) -> bool:
+        """Télécharge un fichier depuis une URL (réutilise un préchargement en cours)
+        
+        Si `checksum` est fourni, l'empreinte est calculée pendant le transfert.
+        """
+        download_path = os.path.join(download_dir, filename)
+        self.logger.info(f"Téléchargement de {url} vers {download_path}")
+        
+        if not self.get_downloader().download(url, download_path, checksum):
+            return False
+        
+        self.logger.info(f"✓ Téléchargement réussi: {filename}")
+        return True
+    
+    def profile_download(self, name: str, installer_path: str) -> None:
+        """Enregistre les mesures du téléchargement (durée, débit, hachage) dans le profil"""
+        stats = self.get_downloader().download_stats(installer_path)
+        if not stats:
+            return
+        seconds = stats['seconds']
+        throughput = stats['bytes'] / seconds if seconds > 0 else None
+        self.profiler.add(name, DOWNLOAD, stats['started'], seconds, source=stats['source'],
+                          bytes=stats['bytes'], bytes_per_second=throughput)
+        if stats['hash_seconds']:
+            # Hachage effectué au fil du transfert, inclus dans la durée du téléchargement
+            self.profiler.add(name, HASH, stats['started'], stats['hash_seconds'])
     
     def execute_commands(self, commands: List[str], software_name: str) -> bool:
         """Exécute une liste de commandes"""
@@ -243,47 +712,63 @@ class SoftwareInstaller:
     
     def install_software_custom(self, software: Dict[str, str]) -> bool:
         """Installe un logiciel avec un installateur personnalisé"""
+        if self.pipeline is None:
+            return self._install_software_custom(software)
+        
         name = software['name']
-        installer_config = software.get('installer', {})
+        self.pipeline.claim(name)
+        try:
+            return self._install_software_custom(software)
+        finally:
+            # Place libérée dans le pipeline : le téléchargement suivant démarre
+            self.pipeline.release(name)
+            download = self.get_installer_download(software)
+            if download and not self.config.get('pipeline', {}).get('keep_installers', True):
+                if os.path.exists(download[1]):
+                    os.remove(download[1])
+    
+    def _install_software_custom(self, software: SoftwareEntry) -> bool:
+        name = software['name']
+        installer_config = software.installer
         
         if installer_config.get('type') != 'custom':
             return False
         
         self.logger.info(f"Installation personnalisée de {name}...")
         
-        # Récupération des chemins
-        installers_dir = self.expand_path_variables(self.base_directories.get('installers', ''))
-        temp_dir = self.expand_path_variables(self.base_directories.get('temp', ''))
-        
         # Commandes pré-installation
         pre_commands = installer_config.get('pre_install_commands', [])
         if pre_commands:
             self.logger.info(f"Exécution des commandes pré-installation pour {name}")
-            if not self.execute_commands(pre_commands, name):
-                return False
+            with self.profiler.phase(name, PRE_INSTALL):
+                if not self.execute_commands(pre_commands, name):
+                    return False
         
-        # Téléchargement si nécessaire
-        download_url = installer_config.get('download_url')
-        if download_url:
-            filename = installer_config.get('filename', os.path.basename(download_url))
+        # Téléchargement si nécessaire (déjà lancé en arrière-plan par prefetch_downloads)
+        download = self.get_installer_download(software)
+        if download:
+            download_url, installer_path = download
+            filename = os.path.basename(installer_path)
             
-            if not self.download_file(download_url, filename, installers_dir):
+            # Le checksum éventuel est vérifié pendant le téléchargement
+            valid, checksum = self.resolve_checksum(software)
+            if not valid:
                 return False
             
-            installer_path = os.path.join(installers_dir, filename)
-            
-            # Vérification du checksum si fourni
-            checksum = installer_config.get('checksum')
-            if checksum:
-                if not self.verify_checksum(installer_path, checksum):
-                    return False
+            self.journal.record(name, DOWNLOADING, url=download_url)
+            downloaded = self.download_file(download_url, filename, os.path.dirname(installer_path), checksum)
+            self.profile_download(name, installer_path)
+            if not downloaded:
+                return False
             
             # Installation
-            silent_args = installer_config.get('silent_args', [])
-            install_command = [installer_path] + silent_args
+            install_command = [installer_path] + self.get_silent_args(software)
             
             self.logger.info(f"Installation de {name}...")
-            success, output = self.run_command(install_command)
+            self.journal.record(name, INSTALLING)
+            with self.profiler.phase(name, INSTALL, method="custom") as phase:
+                success = self.run_with_retry(software, 'custom', install_command)
+                phase['success'] = success
             
             if not success:
                 self.logger.error(f"✗ Échec installation {name}")
@@ -293,41 +778,62 @@ class SoftwareInstaller:
         post_commands = installer_config.get('post_install_commands', [])
         if post_commands:
             self.logger.info(f"Exécution des commandes post-installation pour {name}")
-            if not self.execute_commands(post_commands, name):
-                return False
+            with self.profiler.phase(name, POST_INSTALL):
+                if not self.execute_commands(post_commands, name):
+                    return False
         
-        # Vérification du dossier de base
-        base_directory = software.get('base_directory')
-        if base_directory:
-            expanded_base_dir = self.expand_path_variables(base_directory)
-            if os.path.exists(expanded_base_dir):
-                self.logger.info(f"✓ Dossier de base vérifié: {expanded_base_dir}")
-            else:
-                self.logger.warning(f"⚠ Dossier de base non trouvé: {expanded_base_dir}")
+        return True
+    
+    def install_package_direct(self, software: Dict[str, str]) -> bool:
+        """Installe un logiciel via téléchargement direct (legacy)"""
+        name = software['name']
+        download_url = software.get('download_url')
+        installer_args = software.get('installer_args', [])
+        
+        if not download_url:
+            self.logger.error(f"URL de téléchargement manquante pour {name}")
+            return False
         
+        self.logger.info(f"Téléchargement de {name}...")
+        # Ici vous pourriez implémenter le téléchargement et l'installation
+        # Pour l'instant, on log juste l'information
+        self.logger.info(f"URL: {download_url}")
+        self.logger.info(f"Arguments: {installer_args}")
         return True
     
-    def install_software_direct(self, software_list: List[Dict[str, str]]) -> None:
-        """Installe les logiciels via téléchargement direct (legacy)"""
-        self.logger.info("Installation des logiciels via téléchargement direct...")
+    def install_package(self, software: Dict[str, str]) -> bool:
+        """Installe un logiciel selon sa méthode et enregistre le résultat"""
+        # Les enregistrements de log émis pendant l'installation portent le nom du logiciel
+        with log_context(package=software['name']):
+            return self._install_package(software)
+    
+    def _install_package(self, software: Dict[str, str]) -> bool:
+        method = software.get('method')
         
-        for software in software_list:
-            if software.get('method') != 'direct':
-                continue
-                
+        if self._completed_before(software):
+            return True
+        if self.is_already_installed(software):
+            return self._record_already_installed(software)
+        
+        if method == 'winget':
+            return self.install_package_winget(software)
+        if method == 'chocolatey':
+            return self.install_package_chocolatey(software)
+        if method == 'custom':
             name = software['name']
-            download_url = software.get('download_url')
-            installer_args = software.get('installer_args', [])
-            
-            if not download_url:
-                self.logger.error(f"URL de téléchargement manquante pour {name}")
-                continue
-            
-            self.logger.info(f"Téléchargement de {name}...")
-            # Ici vous pourriez implémenter le téléchargement et l'installation
-            # Pour l'instant, on log juste l'information
-            self.logger.info(f"URL: {download_url}")
-            self.logger.info(f"Arguments: {installer_args}")
+            success = self.install_software_custom(software)
+            if success:
+                self.logger.info(f"✓ {name} installé avec succès")
+            else:
+                self.logger.error(f"✗ Échec de l'installation de {name}")
+            self._record_result(name, success)
+            return success
+        if method == 'direct':
+            # Le mode direct ne fait que journaliser, il n'entre pas dans le rapport
+            return self.install_package_direct(software)
+        
+        self.logger.warning(f"Méthode d'installation inconnue pour {software.get('name')}: {method}")
+        return False
     
     def expand_path_variables(self, path: str) -> str:
         """Remplace les variables d'environnement dans un chemin"""
@@ -345,21 +851,59 @@ class SoftwareInstaller:
             except Exception as e:
                 self.logger.error(f"✗ Erreur création dossier {dir_name}: {e}")
     
-    def load_software_config(self, config_file: str = "software_config.json") -> Dict:
-        """Charge la configuration des logiciels depuis un fichier JSON"""
-        if not os.path.exists(config_file):
-            self.logger.warning(f"Fichier de configuration {config_file} non trouvé, utilisation de la configuration par défaut")
-            return self.get_default_config()
+    def load_software_config(self, config_file: str = "software_config.json") -> Optional[Dict]:
+        """Charge, valide et compile la configuration des logiciels depuis un fichier JSON
         
+        Retourne None si la configuration est invalide (chaque erreur est journalisée
+        avec son emplacement).
+        """
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                self.config = config
-                self.base_directories = config.get('base_directories', {})
-                return config
-        except Exception as e:
+            if os.path.exists(config_file):
+                catalog = load_config(config_file)
+            else:
+                self.logger.warning(f"Fichier de configuration {config_file} non trouvé, utilisation de la configuration par défaut")
+                catalog = compile_config(self.get_default_config())
+        except ConfigError as e:
+            self.logger.error(f"Configuration invalide ({len(e.errors)} erreurs):")
+            for error in e.errors:
+                self.logger.error(f"  {error}")
+            return None
+        except OSError as e:
             self.logger.error(f"Erreur lors du chargement de la configuration: {e}")
-            return self.get_default_config()
+            return None
+        
+        self.catalog = catalog.expand(self.expand_path_variables)
+        self.config = catalog.raw
+        self.base_directories = catalog.raw.get('base_directories', {})
+        self.retry = RetryManager(self.config.get('retry'), logger=self.logger)
+        return self.config
+    
+    def select_software(self) -> Optional[List[SoftwareEntry]]:
+        """Applique --only/--exclude au catalogue et développe les chemins des seules entrées retenues"""
+        selected = sorted(self.selector.select(self.catalog), key=lambda entry: entry.index)
+        if self.selector:
+            self.logger.info(f"Sélection: {len(selected)} logiciels sur {len(self.catalog)}")
+            names = {entry.name for entry in selected}
+            excluded = [(entry.name, dep) for entry in selected for dep in entry.depends_on if dep not in names]
+            for name, dep in excluded:
+                self.logger.error(f"{name} dépend de {dep}, exclu de la sélection")
+            if excluded:
+                return None
+        self.catalog.expand_entries(selected)
+        return selected
+    
+    def load_install_plan(self, software_list: List[Dict]) -> Optional[InstallPlan]:
+        """Construit le plan d'installation (dépendances, conflits, ordre topologique)"""
+        try:
+            plan = build_install_plan(software_list)
+        except PlanError as e:
+            self.logger.error(f"Configuration invalide: {e}")
+            return None
+        
+        with_dependencies = sum(1 for deps in plan.dependencies.values() if deps)
+        if with_dependencies:
+            self.logger.info(f"Plan d'installation: {with_dependencies} logiciels avec dépendances")
+        return plan
     
     def get_default_config(self) -> Dict:
         """Retourne la configuration par défaut"""
@@ -377,31 +921,315 @@ class SoftwareInstaller:
             ]
         }
     
+    def verify_installs(self, software_list: List[Dict]) -> Optional[Dict]:
+        """Vérifie en parallèle les logiciels et écrit le rapport de santé
+        
+        Seuls les logiciels avec un dossier de base ou une section `verify` sont vérifiés.
+        """
+        targets = []
+        for software in software_list:
+            base_directory = self.get_base_directory(software)
+            verify_config = software.get('verify') or {}
+            if base_directory or verify_config:
+                targets.append((software['name'], base_directory, verify_config))
+        if not targets:
+            return None
+        
+        verification_config = self.config.get('verification', {})
+        cache = VerificationCache(verification_config.get('cache_file', DEFAULT_CACHE_FILE)).load()
+        verifier = InstallVerifier(self.get_command_engine(), cache,
+                                   max_workers=verification_config.get('max_workers', DEFAULT_VERIFY_WORKERS),
+                                   version_timeout=verification_config.get('version_timeout',
+                                                                           DEFAULT_VERSION_TIMEOUT),
+                                   logger=self.logger)
+        self.logger.info(f"Vérification de {len(targets)} logiciels...")
+        report = verifier.verify_all(targets)
+        report_file = verification_config.get('report_file', DEFAULT_REPORT_FILE)
+        try:
+            cache.save()
+            write_report(report, report_file)
+        except OSError as e:
+            self.logger.warning(f"⚠ Rapport de santé non écrit: {e}")
+        
+        summary = report['summary']
+        self.logger.info(f"Vérification: {summary['healthy']}/{summary['verified']} logiciels sains "
+                         f"en {report['seconds']:.1f}s ({report_file})")
+        self.health_report = report
+        return report
+    
     def generate_report(self) -> None:
-        """Génère un rapport d'installation"""
+        """Génère un rapport d'installation à partir du journal d'exécution"""
         report_file = "installation_report.txt"
         
+        # Le journal couvre aussi les logiciels traités avant une reprise
+        summary = self.journal.summary()
+        installed = summary.get(DONE, [])
+        failed = summary.get(FAILED, [])
+        already_installed = summary.get(ALREADY_INSTALLED, [])
+        unchanged = summary.get(UNCHANGED, [])
+        skipped = summary.get(SKIPPED, [])
+        removed = summary.get(REMOVED, [])
+        unfinished = summary.get(PLANNED, []) + summary.get(DOWNLOADING, []) + summary.get(INSTALLING, [])
+        
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write("=== RAPPORT D'INSTALLATION ===\n\n")
             f.write(f"Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             
             f.write("LOGICIELS INSTALLÉS AVEC SUCCÈS:\n")
             f.write("-" * 40 + "\n")
-            for software in self.installed_software:
+            for software in installed:
                 f.write(f"✓ {software}\n")
             
             f.write(f"\nLOGICIELS EN ÉCHEC:\n")
             f.write("-" * 40 + "\n")
-            for software in self.failed_software:
+            for software in failed:
                 f.write(f"✗ {software}\n")
             
+            if already_installed:
+                f.write(f"\nLOGICIELS DÉJÀ INSTALLÉS:\n")
+                f.write("-" * 40 + "\n")
+                for software in already_installed:
+                    f.write(f"= {software}\n")
+            
+            if unchanged:
+                f.write(f"\nLOGICIELS INCHANGÉS DEPUIS LA DERNIÈRE APPLICATION:\n")
+                f.write("-" * 40 + "\n")
+                for software in unchanged:
+                    f.write(f"= {software}\n")
+            
+            if skipped:
+                f.write(f"\nLOGICIELS IGNORÉS (DÉPENDANCES EN ÉCHEC):\n")
+                f.write("-" * 40 + "\n")
+                for software in skipped:
+                    f.write(f"- {software}\n")
+            
+            if removed:
+                f.write(f"\nLOGICIELS DÉSINSTALLÉS:\n")
+                f.write("-" * 40 + "\n")
+                for software in removed:
+                    f.write(f"- {software}\n")
+            
+            if unfinished:
+                f.write(f"\nLOGICIELS NON TRAITÉS:\n")
+                f.write("-" * 40 + "\n")
+                for software in unfinished:
+                    f.write(f"? {software}\n")
+            
+            unhealthy = self.health_report['unhealthy'] if self.health_report else []
+            if unhealthy:
+                f.write(f"\nLOGICIELS EN ÉCHEC DE VÉRIFICATION:\n")
+                f.write("-" * 40 + "\n")
+                for software in unhealthy:
+                    f.write(f"! {software}\n")
+            
             f.write(f"\nRÉSUMÉ:\n")
             f.write("-" * 40 + "\n")
-            f.write(f"Total installé: {len(self.installed_software)}\n")
-            f.write(f"Total en échec: {len(self.failed_software)}\n")
+            f.write(f"Total installé: {len(installed)}\n")
+            f.write(f"Total en échec: {len(failed)}\n")
+            f.write(f"Total ignoré: {len(skipped)}\n")
+            f.write(f"Total déjà installé: {len(already_installed)}\n")
+            if unchanged:
+                f.write(f"Total inchangé: {len(unchanged)}\n")
+            if removed:
+                f.write(f"Total désinstallé: {len(removed)}\n")
+            if unfinished:
+                f.write(f"Total non traité: {len(unfinished)}\n")
+            if unhealthy:
+                f.write(f"Total en échec de vérification: {len(unhealthy)}\n")
         
         self.logger.info(f"Rapport généré: {report_file}")
     
+    def write_profile(self) -> None:
+        """Exporte les mesures par phase (JSON et trace Chrome) et affiche le résumé avec --profile"""
+        timings_file = "install_timings.json"
+        trace_file = "install_trace.json"
+        self.profiler.export_json(timings_file)
+        self.profiler.export_chrome_trace(trace_file)
+        self.logger.info(f"Mesures de temps: {timings_file} (trace: {trace_file}, "
+                         f"à ouvrir dans chrome://tracing ou ui.perfetto.dev)")
+        
+        if not self.profile:
+            return
+        summary = self.profiler.summary()
+        packages = self.profiler.packages()
+        self.logger.info("=== PROFIL D'INSTALLATION ===")
+        self.logger.info("Logiciels les plus lents (temps actif):")
+        for name, seconds in summary['packages']:
+            details = ', '.join(f"{phase} {duration:.1f}s" for phase, duration in packages[name].items())
+            self.logger.info(f"  {seconds:8.1f}s  {name} ({details})")
+        self.logger.info("Phases les plus coûteuses (cumul tous logiciels):")
+        for phase, seconds in summary['phases']:
+            self.logger.info(f"  {seconds:8.1f}s  {phase}")
+    
+    def plan_incremental(self, plan: InstallPlan) -> PlanDiff:
+        """Compare le plan à l'état de la dernière application (--incremental)
+        
+        Les logiciels inchangés ne sont pas traités, les logiciels modifiés sont
+        réinstallés même s'ils figurent dans l'inventaire.
+        """
+        diff = self.applied_state.diff(plan)
+        # Hors sélection, un logiciel absent du plan n'a pas été retiré de la configuration
+        diff.remove = [software for software in diff.remove
+                       if software['name'] not in self.catalog and self.selector.matches(software)]
+        self.logger.info("Plan incrémental:")
+        for line in diff.format():
+            self.logger.info(f"  {line}")
+        for software in diff.unchanged:
+            self.previously_completed[software['name']] = "inchangé depuis la dernière application"
+        self.unchanged_names = {software['name'] for software in diff.unchanged}
+        self.reinstall_names = {software['name'] for software in diff.reinstall}
+        return diff
+    
+    def remove_packages(self, software_list: List[Dict], winget_ok: bool, choco_ok: bool) -> None:
+        """Désinstalle les logiciels retirés de la configuration"""
+        commands = {
+            'winget': (winget_ok, lambda package_id: ["winget", "uninstall", "--id", package_id, "--exact",
+                                                      "--silent", "--accept-source-agreements"]),
+            'chocolatey': (choco_ok, lambda package_id: ["choco", "uninstall", package_id, "-y"]),
+        }
+        for software in software_list:
+            name = software['name']
+            if name in self.previously_completed:
+                continue
+            available, build_command = commands.get(software.get('method'), (False, None))
+            if build_command is None:
+                self.logger.warning(f"⚠ {name} retiré de la configuration : désinstallation manuelle nécessaire "
+                                    f"(méthode {software.get('method')})")
+                self.applied_state.removed(name)
+                continue
+            if not available:
+                continue
+            
+            self.logger.info(f"Désinstallation de {name}...")
+            success, _ = self.run_command(build_command(software.package_id))
+            if success:
+                self.logger.info(f"✓ {name} désinstallé")
+                self.removed_software.append(name)
+                self.applied_state.removed(name)
+                self.journal.record(name, REMOVED)
+            else:
+                self.logger.error(f"✗ Échec désinstallation {name}")
+    
+    def save_applied_state(self, plan: InstallPlan, config_file: str) -> None:
+        """Enregistre les entrées appliquées avec succès, base du prochain --incremental"""
+        succeeded = set(self.installed_software) | set(self.already_installed_software)
+        for software in plan:
+            if software['name'] in succeeded or software['name'] in self.previously_completed:
+                self.applied_state.applied(software)
+        try:
+            self.applied_state.save(config_file)
+        except OSError as e:
+            self.logger.warning(f"⚠ Impossible d'enregistrer l'état appliqué: {e}")
+    
+    def start_journal(self, config_file: str, plan: InstallPlan) -> None:
+        """Ouvre le journal d'exécution, ou reprend l'exécution interrompue avec --resume"""
+        config_hash = None
+        if os.path.exists(config_file):
+            with open(config_file, 'rb') as f:
+                config_hash = hashlib.sha256(f.read()).hexdigest()
+        
+        states = self.journal.resume(config_hash) if self.resume else {}
+        if self.resume and not states:
+            self.logger.warning("Aucune exécution à reprendre, démarrage d'une nouvelle exécution")
+        if not states:
+            self.journal.start(config_file, config_hash)
+        
+        resumed = [name for name, state in states.items() if state in COMPLETED_STATES]
+        for name in resumed:
+            self.previously_completed[name] = "déjà traité lors de l'exécution interrompue"
+        if self.resume and states:
+            self.logger.info(f"Reprise de l'exécution: {len(resumed)} logiciels déjà traités, "
+                             f"{sum(1 for software in plan if software['name'] not in self.previously_completed)} restants")
+        
+        for software in plan:
+            name = software['name']
+            # Le mode direct ne fait que journaliser, il n'entre pas dans le rapport
+            if software.get('method') == 'direct':
+                continue
+            if name in self.unchanged_names:
+                # Journalisé comme terminé : le rapport et une reprise sans --incremental le comptent
+                if states.get(name) not in COMPLETED_STATES:
+                    self.journal.record(name, UNCHANGED, method=software.get('method'))
+            elif name not in self.previously_completed:
+                self.journal.record(name, PLANNED, method=software.get('method'))
+    
+    def run_serial(self, plan: InstallPlan, winget_ok: bool, choco_ok: bool) -> None:
+        """Installe les logiciels un par un dans l'ordre topologique du plan
+
+        Sans dépendances déclarées, l'ordre reste winget, chocolatey, personnalisés puis direct.
+        """
+        available = {
+            'winget': winget_ok,
+            'chocolatey': choco_ok,
+            'custom': True,
+            'direct': True,
+        }
+        self.available_backends = available
+        results: Dict[str, Optional[bool]] = {}
+        started = time.perf_counter()
+        
+        for software in plan:
+            name = software['name']
+            method = software.get('method')
+            
+            failed = [dep for dep in plan.dependencies_of(name) if not results.get(dep)]
+            if failed:
+                self._record_skipped(software, failed)
+                results[name] = None
+            elif not available.get(method, False):
+                # Gestionnaire indisponible : le logiciel n'est pas tenté
+                results[name] = None
+            else:
+                # En série, chaque logiciel attend la fin de tous ceux qui le précèdent
+                self.profiler.add_wait(name, time.perf_counter() - started)
+                results[name] = self.install_package(software)
+    
+    def run_parallel(self, plan: InstallPlan, winget_ok: bool, choco_ok: bool) -> None:
+        """Installe les logiciels en parallèle avec une limite de concurrence par gestionnaire
+
+        Les branches indépendantes du plan s'exécutent simultanément ; seuls les
+        dépendants d'un logiciel en échec sont ignorés.
+        """
+        available = {
+            'winget': winget_ok,
+            'chocolatey': choco_ok,
+            'custom': True,
+            'direct': True,
+        }
+        self.available_backends = available
+        
+        packages = []
+        for software in plan:
+            method = software.get('method')
+            if method not in available:
+                self.logger.warning(f"Méthode d'installation inconnue pour {software.get('name')}: {method}")
+            elif available[method]:
+                packages.append(software)
+        
+        scheduler_config = self.config.get('scheduler', {})
+        max_workers = self.max_workers or scheduler_config.get('max_workers', DEFAULT_MAX_WORKERS)
+        scheduler = self.scheduler = InstallScheduler(
+            max_workers=max_workers,
+            concurrency=scheduler_config.get('concurrency'),
+            batch_size=scheduler_config.get('batch_size', DEFAULT_BATCH_SIZE),
+            max_installs=scheduler_config.get('max_installs', DEFAULT_MAX_INSTALLS),
+            logger=self.logger
+        )
+        batch = self.batch or scheduler_config.get('batch', False)
+        
+        self.logger.info(f"Installation parallèle de {len(packages)} logiciels ({scheduler.max_workers} workers max, "
+                         f"{scheduler.max_installs} installation(s) simultanée(s))")
+        scheduler.run(
+            packages,
+            self.install_package,
+            lambda software: software['method'],
+            dependencies=plan.dependencies,
+            skip_fn=self._record_skipped,
+            batch_fn=self.install_batch if batch else None,
+            batch_key_fn=self.batch_key if batch else None,
+            start_fn=lambda software, waited: self.profiler.add_wait(software['name'], waited)
+        )
+    
     def run(self, config_file: Optional[str] = None):
         """Lance le processus d'installation"""
         self.logger.info("=== DÉMARRAGE DE L'INSTALLATION DES LOGICIELS ===")
@@ -413,10 +1241,30 @@ class SoftwareInstaller:
             return
         
         # Chargement de la configuration
-        config = self.load_software_config(config_file)
-        software_list = config.get('software_list', [])
+        config_file = config_file or "software_config.json"
+        if self.load_software_config(config_file) is None:
+            return
+        software_list = self.select_software()
+        if software_list is None:
+            return
+        if self.bundle_path and not self.open_bundle():
+            return
         self.logger.info(f"Configuration chargée: {len(software_list)} logiciels à installer")
         
+        plan = self.load_install_plan(software_list)
+        if plan is None:
+            return
+        
+        # Seules les différences avec la dernière application sont traitées
+        try:
+            self.applied_state.load()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠ État de la dernière application illisible, ignoré: {e}")
+        diff = self.plan_incremental(plan) if self.incremental else None
+        
+        # Journal d'exécution (reprise possible après un arrêt brutal)
+        self.start_journal(config_file, plan)
+        
         # Création des dossiers de base
         self.create_directories()
         
@@ -432,39 +1280,258 @@ class SoftwareInstaller:
         # Installation des logiciels
         self.logger.info("Début de l'installation des logiciels...")
         
-        # Installation via winget
-        if winget_ok:
-            self.install_software_winget(software_list)
+        # Un seul instantané des logiciels installés, consulté ensuite en O(1)
+        if self.skip_installed:
+            available = [method for method, ok in (('winget', winget_ok), ('chocolatey', choco_ok)) if ok]
+            self.take_inventory([method for method in available
+                                 if any(software.get('method') == method for software in plan)])
         
-        # Installation via chocolatey
-        if choco_ok:
-            self.install_software_chocolatey(software_list)
+        if diff is not None and diff.remove:
+            self.remove_packages(diff.remove, winget_ok, choco_ok)
         
-        # Installation personnalisée
-        self.logger.info("Installation des logiciels personnalisés...")
-        for software in software_list:
-            if software.get('method') == 'custom':
-                name = software['name']
-                if self.install_software_custom(software):
-                    self.installed_software.append(name)
-                    self.logger.info(f"✓ {name} installé avec succès")
-                else:
-                    self.failed_software.append(name)
-                    self.logger.error(f"✗ Échec de l'installation de {name}")
-        
-        # Installation directe (legacy)
-        self.install_software_direct(software_list)
+        # Les installateurs se téléchargent pendant que les premiers logiciels s'installent
+        self.prefetch_downloads(plan)
+        try:
+            if self.serial:
+                self.run_serial(plan, winget_ok, choco_ok)
+            else:
+                self.run_parallel(plan, winget_ok, choco_ok)
+            
+            # Vérification des logiciels présents (installés ou déjà là)
+            if self.verify:
+                summary = self.journal.summary()
+                present = set(summary.get(DONE, []) + summary.get(ALREADY_INSTALLED, []))
+                self.verify_installs([software for software in plan if software['name'] in present])
+        finally:
+            if self.downloader is not None:
+                self.downloader.shutdown()
+            if self.command_engine is not None:
+                self.command_engine.shutdown()
+                self.command_engine = None
         
         # Génération du rapport
+        self.save_applied_state(plan, config_file)
         self.generate_report()
+        self.write_profile()
+        self.journal.close()
         
         self.logger.info("=== INSTALLATION TERMINÉE ===")
         self.logger.info(f"Logiciels installés: {len(self.installed_software)}")
         self.logger.info(f"Logiciels en échec: {len(self.failed_software)}")
+        if self.skipped_software:
+            self.logger.info(f"Logiciels ignorés: {len(self.skipped_software)}")
+        if self.already_installed_software:
+            self.logger.info(f"Logiciels déjà installés: {len(self.already_installed_software)}")
+        if self.removed_software:
+            self.logger.info(f"Logiciels désinstallés: {len(self.removed_software)}")
+        for method, failures in self.retry.open_breakers().items():
+            self.logger.warning(f"⚠ {method} suspendu en fin d'exécution ({failures} échecs consécutifs)")
+
+def run_cache_command(installer: SoftwareInstaller, args: argparse.Namespace) -> int:
+    """Exécute les sous-commandes `cache stats` et `cache prune`"""
+    if installer.load_software_config(args.config or "software_config.json") is None:
+        return 1
+    cache = installer.get_cache()
+    if cache is None:
+        print("Aucun cache d'installateurs configuré")
+        return 1
+    
+    if args.cache_command == "prune":
+        max_size = args.max_size * 1024 * 1024 if args.max_size is not None else None
+        removed, freed = cache.prune(max_size)
+        print(f"{removed} installateurs supprimés, {freed / (1024 * 1024):.1f} Mo libérés")
+        return 0
+    
+    stats = cache.stats()
+    print(f"Dossier      : {stats['directory']}")
+    print(f"Installateurs: {stats['objects']} ({stats['urls']} URL indexées)")
+    print(f"Taille       : {stats['size'] / (1024 * 1024):.1f} Mo / {stats['max_size'] / (1024 * 1024):.0f} Mo")
+    if stats['oldest_use']:
+        print(f"Utilisation  : du {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest_use']))}"
+              f" au {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['newest_use']))}")
+    return 0
+
+def run_bundle_command(installer: SoftwareInstaller, args: argparse.Namespace) -> int:
+    """Exécute la sous-commande `bundle build`"""
+    config_file = args.config or "software_config.json"
+    if installer.load_software_config(config_file) is None:
+        return 1
+    software_list = installer.select_software()
+    if software_list is None:
+        return 1
+    
+    items, unbundled = installer.bundle_items(software_list)
+    try:
+        manifest = build_bundle(items, args.destination, installer.get_downloader(), unbundled=unbundled,
+                                config_file=config_file, archive=args.archive, logger=installer.logger)
+    finally:
+        installer.get_downloader().shutdown()
+    
+    size = sum({entry['path']: entry['size'] for entry in manifest['entries'].values()}.values())
+    print(f"{len(manifest['entries'])} installateurs dans le paquet ({size / (1024 * 1024):.1f} Mo)")
+    if unbundled:
+        print(f"{len(unbundled)} logiciels winget/chocolatey nécessiteront le réseau")
+    for url in manifest['failed']:
+        print(f"✗ Échec: {url}")
+    return 1 if manifest['failed'] else 0
+
+def run_verify_command(installer: SoftwareInstaller, args: argparse.Namespace) -> int:
+    """Exécute la sous-commande `verify` (vérifie les logiciels sélectionnés, sans rien installer)"""
+    if installer.load_software_config(args.config or "software_config.json") is None:
+        return 1
+    software_list = installer.select_software()
+    if software_list is None:
+        return 1
+    try:
+        report = installer.verify_installs(software_list)
+    finally:
+        installer.get_command_engine().shutdown()
+    if report is None:
+        print("Aucun logiciel à vérifier (ni dossier de base, ni section verify)")
+        return 0
+    for name in report['unhealthy']:
+        failed = [check['check'] for check in report['packages'][name]['checks'] if not check['ok']]
+        print(f"✗ {name}: {', '.join(failed)}")
+    print(f"{report['summary']['healthy']}/{report['summary']['verified']} logiciels sains")
+    return 1 if report['unhealthy'] else 0
+
+def run_plan_command(installer: SoftwareInstaller, args: argparse.Namespace) -> int:
+    """Affiche les actions d'un plan incrémental (`plan` ou `plan --diff ANCIEN NOUVEAU`)"""
+    def software_list(config_file: str) -> Optional[List[Dict]]:
+        if not os.path.exists(config_file):
+            print(f"Fichier de configuration introuvable: {config_file}")
+            return None
+        try:
+            return load_config(config_file).entries
+        except ConfigError as e:
+            print("\n".join(e.errors))
+            return None
+    
+    new_file = args.diff[1] if args.diff else (args.config or "software_config.json")
+    new = software_list(new_file)
+    if new is None:
+        return 1
+    if args.diff:
+        old = software_list(args.diff[0])
+        if old is None:
+            return 1
+        diff = diff_entries([software for software in old if installer.selector.matches(software)],
+                            [software for software in new if installer.selector.matches(software)])
+    else:
+        catalog_names = {software['name'] for software in new}
+        diff = installer.applied_state.load().diff(
+            [software for software in new if installer.selector.matches(software)]
+        )
+        diff.remove = [software for software in diff.remove
+                       if software['name'] not in catalog_names and installer.selector.matches(software)]
+    
+    for line in diff.format():
+        print(line)
+    return 0
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Réinstallation automatique des logiciels pour Windows 11")
+    parser.add_argument("--config", help="Fichier de configuration JSON")
+    parser.add_argument("--serial", action="store_true",
+                        help="Installe les logiciels un par un (comportement historique)")
+    parser.add_argument("--max-workers", type=int,
+                        help=f"Nombre maximal d'installations simultanées (défaut: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--batch", action="store_true",
+                        help="Regroupe les paquets winget/chocolatey compatibles en quelques invocations")
+    parser.add_argument("--only", action="append", metavar="SÉLECTEUR",
+                        help="Ne traite que les logiciels sélectionnés : category:<catégorie>, tag:<étiquette> "
+                             "ou motif de nom (name:<motif>, avec * et ?). Option répétable")
+    parser.add_argument("--exclude", action="append", metavar="SÉLECTEUR",
+                        help="Exclut les logiciels sélectionnés (même syntaxe que --only). Option répétable")
+    parser.add_argument("--reinstall", action="store_true",
+                        help="Réinstalle les logiciels même s'ils sont déjà présents")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprend l'exécution interrompue en ne traitant que les logiciels non terminés")
+    parser.add_argument("--profile", action="store_true",
+                        help="Affiche les logiciels et les phases les plus lents en fin d'exécution")
+    parser.add_argument("--state", metavar="FICHIER",
+                        help=f"État de la dernière application, utilisé par --incremental (défaut: {DEFAULT_STATE_FILE})")
+    parser.add_argument("--journal", metavar="FICHIER",
+                        help=f"Journal d'exécution (défaut: {DEFAULT_JOURNAL_FILE})")
+    parser.add_argument("--bandwidth-limit", type=int, metavar="KBPS",
+                        help="Bande passante maximale pour l'ensemble des téléchargements (Ko/s)")
+    parser.add_argument("--strict-checksums", action="store_true",
+                        help="Refuse les installateurs dont le type de checksum n'est pas supporté")
+    parser.add_argument("--cache-dir", help="Dossier du cache d'installateurs (peut être partagé entre machines)")
+    parser.add_argument("--no-cache", action="store_true", help="Désactive le cache d'installateurs")
+    parser.add_argument("--log-file", metavar="FICHIER",
+                        help=f"Fichier de log, avec rotation par taille (défaut: {DEFAULT_LOG_FILE})")
+    parser.add_argument("--log-format", choices=("text", "json"), default="text",
+                        help="Format du fichier de log : texte, ou un objet JSON par ligne "
+                             "(logiciel, phase, durée, code retour)")
+    parser.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                        help="Niveau de log (défaut: INFO)")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="Ne vérifie pas les logiciels après l'installation")
+    parser.add_argument("--bundle", metavar="CHEMIN",
+                        help="Paquet hors ligne (dossier ou archive) utilisé à la place des téléchargements")
+    
+    subparsers = parser.add_subparsers(dest="command")
+    cache_parser = subparsers.add_parser("cache", help="Gestion du cache d'installateurs")
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", required=True)
+    cache_subparsers.add_parser("stats", help="Affiche les statistiques du cache")
+    prune_parser = cache_subparsers.add_parser("prune", help="Évince les installateurs les moins récemment utilisés")
+    prune_parser.add_argument("--max-size", type=int, metavar="MO",
+                              help="Taille cible du cache (défaut: taille maximale configurée)")
+    
+    bundle_parser = subparsers.add_parser("bundle", help="Paquet hors ligne d'installateurs")
+    bundle_subparsers = bundle_parser.add_subparsers(dest="bundle_command", required=True)
+    build_parser = bundle_subparsers.add_parser("build", help="Télécharge les installateurs de la configuration "
+                                                              "dans un paquet hors ligne")
+    build_parser.add_argument("destination", help="Dossier du paquet (complété s'il existe déjà)")
+    build_parser.add_argument("--archive", action="store_true",
+                              help="Crée aussi une archive tar du paquet (<destination>.tar)")
+    
+    subparsers.add_parser("verify", help="Vérifie les logiciels installés et écrit le rapport de santé")
+    
+    plan_parser = subparsers.add_parser("plan", help="Affiche les actions nécessaires sans rien installer")
+    plan_parser.add_argument("--diff", nargs=2, metavar=("ANCIEN", "NOUVEAU"),
+                             help="Compare deux fichiers de configuration (défaut: état appliqué → --config)")
+    apply_parser = subparsers.add_parser("apply", help="Applique la configuration (commande par défaut)")
+    apply_parser.add_argument("--incremental", action="store_true",
+                              help="N'installe, réinstalle ou supprime que ce qui a changé depuis la dernière application")
+    return parser.parse_args(argv)
 
 def main():
     """Fonction principale"""
-    installer = SoftwareInstaller()
+    args = parse_arguments()
+    installer = SoftwareInstaller(
+        serial=args.serial,
+        max_workers=args.max_workers,
+        bandwidth_limit_kbps=args.bandwidth_limit,
+        strict_checksums=args.strict_checksums,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        batch=args.batch,
+        skip_installed=not args.reinstall,
+        journal_file=args.journal,
+        resume=args.resume,
+        profile=args.profile,
+        incremental=getattr(args, 'incremental', False),
+        state_file=args.state,
+        only=args.only,
+        exclude=args.exclude,
+        bundle=args.bundle,
+        log_file=args.log_file,
+        log_format=args.log_format,
+        log_level=args.log_level,
+        verify=not args.no_verify
+    )
+    
+    if args.command == "cache":
+        sys.exit(run_cache_command(installer, args))
+    if args.command == "plan":
+        sys.exit(run_plan_command(installer, args))
+    if args.command == "bundle":
+        sys.exit(run_bundle_command(installer, args))
+    if args.command == "verify":
+        sys.exit(run_verify_command(installer, args))
     
     # Vérification de l'OS
     if sys.platform != "win32":
@@ -472,7 +1539,7 @@ def main():
         sys.exit(1)
     
     # Lancement de l'installation
-    installer.run()
+    installer.run(args.config)
 
 if __name__ == "__main__":
     main()
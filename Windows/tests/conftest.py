@@ -0,0 +1,41 @@
+"""Configuration commune des tests : les modules de Windows/ s'importent par leur nom"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_installer(tmp_path, monkeypatch):
+    """SoftwareInstaller isolé dans tmp_path ; les commandes sont enregistrées au lieu d'être exécutées"""
+    from software_installer import SoftwareInstaller
+
+    monkeypatch.chdir(tmp_path)
+    installers = []
+
+    def make(config=None, outcome=True, **options):
+        options.setdefault("log_console", False)
+        options.setdefault("journal_file", str(tmp_path / "install_journal.jsonl"))
+        options.setdefault("state_file", str(tmp_path / "applied_state.json"))
+        installer = SoftwareInstaller(**options)
+        installer.commands = []
+
+        def run_command_output(command, timeout=300, idle_timeout=None):
+            installer.commands.append(command)
+            return outcome, "", ""
+
+        installer.run_command_output = run_command_output
+        if config is not None:
+            from config_model import compile_config
+            installer.catalog = compile_config(config).expand(installer.expand_path_variables)
+            installer.catalog.expand_entries(installer.catalog.entries)
+            installer.config = installer.catalog.raw
+        installers.append(installer)
+        return installer
+
+    yield make
+    for installer in installers:
+        installer.journal.close()
@@ -0,0 +1,162 @@
+"""Analyse de la sortie des installations groupées, produite par de faux winget/choco"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from batch_install import build_winget_import, parse_choco_output, parse_winget_import_output
+
+# Le comportement de chaque paquet dépend de son identifiant :
+# Missing → introuvable, Broken → installateur en échec, Present → déjà installé
+FAKE_WINGET = r'''
+import json, sys
+
+args = sys.argv[1:]
+with open(args[args.index("-i") + 1], encoding="utf-8") as f:
+    data = json.load(f)
+for source in data["Sources"]:
+    for package in source["Packages"]:
+        package_id = package["PackageIdentifier"]
+        if "Missing" in package_id:
+            print(f"Package not found: {package_id}")
+        elif "Present" in package_id:
+            print(f"Package is already installed: {package_id}")
+        else:
+            print(f"Found {package_id.split('.')[-1]} [{package_id}] Version 1.0")
+            print("This application is licensed to you by its owner.")
+            print("Successfully verified installer hash")
+            print("Starting package install...")
+            if "Broken" in package_id:
+                print("Installer failed with exit code: 1603")
+            else:
+                print("Successfully installed")
+# --ignore-unavailable : un paquet introuvable ne change pas le code retour
+sys.exit(1 if any("Broken" in p["PackageIdentifier"] for s in data["Sources"] for p in s["Packages"]) else 0)
+'''
+
+FAKE_WINGET_LOCALIZED = r'''
+import json, sys
+
+args = sys.argv[1:]
+with open(args[args.index("-i") + 1], encoding="utf-8") as f:
+    data = json.load(f)
+for source in data["Sources"]:
+    for package in source["Packages"]:
+        package_id = package["PackageIdentifier"]
+        if "Missing" in package_id:
+            print(f"Package introuvable : {package_id}")
+        else:
+            print(f"Trouvé {package_id} [{package_id}] Version 1.0")
+            print("Installation réussie")
+'''
+
+FAKE_CHOCO = r'''
+import sys
+
+package_ids = [arg for arg in sys.argv[2:] if not arg.startswith("-")]
+print("Installing the following packages:")
+print(";".join(package_ids))
+failures = []
+for package_id in package_ids:
+    if package_id.startswith("missing"):
+        print(f"{package_id} not installed. The package was not found with the source(s) listed.")
+        failures.append(f" - {package_id} - {package_id} not installed. The package was not found.")
+    elif package_id.startswith("present"):
+        print(f"{package_id} v1.2.3 already installed.")
+        print(" Use --force to reinstall, specify a version to install, or try upgrade.")
+    elif package_id.startswith("broken"):
+        print(f"ERROR: Running install script for {package_id} failed.")
+        failures.append(f" - {package_id} (exited 1603) - Error while running install script")
+    else:
+        print(f" The install of {package_id} was successful.")
+        print(f"  Software installed to 'C:\\Program Files\\{package_id}'")
+print()
+print(f"Chocolatey installed {len(package_ids) - len(failures)}/{len(package_ids)} packages.")
+if failures:
+    print()
+    print("Failures")
+    print("\n".join(failures))
+sys.exit(1 if failures else 0)
+'''
+
+
+@pytest.fixture
+def fake_tool(tmp_path):
+    """Écrit un faux outil et retourne une fonction qui l'exécute"""
+    def make(source):
+        script = tmp_path / "fake_tool.py"
+        script.write_text(source, encoding="utf-8")
+
+        def run(*args):
+            return subprocess.run([sys.executable, str(script)] + list(args),
+                                  capture_output=True, text=True)
+        return run
+    return make
+
+
+def winget_import(tmp_path, run, package_ids):
+    import_file = tmp_path / "import.json"
+    import_file.write_text(json.dumps(build_winget_import(package_ids)), encoding="utf-8")
+    return run("import", "-i", str(import_file), "--ignore-unavailable")
+
+
+@pytest.mark.parametrize("package_ids, expected", [
+    (["Mozilla.Firefox", "7zip.7zip"], {"Mozilla.Firefox": True, "7zip.7zip": True}),
+    (["Mozilla.Firefox", "Foo.Missing"], {"Mozilla.Firefox": True, "Foo.Missing": False}),
+    (["Git.Present", "Foo.Broken", "VideoLAN.VLC"],
+     {"Git.Present": True, "Foo.Broken": False, "VideoLAN.VLC": True}),
+])
+def test_parse_winget_import_output(tmp_path, fake_tool, package_ids, expected):
+    result = winget_import(tmp_path, fake_tool(FAKE_WINGET), package_ids)
+    assert parse_winget_import_output(result.stdout, package_ids) == expected
+
+
+def test_parse_winget_import_output_missing_package_keeps_exit_code_zero(tmp_path, fake_tool):
+    package_ids = ["Mozilla.Firefox", "Foo.Missing"]
+    result = winget_import(tmp_path, fake_tool(FAKE_WINGET), package_ids)
+    assert result.returncode == 0
+    assert parse_winget_import_output(result.stdout, package_ids)["Foo.Missing"] is False
+
+
+def test_parse_winget_import_output_ignores_case_of_ids(tmp_path, fake_tool):
+    result = winget_import(tmp_path, fake_tool(FAKE_WINGET), ["Mozilla.Firefox", "Foo.Missing"])
+    # La casse des identifiants de la configuration est conservée dans le résultat
+    assert parse_winget_import_output(result.stdout, ["mozilla.firefox", "foo.missing"]) == {
+        "mozilla.firefox": True, "foo.missing": False}
+
+
+def test_parse_winget_import_output_localized_is_undetermined(tmp_path, fake_tool):
+    package_ids = ["Mozilla.Firefox", "Foo.Missing"]
+    result = winget_import(tmp_path, fake_tool(FAKE_WINGET_LOCALIZED), package_ids)
+    assert result.returncode == 0
+    assert parse_winget_import_output(result.stdout, package_ids) == {
+        "Mozilla.Firefox": None, "Foo.Missing": None}
+
+
+def test_parse_winget_import_output_unknown_package_is_undetermined():
+    assert parse_winget_import_output("Successfully installed\n", ["Mozilla.Firefox"]) == {"Mozilla.Firefox": None}
+
+
+@pytest.mark.parametrize("package_ids, expected", [
+    (["git", "7zip"], {"git": True, "7zip": True}),
+    (["presentgit", "7zip"], {"presentgit": True, "7zip": True}),
+    (["missingfoo", "7zip"], {"missingfoo": False, "7zip": True}),
+    (["brokenfoo", "presentgit", "vlc"], {"brokenfoo": False, "presentgit": True, "vlc": True}),
+])
+def test_parse_choco_output(fake_tool, package_ids, expected):
+    result = fake_tool(FAKE_CHOCO)("install", *package_ids, "-y")
+    assert result.returncode == (0 if all(expected.values()) else 1)
+    assert parse_choco_output(result.stdout, package_ids) == expected
+
+
+def test_parse_choco_output_ignores_case_of_ids(fake_tool):
+    result = fake_tool(FAKE_CHOCO)("install", "googlechrome", "brokenfoo", "-y")
+    assert parse_choco_output(result.stdout, ["GoogleChrome", "BrokenFoo"]) == {
+        "GoogleChrome": True, "BrokenFoo": False}
+
+
+def test_parse_choco_output_unrelated_output_is_undetermined():
+    assert parse_choco_output("Chocolatey v2.2.2\n", ["git"]) == {"git": None}
@@ -0,0 +1,111 @@
+"""Délais, arrêt de l'arborescence et annulation du moteur de commandes"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from command_engine import CommandEngine
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason="commandes sh")
+
+
+@pytest.fixture
+def engine():
+    engine = CommandEngine()
+    yield engine
+    engine.shutdown()
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Un processus zombie (terminé, pas encore récupéré) n'existe plus vraiment
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def wait_dead(pid: int, seconds: float = 5.0) -> bool:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if not alive(pid):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_success_collects_output(engine):
+    lines = []
+    result = engine.run(["sh", "-c", "echo un; echo deux >&2; exit 3"],
+                        on_line=lambda stream, line: lines.append((stream, line)))
+
+    assert (result.returncode, result.stdout, result.stderr) == (3, "un\n", "deux\n")
+    assert not result.success and result.timeout is None
+    assert sorted(lines) == [("stderr", "deux"), ("stdout", "un")]
+
+
+def test_hard_timeout(engine):
+    started = time.monotonic()
+    result = engine.run(["sh", "-c", "echo début; sleep 10"], timeout=1)
+
+    assert time.monotonic() - started < 5
+    assert result.timeout and "délai maximal" in result.timeout
+    assert not result.success and result.stdout == "début\n"
+
+
+def test_hard_timeout_after_output_closed(engine):
+    started = time.monotonic()
+    result = engine.run(["sh", "-c", "exec >/dev/null 2>&1; sleep 10"], timeout=1)
+
+    assert time.monotonic() - started < 5
+    assert result.timeout and not result.success
+
+
+def test_idle_timeout(engine):
+    started = time.monotonic()
+    result = engine.run(["sh", "-c", "echo a; sleep 0.3; echo b; sleep 10"], timeout=60, idle_timeout=1)
+
+    assert time.monotonic() - started < 5
+    assert result.timeout and "aucune sortie" in result.timeout
+    assert result.stdout == "a\nb\n"
+
+
+def test_timeout_kills_process_tree(engine, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    result = engine.run(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], timeout=1)
+
+    assert result.timeout
+    assert wait_dead(int(pid_file.read_text()))
+
+
+def test_cancellation_kills_process_tree(engine, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    future = engine.submit(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], timeout=60)
+    deadline = time.monotonic() + 5
+    while not pid_file.exists() or not pid_file.read_text().strip():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    future.cancel()
+
+    assert wait_dead(int(pid_file.read_text()))
+
+
+def test_descendant_holding_output_does_not_block(engine, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    started = time.monotonic()
+    # Le descendant survit au processus et garde stdout ouvert (service lancé par un installateur)
+    result = engine.run(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; echo fini"], timeout=60)
+
+    assert time.monotonic() - started < 10
+    assert result.success and result.stdout == "fini\n"
+    # Il n'est pas tué : seul un dépassement de délai arrête l'arborescence
+    child = int(pid_file.read_text())
+    assert alive(child)
+    os.kill(child, 9)
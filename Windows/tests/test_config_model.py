@@ -0,0 +1,180 @@
+"""Validation de la configuration : chaque erreur est localisée"""
+
+import json
+import os
+
+import pytest
+
+import config_model
+from checksums import ChecksumError, UnsupportedChecksumError
+from config_model import ConfigError, compile_config, load_config, validate_config
+
+GIT = {"name": "Git", "method": "winget"}
+
+
+def config(**sections):
+    return dict({"software_list": [GIT]}, **sections)
+
+
+@pytest.mark.parametrize("retry, expected", [
+    ({"attempts": 3, "backoff": 2.5, "max_delay": 60,
+      "methods": {"winget": {"attempts": 4}}, "circuit_breaker": {"threshold": 5, "cooldown": 300}}, []),
+    ({"attempts": "two"}, ["retry.attempts: nombre attendu"]),
+    ({"backoff": True}, ["retry.backoff: nombre attendu"]),
+    ({"methods": []}, ["retry.methods: objet attendu"]),
+    ({"methods": {"custom": 1}}, ["retry.methods.custom: objet attendu"]),
+    ({"methods": {"winget": {"attempts": "2", "max_delay": None}}},
+     ["retry.methods.winget.attempts: nombre attendu", "retry.methods.winget.max_delay: nombre attendu"]),
+    ({"circuit_breaker": 5}, ["retry.circuit_breaker: objet attendu"]),
+    ({"circuit_breaker": {"threshold": "5", "cooldown": "5m"}},
+     ["retry.circuit_breaker.threshold: nombre attendu", "retry.circuit_breaker.cooldown: nombre attendu"]),
+], ids=["valide", "attempts", "booleen", "methods-liste", "methode-nombre", "methode-champs",
+        "disjoncteur-nombre", "disjoncteur-champs"])
+def test_retry_section(retry, expected):
+    assert validate_config(config(retry=retry)) == expected
+
+
+def test_package_retry():
+    software = dict(GIT, retry={"attempts": "3"})
+    assert validate_config({"software_list": [software]}) == ["software_list[0] (Git).retry.attempts: nombre attendu"]
+
+
+@pytest.mark.parametrize("config, expected", [
+    ([], ["racine: objet JSON attendu"]),
+    ({"packages": ["git"]},
+     ["software_list: liste des logiciels obligatoire (profil Ubuntu `packages` ? il s'utilise avec "
+      "install_packages.sh)"]),
+    ({"software_list": []}, ["software_list: au moins un logiciel attendu"]),
+    ({"software_list": [GIT], "scheduler": []}, ["scheduler: objet attendu"]),
+    ({"software_list": [GIT], "base_directories": {"temp": 1}}, ["base_directories.temp: chaîne attendue"]),
+    ({"software_list": [GIT, "Firefox"]}, ["software_list[1]: objet attendu"]),
+    ({"software_list": [GIT, {"method": "winget"}]}, ["software_list[1].name: nom (chaîne non vide) obligatoire"]),
+    ({"software_list": [GIT, GIT]},
+     ["software_list[1] (Git).name: nom en double (déjà utilisé par software_list[0])"]),
+    ({"software_list": [{"name": "Git", "method": "apt"}]},
+     ["software_list[0] (Git).method: valeur parmi winget, chocolatey, custom, direct attendue (trouvé 'apt')"]),
+    ({"software_list": [dict(GIT, tags="dev", depends_on=3)]},
+     ["software_list[0] (Git).tags: liste de chaînes attendue",
+      "software_list[0] (Git).depends_on: nom ou liste de noms attendu"]),
+    ({"software_list": [dict(GIT, fallback={"method": "custom"})]},
+     ["software_list[0] (Git).fallback.method: valeur parmi winget, chocolatey attendue"]),
+    ({"software_list": [dict(GIT, verify={"version_pattern": "("})]},
+     ["software_list[0] (Git).verify.version_pattern: expression régulière invalide "
+      "(missing ), unterminated subpattern at position 0)"]),
+    ({"software_list": [{"name": "Tool", "method": "custom"}]},
+     ["software_list[0] (Tool).installer: obligatoire pour la méthode custom"]),
+    ({"software_list": [{"name": "Tool", "method": "custom",
+                         "installer": {"type": "msi", "silent_args": "/S"}}]},
+     ["software_list[0] (Tool).installer.silent_args: liste de chaînes attendue",
+      "software_list[0] (Tool).installer.type: \"custom\" attendu pour la méthode custom"]),
+    ({"software_list": [{"name": "Page", "method": "direct"}]},
+     ["software_list[0] (Page).download_url: obligatoire pour la méthode direct"]),
+], ids=["racine", "profil-ubuntu", "liste-vide", "section", "dossier", "entree-non-objet", "sans-nom",
+        "doublon", "methode", "types", "repli", "expression", "custom-sans-installateur",
+        "installateur", "direct-sans-url"])
+def test_error_locations(config, expected):
+    assert validate_config(config) == expected
+
+
+@pytest.mark.parametrize("checksum, parsed, error", [
+    (None, None, None),
+    ("sha256:" + "AB" * 32, ("sha256", "ab" * 32), None),
+    ("md5:" + "ab" * 16, None, UnsupportedChecksumError),
+    ("sha256:abcd", None, ChecksumError),
+])
+def test_entry_checksum_is_parsed_once(checksum, parsed, error):
+    installer = {"type": "custom", "download_url": "https://example.org/tool.exe"}
+    if checksum:
+        installer["checksum"] = checksum
+    entry = compile_config({"software_list": [{"name": "Tool", "method": "custom", "installer": installer}]}).get("Tool")
+
+    assert entry.checksum == parsed
+    assert type(entry.checksum_error) is error if error else entry.checksum_error is None
+
+
+def test_entry_typed_fields():
+    catalog = compile_config({"software_list": [
+        dict(GIT, category="Dev", tags=["vcs"], depends_on="Base"),
+        {"name": "Base", "method": "chocolatey", "conflicts_with": ["Other"]},
+    ]})
+    git, base = catalog.get("Git"), catalog.get("Base")
+
+    assert (git.package_id, git.category, git.tags, git.depends_on) == ("Git", "Dev", ("vcs",), ("Base",))
+    assert (base.silent_args, base.conflicts_with) == (["-y"], ("Other",))
+    assert [entry.name for entry in catalog.in_categories(["dev"])] == ["Git"]
+
+
+# ----------------------------------------------------------------------
+# Cache des configurations compilées
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"software_list": [GIT, {"name": "VLC", "method": "winget", "category": "media"}]}),
+                    encoding="utf-8")
+    return path
+
+
+def test_cold_load_writes_cache(config_file, tmp_path):
+    catalog = load_config(str(config_file), str(tmp_path / "cache"))
+    assert len(catalog) == 2 and "VLC" in catalog
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+
+def test_warm_load_uses_cache(config_file, tmp_path, monkeypatch):
+    load_config(str(config_file), str(tmp_path / "cache"))
+    real_open = open
+
+    def guarded_open(path, *args, **kwargs):
+        assert os.fspath(path) != str(config_file), "fichier de configuration relu"
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", guarded_open)
+    catalog = load_config(str(config_file), str(tmp_path / "cache"))
+    assert catalog.get("VLC").category == "media"
+    assert [entry.name for entry in catalog.in_categories(["media"])] == ["VLC"]
+
+
+def test_touched_file_skips_parsing(config_file, tmp_path, monkeypatch):
+    load_config(str(config_file), str(tmp_path / "cache"))
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("configuration revalidée alors que son contenu n'a pas changé")
+
+    monkeypatch.setattr(config_model, "validate_config", fail)
+    monkeypatch.setattr(config_model.json, "loads", fail)
+    assert "Git" in load_config(str(config_file), str(tmp_path / "cache"))
+
+
+def test_changed_file_is_revalidated(config_file, tmp_path):
+    load_config(str(config_file), str(tmp_path / "cache"))
+    config_file.write_text(json.dumps({"software_list": [{"name": "Git", "method": "apt"}]}), encoding="utf-8")
+
+    with pytest.raises(ConfigError) as error:
+        load_config(str(config_file), str(tmp_path / "cache"))
+    assert error.value.errors == [f"{config_file}: software_list[0] (Git).method: valeur parmi winget, "
+                                  "chocolatey, custom, direct attendue (trouvé 'apt')"]
+
+
+@pytest.mark.parametrize("content", [b"", b"\x00garbage", None], ids=["vide", "illisible", "autre-version"])
+def test_unusable_cache_is_ignored(config_file, tmp_path, monkeypatch, content):
+    cache_directory = tmp_path / "cache"
+    load_config(str(config_file), str(cache_directory))
+    cache_path = cache_directory / os.listdir(cache_directory)[0]
+    if content is None:
+        monkeypatch.setattr(config_model, "COMPILED_VERSION", config_model.COMPILED_VERSION + 1)
+    else:
+        cache_path.write_bytes(content)
+
+    assert len(load_config(str(config_file), str(cache_directory))) == 2
+
+
+def test_json_error_is_located(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{\n  "software_list": [,]\n}', encoding="utf-8")
+    with pytest.raises(ConfigError) as error:
+        load_config(str(path), str(tmp_path / "cache"))
+    assert error.value.errors[0].startswith(f"{path}:2:21: JSON invalide")
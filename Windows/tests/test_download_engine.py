@@ -0,0 +1,171 @@
+"""Moteur de téléchargement contre un serveur HTTP local (plages, reprise, checksum, erreurs)"""
+
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import download_engine
+from download_engine import DownloadEngine
+
+CONTENT = bytes(range(256)) * 4096  # 1 Mio
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Sert CONTENT sous /file.bin avec prise en charge des plages ; journalise les requêtes"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get("Range"))
+        if self.path != "/file.bin":
+            self.send_error(404)
+            return
+        start, end = 0, len(CONTENT) - 1
+        range_header = self.headers.get("Range")
+        if range_header:
+            first, _, last = range_header[len("bytes="):].partition("-")
+            start, end = int(first), int(last) if last else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(CONTENT)}")
+        else:
+            self.send_response(200)
+        body = CONTENT[start:end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        if server.cut_after and range_header != "bytes=0-0":
+            # Coupure de connexion au milieu de la réponse (une seule fois)
+            body, server.cut_after = body[:server.cut_after], None
+            self.close_connection = True
+        self.wfile.write(body)
+        server.sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.sent = 0
+    httpd.cut_after = None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def engine():
+    engine = DownloadEngine(max_workers=2, segments=4, retries=0, backoff=0)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch):
+    # Segments de 128 Kio au lieu de 8 Mio : un fichier de 1 Mio est découpé en 4
+    monkeypatch.setattr(download_engine, "MIN_SEGMENT_SIZE", 128 * 1024)
+
+
+def sha256(data: bytes):
+    return "sha256", hashlib.sha256(data).hexdigest()
+
+
+def test_segmented_range_download(server, engine, tmp_path):
+    destination = tmp_path / "file.bin"
+    assert engine.download(f"{server.url}/file.bin", str(destination), sha256(CONTENT))
+
+    assert destination.read_bytes() == CONTENT
+    # Sonde (bytes=0-0) puis une requête par segment
+    assert server.requests[0] == "bytes=0-0"
+    quarter = len(CONTENT) // 4
+    assert sorted(server.requests[1:]) == sorted(
+        f"bytes={index * quarter}-{(index + 1) * quarter - 1}" for index in range(4))
+    assert not os.path.exists(f"{destination}.part")
+    assert not os.path.exists(f"{destination}.part.json")
+
+
+def test_resume_after_crash_from_part_state(server, engine, tmp_path):
+    destination = tmp_path / "file.bin"
+    part_path = f"{destination}.part"
+    quarter = len(CONTENT) // 4
+    # État laissé par un arrêt brutal : segments 1 et 3 terminés, segment 2 à moitié, segment 4 non commencé
+    done = [quarter, quarter // 2, quarter, 0]
+    segments = [{"start": index * quarter, "end": (index + 1) * quarter - 1, "done": done[index]}
+                for index in range(4)]
+    with open(part_path, "wb") as f:
+        f.truncate(len(CONTENT))
+        for segment in segments:
+            f.seek(segment["start"])
+            f.write(CONTENT[segment["start"]:segment["start"] + segment["done"]])
+    with open(f"{part_path}.json", "w", encoding="utf-8") as f:
+        json.dump({"url": f"{server.url}/file.bin", "size": len(CONTENT), "etag": ETAG,
+                   "segments": segments}, f)
+
+    assert engine.download(f"{server.url}/file.bin", str(destination), sha256(CONTENT))
+
+    assert destination.read_bytes() == CONTENT
+    # Seuls les octets manquants sont retéléchargés (plus l'octet de la sonde)
+    assert server.sent == 1 + len(CONTENT) - sum(done)
+    assert f"bytes={quarter + quarter // 2}-{2 * quarter - 1}" in server.requests
+    assert not os.path.exists(part_path)
+
+
+def test_interrupted_segment_resumes_from_offset(server, tmp_path):
+    server.cut_after = 1000
+    engine = DownloadEngine(max_workers=1, segments=1, retries=1, backoff=0)
+    try:
+        destination = tmp_path / "file.bin"
+        assert engine.download(f"{server.url}/file.bin", str(destination), sha256(CONTENT))
+    finally:
+        engine.shutdown()
+
+    assert destination.read_bytes() == CONTENT
+    # La nouvelle tentative ne redemande que la suite du segment
+    assert server.requests == ["bytes=0-0", f"bytes=0-{len(CONTENT) - 1}", f"bytes=1000-{len(CONTENT) - 1}"]
+
+
+def test_stale_part_state_is_ignored(server, engine, tmp_path):
+    destination = tmp_path / "file.bin"
+    part_path = f"{destination}.part"
+    with open(part_path, "wb") as f:
+        f.write(b"\0" * len(CONTENT))
+    with open(f"{part_path}.json", "w", encoding="utf-8") as f:
+        json.dump({"url": f"{server.url}/file.bin", "size": len(CONTENT), "etag": '"v0"',
+                   "segments": [{"start": 0, "end": len(CONTENT) - 1, "done": len(CONTENT)}]}, f)
+
+    assert engine.download(f"{server.url}/file.bin", str(destination), sha256(CONTENT))
+    assert destination.read_bytes() == CONTENT
+
+
+def test_checksum_mismatch_discards_file(server, engine, tmp_path):
+    destination = tmp_path / "file.bin"
+    assert not engine.download(f"{server.url}/file.bin", str(destination), sha256(b"autre contenu"))
+
+    assert not destination.exists()
+    assert not os.path.exists(f"{destination}.part")
+    assert not os.path.exists(f"{destination}.part.json")
+
+
+def test_not_found_fails_without_retry(server, tmp_path):
+    engine = DownloadEngine(retries=3, backoff=0)
+    try:
+        destination = tmp_path / "missing.bin"
+        assert not engine.download(f"{server.url}/missing.bin", str(destination))
+    finally:
+        engine.shutdown()
+
+    # Une erreur 4xx n'est pas transitoire : une seule requête
+    assert server.requests == ["bytes=0-0"]
+    assert not destination.exists()
+    assert not os.path.exists(f"{destination}.part")
@@ -0,0 +1,113 @@
+"""Application incrémentale : différences d'entrées, état appliqué, réinstallation et journal"""
+
+import pytest
+
+from plan_diff import AppliedState, diff_entries, entry_hash
+from run_journal import COMPLETED_STATES, PLANNED, UNCHANGED
+
+GIT = {"name": "Git", "method": "winget", "package_id": "Git.Git", "category": "dev"}
+FIREFOX = {"name": "Firefox", "method": "chocolatey", "package_id": "firefox"}
+VLC = {"name": "VLC", "method": "winget", "package_id": "VideoLAN.VLC"}
+
+
+def names(entries):
+    return [software['name'] for software in entries]
+
+
+@pytest.mark.parametrize("old, new, expected", [
+    ([], [GIT], (["Git"], [], [], [])),
+    ([GIT], [], ([], [], ["Git"], [])),
+    ([GIT, FIREFOX], [GIT, FIREFOX], ([], [], [], ["Git", "Firefox"])),
+    ([GIT], [dict(GIT, package_id="Git.Git.Preview")], ([], ["Git"], [], [])),
+    ([GIT], [dict(GIT, silent_args=["--silent"])], ([], ["Git"], [], [])),
+    # Champs sans effet sur l'installation
+    ([GIT], [dict(GIT, category="outils", tags=["vcs"], depends_on=["VLC"])], ([], [], [], ["Git"])),
+    ([GIT, FIREFOX], [FIREFOX, VLC], (["VLC"], [], ["Git"], ["Firefox"])),
+], ids=["ajout", "retrait", "identique", "identifiant-modifie", "arguments-ajoutes",
+        "champs-ignores", "mixte"])
+def test_diff_entries(old, new, expected):
+    diff = diff_entries(old, new)
+    assert (names(diff.install), names(diff.reinstall), names(diff.remove), names(diff.unchanged)) == expected
+    assert bool(diff) == any(expected[:3])
+
+
+def test_entry_hash_ignores_key_order():
+    assert entry_hash({"name": "Git", "method": "winget"}) == entry_hash({"method": "winget", "name": "Git"})
+
+
+def test_applied_state_round_trip(tmp_path):
+    path = str(tmp_path / "applied_state.json")
+    state = AppliedState(path)
+    state.applied(GIT)
+    state.applied(FIREFOX)
+    state.removed("Firefox")
+    state.save("config.json")
+
+    loaded = AppliedState(path).load()
+    assert loaded.config_file == "config.json"
+    assert loaded.software_list() == [GIT]
+    diff = loaded.diff([GIT, VLC])
+    assert (names(diff.install), names(diff.unchanged)) == (["VLC"], ["Git"])
+
+
+def test_missing_applied_state_is_empty(tmp_path):
+    state = AppliedState(str(tmp_path / "absent.json")).load()
+    assert state.entries == {} and names(state.diff([GIT]).install) == ["Git"]
+
+
+def config(*software):
+    return {"software_list": [dict(entry) for entry in software]}
+
+
+@pytest.mark.parametrize("method, program, package_id, silent_args", [
+    ("winget", "winget", "Git.Git", ["--silent"]),
+    ("chocolatey", "choco", "firefox", ["-y"]),
+])
+def test_reinstall_forces_the_package_manager(make_installer, method, program, package_id, silent_args):
+    installer = make_installer(config({"name": "Pkg", "method": method, "package_id": package_id}))
+    installer.reinstall_names = {"Pkg"}
+    software = installer.catalog.get("Pkg")
+
+    assert installer.install_with_backend(software, method, package_id, silent_args)
+    assert installer.commands == [[program, "install", package_id] + silent_args + ["--force"]]
+    # Une réinstallation forcée n'entre pas dans un lot
+    assert installer.batch_key(software) is None
+
+
+def test_plain_install_is_not_forced(make_installer):
+    installer = make_installer(config(FIREFOX))
+    assert installer.install_with_backend(installer.catalog.get("Firefox"), "chocolatey", "firefox", ["-y"])
+    assert installer.commands == [["choco", "install", "firefox", "-y"]]
+
+
+def test_changed_entry_is_reinstalled_with_force(make_installer):
+    installer = make_installer(config(FIREFOX))
+    installer.applied_state.applied(dict(FIREFOX, silent_args=["-y", "--params", "/NoDesktopShortcut"]))
+    firefox = installer.catalog.get("Firefox")
+    installer.plan_incremental([firefox])
+
+    installer.install_with_fallback(firefox)
+    assert installer.commands == [["choco", "install", "firefox", "-y", "--force"]]
+
+
+def test_unchanged_entries_are_journaled_and_skipped_on_resume(make_installer, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{}", encoding="utf-8")
+
+    installer = make_installer(config(GIT, FIREFOX, VLC), incremental=True)
+    plan = installer.catalog.entries
+    installer.applied_state.applied(GIT)
+    installer.applied_state.applied(FIREFOX)
+    installer.plan_incremental(plan)
+    installer.start_journal(str(config_file), plan)
+    installer.journal.close()
+
+    summary = installer.journal.summary()
+    assert sorted(summary[UNCHANGED]) == ["Firefox", "Git"]
+    assert summary[PLANNED] == ["VLC"]
+
+    # Reprise sans --incremental : seuls les logiciels non traités restent à faire
+    resumed = make_installer(config(GIT, FIREFOX, VLC), resume=True)
+    resumed.start_journal(str(config_file), plan)
+    assert sorted(resumed.previously_completed) == ["Firefox", "Git"]
+    assert UNCHANGED in COMPLETED_STATES
@@ -0,0 +1,103 @@
+"""Plan d'installation (ordre, cycles, dépendances, conflits) et échecs dans l'ordonnanceur"""
+
+import threading
+
+import pytest
+
+from config_model import SoftwareEntry
+from install_plan import PlanError, build_install_plan
+from install_scheduler import InstallScheduler
+
+
+def entry(name, method="winget", **fields):
+    return SoftwareEntry(dict(name=name, method=method, **fields))
+
+
+def names(plan):
+    return [software.name for software in plan]
+
+
+@pytest.mark.parametrize("software_list, message", [
+    ([entry("a", depends_on=["b"]), entry("b", depends_on=["a"])],
+     "Cycle de dépendances détecté: a → b → a"),
+    ([entry("a", depends_on=["b"]), entry("b", depends_on=["c"]), entry("c", depends_on=["b"])],
+     "Cycle de dépendances détecté: b → c → b"),
+    ([entry("a", depends_on=["x"])],
+     "a dépend de x, absent de la configuration"),
+    ([entry("a", depends_on=["a"])],
+     "a dépend de lui-même"),
+    ([entry("a", conflicts_with=["b"]), entry("b")],
+     "a est en conflit avec b, les deux sont dans la configuration"),
+    ([entry("a"), entry("a", method="chocolatey")],
+     "Logiciel déclaré plusieurs fois: a"),
+], ids=["cycle", "cycle derrière une chaîne", "dépendance inconnue", "dépendance à soi-même",
+        "conflit", "doublon"])
+def test_invalid_plans(software_list, message):
+    with pytest.raises(PlanError) as error:
+        build_install_plan(software_list)
+    assert str(error.value) == message
+
+
+def test_conflict_with_absent_package_is_allowed():
+    plan = build_install_plan([entry("a", conflicts_with=["b"])])
+    assert names(plan) == ["a"]
+
+
+def test_independent_packages_keep_historical_method_order():
+    software_list = [
+        entry("direct1", method="direct"),
+        entry("custom1", method="custom"),
+        entry("choco1", method="chocolatey"),
+        entry("winget1"),
+        entry("choco2", method="chocolatey"),
+        entry("winget2"),
+    ]
+    assert names(build_install_plan(software_list)) == [
+        "winget1", "winget2", "choco1", "choco2", "custom1", "direct1"]
+
+
+def test_dependency_overrides_method_order():
+    software_list = [
+        entry("app"),
+        entry("runtime", method="direct"),
+        entry("tool", depends_on=["runtime"]),
+        entry("plugin", method="chocolatey"),
+    ]
+    plan = build_install_plan(software_list)
+    assert names(plan) == ["app", "plugin", "runtime", "tool"]
+    assert plan.dependencies_of("tool") == ["runtime"]
+    assert plan.dependencies_of("app") == []
+
+
+def test_only_dependents_of_failed_node_are_skipped():
+    plan = build_install_plan([
+        entry("base"),
+        entry("child", depends_on=["base"]),
+        entry("grandchild", method="chocolatey", depends_on=["child"]),
+        entry("other"),
+        entry("other-child", method="custom", depends_on=["other"]),
+    ])
+    skipped = []
+    lock = threading.Lock()
+
+    def skip(item, failed):
+        with lock:
+            skipped.append((item.name, failed))
+
+    scheduler = InstallScheduler(max_workers=2)
+    results = scheduler.run(list(plan), lambda item: item.name != "base",
+                            lambda item: item.method, plan.dependencies, skip_fn=skip)
+
+    assert results == {"base": False, "child": None, "grandchild": None,
+                       "other": True, "other-child": True}
+    assert sorted(skipped) == [("child", ["base"]), ("grandchild", ["child"])]
+
+
+def test_dependency_missing_from_run_is_skipped():
+    plan = build_install_plan([entry("base"), entry("child", depends_on=["base"])])
+    skipped = []
+    results = InstallScheduler().run([plan.packages["child"]], lambda item: True,
+                                     lambda item: item.method, plan.dependencies,
+                                     skip_fn=lambda item, failed: skipped.append((item.name, failed)))
+    assert results == {"child": None}
+    assert skipped == [("child", ["base"])]
@@ -0,0 +1,106 @@
+"""Limites de concurrence de l'ordonnanceur, y compris pendant un repli"""
+
+import threading
+import time
+
+from install_scheduler import InstallScheduler
+
+
+def test_fallback_slot_respects_backend_limit():
+    scheduler = InstallScheduler(max_workers=4, concurrency={"winget": 2, "chocolatey": 1})
+    lock = threading.Lock()
+    running = {"chocolatey": 0}
+    peak = {"chocolatey": 0}
+
+    def use_chocolatey():
+        with lock:
+            running["chocolatey"] += 1
+            peak["chocolatey"] = max(peak["chocolatey"], running["chocolatey"])
+        time.sleep(0.05)
+        with lock:
+            running["chocolatey"] -= 1
+
+    def install(item):
+        if item["method"] == "winget":
+            # Échec winget : repli sur chocolatey dans la place de chocolatey
+            with scheduler.slot("chocolatey"):
+                use_chocolatey()
+        else:
+            use_chocolatey()
+        return True
+
+    items = ([{"name": f"w{i}", "method": "winget"} for i in range(4)]
+             + [{"name": f"c{i}", "method": "chocolatey"} for i in range(3)])
+    results = scheduler.run(items, install, lambda item: item["method"])
+
+    assert all(results.values()) and len(results) == len(items)
+    assert peak["chocolatey"] == 1
+
+
+def test_crossed_fallbacks_do_not_deadlock():
+    scheduler = InstallScheduler(max_workers=2, concurrency={"winget": 1, "chocolatey": 1})
+    other = {"winget": "chocolatey", "chocolatey": "winget"}
+
+    def install(item):
+        time.sleep(0.01)
+        with scheduler.slot(other[item["method"]]):
+            time.sleep(0.01)
+        return True
+
+    items = [{"name": "w", "method": "winget"}, {"name": "c", "method": "chocolatey"}]
+    done = []
+    thread = threading.Thread(target=lambda: done.append(scheduler.run(items, install,
+                                                                      lambda item: item["method"])))
+    thread.start()
+    thread.join(timeout=5)
+    assert done and done[0] == {"w": True, "c": True}
+
+
+def test_install_slot_is_shared_by_all_backends():
+    scheduler = InstallScheduler(max_workers=4, concurrency={"winget": 2, "chocolatey": 2, "custom": 2})
+    lock = threading.Lock()
+    running = {"installs": 0, "workers": 0}
+    peak = {"installs": 0, "workers": 0}
+
+    def enter(counter):
+        with lock:
+            running[counter] += 1
+            peak[counter] = max(peak[counter], running[counter])
+
+    def leave(counter):
+        with lock:
+            running[counter] -= 1
+
+    def install(item):
+        enter("workers")
+        time.sleep(0.05)  # téléchargement, pré-installation : hors place d'installation
+        with scheduler.install_slot():
+            enter("installs")
+            with scheduler.install_slot():  # réentrant (repli depuis une installation)
+                time.sleep(0.01)
+            leave("installs")
+        leave("workers")
+        return True
+
+    items = [{"name": f"{method}{i}", "method": method}
+             for method in ("winget", "chocolatey", "custom") for i in range(2)]
+    results = scheduler.run(items, install, lambda item: item["method"])
+
+    assert all(results.values()) and len(results) == len(items)
+    assert scheduler.max_installs == 1
+    assert peak["installs"] == 1
+    assert peak["workers"] > 1
+
+
+def test_max_installs_allows_parallel_installs():
+    scheduler = InstallScheduler(max_workers=4, max_installs=2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def install(item):
+        with scheduler.install_slot():
+            # Les deux installations doivent se rejoindre dans leur place
+            barrier.wait()
+        return True
+
+    items = [{"name": "w", "method": "winget"}, {"name": "c", "method": "chocolatey"}]
+    assert scheduler.run(items, install, lambda item: item["method"]) == {"w": True, "c": True}
@@ -0,0 +1,101 @@
+"""Analyse des inventaires winget (export JSON, tableau de `winget list`) et chocolatey"""
+
+import json
+
+import pytest
+
+from inventory import InventorySnapshot, parse_choco_list, parse_winget_export, parse_winget_list
+
+
+def export(*sources):
+    return json.dumps({"Sources": [{"Packages": [{"PackageIdentifier": package_id} for package_id in packages]}
+                                   for packages in sources]})
+
+
+@pytest.mark.parametrize("content, expected", [
+    (export(["Git.Git", "Mozilla.Firefox"]), ["Git.Git", "Mozilla.Firefox"]),
+    (export(["Git.Git"], ["9NBLGGH4NNS1"]), ["Git.Git", "9NBLGGH4NNS1"]),
+    (json.dumps({"Sources": [{"Packages": [{"PackageIdentifier": ""}, {"Version": "1.0"}]}]}), []),
+    (json.dumps({"Sources": [{"SourceDetails": {"Name": "winget"}}]}), []),
+    ("{}", []),
+], ids=["une-source", "plusieurs-sources", "identifiants-absents", "source-sans-paquets", "vide"])
+def test_parse_winget_export(content, expected):
+    assert parse_winget_export(content) == expected
+
+
+def test_parse_winget_export_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        parse_winget_export("Sources: []")
+
+
+ENGLISH = """\
+Name                Id                     Version      Available Source
+--------------------------------------------------------------------------
+Git                 Git.Git                2.43.0                 winget
+Mozilla Firefox     Mozilla.Firefox        121.0        122.0     winget
+Microsoft Edge      Microsoft.Edge         120.0.2210.9           winget
+"""
+
+FRENCH = """\
+Nom                 ID                     Version      Disponible Source
+--------------------------------------------------------------------------
+Git                 Git.Git                2.43.0                  winget
+Visual Studio Code  Microsoft.VisualStudi… 1.85.1                  winget
+"""
+
+LOWERCASE = """\
+name                id                     version
+--------------------------------------------------
+Git                 Git.Git                2.43.0
+"""
+
+# Progression affichée par winget avant le tableau, puis un message après
+NOISY = "\r   - \r   \\ \r" + ENGLISH + """
+3 packages have version numbers that cannot be determined. Use --include-unknown to see all results.
+"""
+
+# Nom tronqué par winget : l'identifiant reste dans sa colonne
+TRUNCATED_NAME = """\
+Name                Id                            Version
+---------------------------------------------------------
+Microsoft Visual C… Microsoft.VCRedist.2015+.x64  14.38.33130.0
+Some Tool           ARP\\Machine\\X64\\Tool          1.0
+"""
+
+
+@pytest.mark.parametrize("output, expected", [
+    (ENGLISH, ["Git.Git", "Mozilla.Firefox", "Microsoft.Edge"]),
+    (FRENCH, ["Git.Git"]),
+    (LOWERCASE, ["Git.Git"]),
+    (NOISY, ["Git.Git", "Mozilla.Firefox", "Microsoft.Edge"]),
+    (TRUNCATED_NAME, ["Microsoft.VCRedist.2015+.x64", "ARP\\Machine\\X64\\Tool"]),
+    ("No installed package found matching input criteria.\n", []),
+    ("Nom    Version\n--------------\nGit    2.43.0\n", []),
+    ("", []),
+], ids=["anglais", "francais-id-tronque", "minuscules", "progression-et-message", "nom-tronque",
+        "aucun-paquet", "sans-colonne-id", "vide"])
+def test_parse_winget_list(output, expected):
+    assert parse_winget_list(output) == expected
+
+
+@pytest.mark.parametrize("output, expected", [
+    ("chocolatey|2.2.2\ngit|2.43.0\nnodejs-lts|20.10.0\n", ["chocolatey", "git", "nodejs-lts"]),
+    # Chocolatey 1 : bannière et résumé sans séparateur
+    ("Chocolatey v1.4.0\ngit|2.43.0\n2 packages installed.\n", ["git"]),
+    ("git|2.43.0\r\n\r\n 7zip | 23.1.0\r\n", ["git", "7zip"]),
+    ("|1.0\n", []),
+    ("", []),
+], ids=["chocolatey-2", "chocolatey-1", "crlf-et-espaces", "identifiant-vide", "vide"])
+def test_parse_choco_list(output, expected):
+    assert parse_choco_list(output) == expected
+
+
+def test_snapshot_is_case_insensitive():
+    snapshot = InventorySnapshot()
+    snapshot.add("winget", parse_winget_list(ENGLISH))
+    snapshot.add("chocolatey", parse_choco_list("Git|2.43.0\n"))
+
+    assert snapshot.contains("winget", "mozilla.firefox")
+    assert snapshot.contains("chocolatey", "git")
+    assert not snapshot.contains("chocolatey", "Mozilla.Firefox")
+    assert len(snapshot) == 4
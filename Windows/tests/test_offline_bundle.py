@@ -0,0 +1,147 @@
+"""Paquet hors ligne : construction en ligne, ouverture puis installation sans réseau"""
+
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from atomic_files import atomic_write_json
+from checksums import link_verified
+from download_engine import DownloadEngine
+from offline_bundle import MANIFEST_FILE, BundleError, OfflineBundle, build_bundle
+
+FILES = {
+    "/app.exe": b"app" * 50000,
+    "/tool.msi": b"tool" * 30000,
+    "/copy.exe": b"app" * 50000,  # même contenu qu'app.exe sous une autre URL
+}
+
+
+def sha256(data: bytes):
+    return ("sha256", hashlib.sha256(data).hexdigest())
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Sert FILES sans plages (téléchargement en un seul segment)"""
+
+    def do_GET(self):
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    """Paquet construit contre un serveur local, arrêté avant le retour"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_port}"
+    items = [
+        ("App", f"{url}/app.exe", "app.exe", sha256(FILES["/app.exe"])),
+        ("Tool", f"{url}/tool.msi", "tool.msi", None),
+        ("Copy", f"{url}/copy.exe", "copy.exe", None),
+        ("Missing", f"{url}/missing.exe", "missing.exe", None),
+    ]
+    engine = DownloadEngine(max_workers=2, segments=1, retries=0, backoff=0)
+    try:
+        manifest = build_bundle(items, str(tmp_path / "bundle"), engine, archive=True)
+    finally:
+        engine.shutdown()
+        httpd.shutdown()
+        httpd.server_close()
+    return tmp_path / "bundle", url, manifest
+
+
+def test_build_writes_manifest_and_deduplicates(bundle_dir):
+    directory, url, manifest = bundle_dir
+    assert manifest["failed"] == [f"{url}/missing.exe"]
+    assert json.loads((directory / MANIFEST_FILE).read_text(encoding="utf-8")) == manifest
+    # app.exe et copy.exe ont le même contenu : un seul objet stocké
+    assert len(os.listdir(directory / "files")) == 2
+    assert manifest["entries"][f"{url}/copy.exe"]["sha256"] == sha256(FILES["/app.exe"])[1]
+
+
+@pytest.mark.parametrize("archive", [False, True], ids=["dossier", "archive tar"])
+def test_offline_download_uses_bundle(bundle_dir, tmp_path, archive):
+    directory, url, _ = bundle_dir
+    path = str(directory) + ".tar" if archive else str(directory)
+    bundle = OfflineBundle.open(path)
+    engine = DownloadEngine(max_workers=2, segments=1, retries=0, backoff=0, timeout=2, bundle=bundle)
+    try:
+        # Le serveur est arrêté : seul le paquet peut fournir les fichiers
+        for name, checksum in (("app.exe", sha256(FILES["/app.exe"])), ("tool.msi", None)):
+            destination = str(tmp_path / "out" / name)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            assert engine.download(f"{url}/{name}", destination, checksum)
+            assert open(destination, "rb").read() == FILES["/" + name]
+            assert engine.download_stats(destination)["source"] == "bundle"
+        assert not engine.download(f"{url}/missing.exe", str(tmp_path / "out" / "missing.exe"))
+    finally:
+        engine.shutdown()
+    assert sorted(os.listdir(tmp_path / "out")) == ["app.exe", "tool.msi"]
+
+
+def test_corrupted_bundle_file_is_rejected(bundle_dir, tmp_path, caplog):
+    directory, url, manifest = bundle_dir
+    entry = manifest["entries"][f"{url}/tool.msi"]
+    with open(directory / entry["path"], "r+b") as f:
+        f.write(b"X")
+    bundle = OfflineBundle.open(str(directory))
+    destination = str(tmp_path / "tool.msi")
+
+    assert not bundle.materialize(f"{url}/tool.msi", destination)
+    assert not os.path.exists(destination)
+    assert "corrompu" in caplog.text
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_configured_checksum_overrides_manifest(bundle_dir, tmp_path):
+    directory, url, _ = bundle_dir
+    bundle = OfflineBundle.open(str(directory))
+    destination = str(tmp_path / "app.exe")
+    assert not bundle.materialize(f"{url}/app.exe", destination, sha256(b"autre version"))
+    assert bundle.materialize(f"{url}/app.exe", destination, sha256(FILES["/app.exe"]))
+
+
+def test_open_rejects_missing_or_unknown_bundle(tmp_path):
+    with pytest.raises(BundleError, match="introuvable"):
+        OfflineBundle.open(str(tmp_path / "absent"))
+    (tmp_path / MANIFEST_FILE).write_text('{"version": 99}', encoding="utf-8")
+    with pytest.raises(BundleError, match="version"):
+        OfflineBundle.open(str(tmp_path))
+
+
+def test_link_verified_keeps_destination_on_mismatch(tmp_path):
+    source = tmp_path / "source"
+    source.write_bytes(b"nouveau")
+    destination = tmp_path / "destination"
+    destination.write_bytes(b"ancien")
+
+    assert not link_verified(str(source), str(destination), *sha256(b"autre"))
+    assert destination.read_bytes() == b"ancien"
+    assert link_verified(str(source), str(destination), *sha256(b"nouveau"))
+    assert destination.read_bytes() == b"nouveau"
+    assert sorted(os.listdir(tmp_path)) == ["destination", "source"]
+
+
+def test_atomic_write_json_keeps_previous_file_on_error(tmp_path):
+    path = str(tmp_path / "state.json")
+    atomic_write_json(path, {"état": 1})
+    with pytest.raises(TypeError):
+        atomic_write_json(path, {"état": object()})
+    assert json.loads(open(path, encoding="utf-8").read()) == {"état": 1}
+    assert os.listdir(tmp_path) == ["state.json"]
@@ -0,0 +1,127 @@
+"""Politiques de nouvelles tentatives et disjoncteurs"""
+
+import pytest
+
+import retry_policy
+from retry_policy import CircuitBreaker, RetryManager, RetryPolicy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry_policy.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("winget", threshold=3, cooldown=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(False)
+    assert not breaker.is_open
+
+    breaker.record(False)
+    assert breaker.is_open and not breaker.allow()
+
+
+def test_success_resets_consecutive_failures(clock):
+    breaker = CircuitBreaker("winget", threshold=2, cooldown=60)
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    assert not breaker.is_open and breaker.failures == 1
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = CircuitBreaker("chocolatey", threshold=1, cooldown=60)
+    breaker.record(False)
+    clock.now += 59
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    # Une seule tentative tant que son résultat n'est pas connu
+    assert not breaker.allow()
+
+
+def test_half_open_success_closes(clock):
+    breaker = CircuitBreaker("chocolatey", threshold=1, cooldown=60)
+    breaker.record(False)
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record(True)
+
+    assert not breaker.is_open and breaker.failures == 0
+    assert breaker.allow() and breaker.allow()
+
+
+def test_half_open_failure_reopens_for_a_new_period(clock):
+    breaker = CircuitBreaker("chocolatey", threshold=1, cooldown=60)
+    breaker.record(False)
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record(False)
+
+    assert breaker.is_open and not breaker.allow()
+    clock.now += 60
+    assert breaker.allow()
+
+
+def test_threshold_zero_never_opens(clock):
+    breaker = CircuitBreaker("custom", threshold=0)
+    for _ in range(10):
+        breaker.record(False)
+    assert not breaker.is_open and breaker.allow()
+
+
+def test_policy_merging_order():
+    manager = RetryManager({"attempts": 3, "backoff": 2,
+                            "methods": {"winget": {"attempts": 5, "max_delay": 30}}})
+    software = {"name": "Git", "method": "winget", "retry": {"attempts": 1}}
+
+    policy = manager.policy(software)
+    assert (policy.attempts, policy.backoff, policy.max_delay) == (1, 2, 30)
+    # Politique d'une autre méthode (repli) : celle du logiciel s'applique toujours
+    policy = manager.policy({"name": "Firefox", "method": "winget"}, "chocolatey")
+    assert (policy.attempts, policy.backoff, policy.max_delay) == (3, 2, retry_policy.DEFAULT_MAX_DELAY)
+    assert manager.policy({"name": "VLC", "method": "winget"}).attempts == 5
+
+
+def test_policy_defaults_and_clamping():
+    assert RetryManager().policy({"name": "Git"}).attempts == retry_policy.DEFAULT_ATTEMPTS
+    policy = RetryPolicy(attempts=0, backoff=-1)
+    assert (policy.attempts, policy.backoff) == (1, 0.0)
+
+
+def test_delay_is_capped():
+    policy = RetryPolicy(backoff=10, max_delay=15)
+    assert all(policy.delay(5) <= 15 * 1.5 for _ in range(20))
+    assert all(5 <= policy.delay(0) <= 15 for _ in range(20))
+
+
+def test_breakers_are_shared_per_package_manager_only():
+    manager = RetryManager({"circuit_breaker": {"threshold": 2, "cooldown": 10}})
+    assert manager.breaker("winget") is manager.breaker("winget")
+    assert manager.breaker("winget").threshold == 2
+    # Les installateurs personnalisés sont indépendants : pas de disjoncteur
+    assert manager.breaker("custom").threshold == 0
+
+
+@pytest.mark.parametrize("software, expected", [
+    ({"name": "Git", "method": "winget"}, None),
+    ({"name": "Git", "method": "winget", "fallback": {"method": "winget"}}, None),
+    ({"name": "Git", "method": "winget", "package_id": "Git.Git", "fallback": {"method": "chocolatey"}},
+     ("chocolatey", "Git.Git")),
+    ({"name": "Git", "method": "winget", "fallback": {"method": "chocolatey", "package_id": "git"}},
+     ("chocolatey", "git")),
+])
+def test_fallback(software, expected):
+    assert RetryManager().fallback(software) == expected
@@ -0,0 +1,121 @@
+"""Journal d'exécution : relecture après un arrêt brutal, états finaux et reprise (--resume)"""
+
+import json
+import logging
+
+import pytest
+
+from run_journal import DONE, FAILED, INSTALLING, PLANNED, RunJournal
+
+CONFIG = {"software_list": [
+    {"name": "Git", "method": "winget", "package_id": "Git.Git"},
+    {"name": "Firefox", "method": "chocolatey", "package_id": "firefox"},
+    {"name": "VLC", "method": "winget", "package_id": "VideoLAN.VLC"},
+]}
+
+
+def write_lines(path, *records, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("records, tail, expected", [
+    ([], "", []),
+    ([{"run": "r1", "event": "run_start"}, {"run": "r1", "package": "Git", "state": DONE}],
+     '{"run": "r1", "package": "VLC", "sta', ["run_start", "Git"]),
+    ([{"run": "r1", "event": "run_start"}, {"run": "r1", "package": "Git", "state": DONE},
+      {"run": "r2", "event": "run_start"}, {"run": "r2", "package": "VLC", "state": PLANNED},
+      {"run": "r2", "event": "resume"}],
+     "", ["run_start", "VLC", "resume"]),
+    ([{"run": "r1", "package": "Git", "state": DONE}], "", []),
+], ids=["vide", "derniere-ligne-tronquee", "plusieurs-executions", "sans-run-start"])
+def test_read_last_run(tmp_path, records, tail, expected):
+    path = tmp_path / "journal.jsonl"
+    write_lines(path, *records, tail=tail)
+    last_run = RunJournal(str(path)).read_last_run()
+    assert [entry.get("package") or entry["event"] for entry in last_run] == expected
+
+
+def test_read_last_run_without_file(tmp_path):
+    assert RunJournal(str(tmp_path / "absent.jsonl")).read_last_run() == []
+
+
+def test_fold_keeps_last_state_in_first_seen_order():
+    records = [
+        {"event": "run_start"},
+        {"package": "VLC", "state": PLANNED},
+        {"package": "Git", "state": PLANNED},
+        {"package": "VLC", "state": INSTALLING},
+        {"event": "resume"},
+        {"package": "Git", "state": FAILED},
+        {"package": "VLC", "state": DONE},
+    ]
+    assert list(RunJournal.fold(records).items()) == [("VLC", DONE), ("Git", FAILED)]
+
+
+def test_resume_continues_the_interrupted_run(tmp_path, caplog):
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path)
+    journal.start("config.json", config_hash="abc")
+    journal.record("Git", DONE)
+    journal.record("VLC", INSTALLING)
+    journal.close()
+    run_id = journal.run_id
+
+    resumed = RunJournal(path)
+    with caplog.at_level(logging.WARNING):
+        assert resumed.resume(config_hash="def") == {"Git": DONE, "VLC": INSTALLING}
+    resumed.close()
+    assert resumed.run_id == run_id
+    assert read_lines(path)[-1]["event"] == "resume"
+    assert "La configuration a changé" in caplog.text
+
+
+def test_start_journal_resume_skips_completed_packages(make_installer, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(CONFIG), encoding="utf-8")
+    journal_file = tmp_path / "install_journal.jsonl"
+
+    installer = make_installer(CONFIG)
+    plan = installer.catalog.entries
+    installer.start_journal(str(config_file), plan)
+    installer.journal.record("Git", DONE)
+    installer.journal.record("Firefox", FAILED)
+    installer.journal.record("VLC", INSTALLING)
+    installer.journal.close()
+    # Arrêt brutal au milieu d'une écriture
+    with open(journal_file, "a", encoding="utf-8") as f:
+        f.write('{"run": "x", "package": "VLC"')
+    run_id = installer.journal.run_id
+
+    resumed = make_installer(CONFIG, resume=True)
+    resumed.start_journal(str(config_file), plan)
+    resumed.journal.close()
+
+    assert list(resumed.previously_completed) == ["Git"]
+    assert resumed.journal.run_id == run_id
+    last_run = resumed.journal.read_last_run()
+    assert sum(1 for entry in last_run if entry.get("event") == "run_start") == 1
+    assert [entry["event"] for entry in last_run if "event" in entry] == ["run_start", "resume"]
+    assert RunJournal.fold(last_run) == {"Git": DONE, "Firefox": PLANNED, "VLC": PLANNED}
+
+
+def test_start_journal_resume_without_previous_run(make_installer, tmp_path, caplog):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(CONFIG), encoding="utf-8")
+
+    installer = make_installer(CONFIG, resume=True)
+    with caplog.at_level(logging.WARNING):
+        installer.start_journal(str(config_file), installer.catalog.entries)
+    installer.journal.close()
+
+    assert "Aucune exécution à reprendre" in caplog.text
+    assert installer.previously_completed == {}
+    assert installer.journal.summary() == {PLANNED: ["Git", "Firefox", "VLC"]}